@@ -1,8 +1,15 @@
 """
 ROV控制上位机软件
 主程序入口
+
+用法:
+    python main.py [--config config/xxx.ini]          # 正常运行
+    python main.py --headless [--duration 600] [--init-timeout 5] [--report loop.json]
+                                                     # 无显示器运行控制链路并统计循环耗时
 """
 
+import argparse
+import json
 import time
 
 import pygame
@@ -14,21 +21,36 @@ from modules.hardware_controller import (
     ControllerMonitor,
     NetworkWorker
 )
+from modules.io_reactor import IOReactor
+from modules.link_stats import LinkStatistics
 from modules.joystick_controller import JoystickController
-from modules.ui_controller import UIController, JoystickHandler
+from modules.presenter import LoopTimer, Presenter, format_loop_summary
+from modules.ui_controller import HeadlessUIController, UIController, JoystickHandler
 from modules.video_processor import VideoThread
+from modules.video_recorder import SnapshotService, SnapshotWriter, StreamRecorder
 
 
 class MainController:
     """主控制器类，封装主循环功能和协调各个组件"""
 
-    def __init__(self):
-        """初始化主控制器"""
+    def __init__(self, headless=False, init_timeout=None, config_path=None):
+        """
+        初始化主控制器
+
+        参数:
+            config_path: 配置文件路径，None 时按平台选择默认配置
+            headless: 无显示器模式，界面换成只记录调用的 HeadlessUIController
+            init_timeout: 组件/电机初始化最多等待的秒数，超时后按强制进入处理；None 为不限时
+        """
+        self.headless = headless
+        self.init_deadline = time.perf_counter() + init_timeout if init_timeout is not None else None
+
         # 加载配置
-        self.config_manager = ConfigManager()
+        self.config_manager = ConfigManager(config_path)
 
         # 初始化UI控制器
-        self.ui_controller = UIController(self.config_manager.get_interface_settings(), self.config_manager)
+        ui_class = HeadlessUIController if headless else UIController
+        self.ui_controller = ui_class(self.config_manager.get_interface_settings(), self.config_manager)
 
         # 初始化手柄处理器
         self.joystick_handler = JoystickHandler(self.config_manager.get_joystick_settings())
@@ -40,15 +62,28 @@ class MainController:
         self.controller_monitor = ControllerMonitor(self.config_manager.get_controller_init())
 
         # 初始化硬件控制器
+        network_settings = self.config_manager.get_network_settings()
         server_address = self.config_manager.get_server_address()
-        self.hw_controller = HardwareController(server_address, self.config_manager.motor_params)
+        self.hw_controller = HardwareController(server_address, self.config_manager.motor_params,
+                                                LinkStatistics(network_settings["expected_sensor_hz"]))
         self.gimbal_controller = GimbalController(
             self.config_manager.get_gimbal_address(), self.config_manager.get_gimbal_model()
         )
 
+        # 可选的 I/O 反应器：统一处理电调/云台套接字、视频后端日志和定时任务
+        self.io_reactor = None
+        if network_settings["io_backend"] == "reactor":
+            self.io_reactor = IOReactor()
+            self.io_reactor.start()
+            self.gimbal_controller.attach_reactor(self.io_reactor)
+
         # 设置网络套接字
         self.client_socket = self.hw_controller.setup_socket(self.config_manager.get_local_port())
 
+        # 协商运动控制协议版本（旧固件无应答时回退到 0x01 帧）
+        if network_settings["motion_protocol"] == "auto":
+            self.hw_controller.negotiate_protocol()
+
         # 初始化电机参数
         self.all_motors_initialized = self._init_motors()
 
@@ -64,18 +99,47 @@ class MainController:
             print("系统将继续运行，但可能会影响某些功能")
 
         # 初始化网络工作线程
-        self.network_worker = NetworkWorker(self.hw_controller, self.controller_monitor)
+        self.network_worker = NetworkWorker(
+            self.hw_controller,
+            self.controller_monitor,
+            send_mode=network_settings["send_mode"],
+            send_rate_hz=network_settings["send_rate_hz"],
+            reactor=self.io_reactor,
+            transmit_policy=network_settings["transmit_policy"],
+            delta_epsilon=network_settings["delta_epsilon"],
+            keepalive_interval=network_settings["keepalive_interval"]
+        )
         self.network_worker.start()
 
+        # 截图写盘线程池：视频线程重启后继续沿用；队列至少容纳一次连拍
+        recording_settings = self.config_manager.get_recording_settings()
+        self.snapshot_writer = SnapshotWriter(recording_settings["snapshot_workers"],
+                                              max(recording_settings["snapshot_queue"],
+                                                  recording_settings["burst_frames"]))
+        self.snapshot_service = SnapshotService(self.snapshot_writer, recording_settings["snapshot_folder"],
+                                                recording_settings["burst_frames"], self.snapshot_metadata)
+
         # 初始化视频处理线程
         rtsp_url = self.config_manager.get_rtsp_url()
         base_width, base_height = self.config_manager.get_camera_dimensions()
         buffer_size = self.config_manager.config["camera"].getint("buffer")
         video_backend = self.config_manager.get_video_backend()
-        self.video_thread = VideoThread(rtsp_url, base_width, base_height, buffer_size, backend=video_backend)
+        self.video_thread = VideoThread(rtsp_url, base_width, base_height, buffer_size, backend=video_backend,
+                                        reactor=self.io_reactor, output_size=self._video_output_size(),
+                                        decode_profile=self.config_manager.get_decode_profile(),
+                                        snapshot_writer=self.snapshot_writer)
         self.video_thread.start()
 
+        # 分段录像：独立的 FFmpeg 进程直接封装码流，与实时画面互不影响
+        self.stream_recorder = StreamRecorder(rtsp_url, recording_settings["output_folder"],
+                                              recording_settings["segment_seconds"], recording_settings["container"])
+        if recording_settings["record_on_start"]:
+            self.stream_recorder.start()
+
         # 视频线程监控变量
+        self.stale_frame_timeout = self.config_manager.get_stale_frame_timeout()
+        self._video_size_request = self._video_output_size()
+        self._video_size_changed_at = time.time()
         self.last_video_check_time = time.time()
         self.video_check_interval = 10  # 每10秒检查一次视频线程状态
 
@@ -93,6 +157,8 @@ class MainController:
         # 主循环变量
         self.running = True
         self.clock = pygame.time.Clock()
+        self.control_timing = LoopTimer(1.0 / max(1, self.config_manager.config["joystick"].getint("tick")))
+        self.presenter = None  # 启用渲染线程时为 Presenter 实例
 
         # 记录状态
         self.tem_record = False
@@ -128,6 +194,11 @@ class MainController:
                 print("检测到手柄按键，强制进入系统")
                 break
 
+            if self._init_timed_out():
+                force_entry = True
+                print("初始化等待超时，强制进入系统")
+                break
+
             # 显示初始化界面
             self.ui_controller.display_frame(self.default_image)
             self.ui_controller.draw_text("系统初始化中...",
@@ -152,11 +223,10 @@ class MainController:
 
                 # 尝试连接视频流
                 if hasattr(self.video_thread, 'video_connected') and self.video_thread.video_connected:
-                    with self.video_thread.lock:
-                        if len(self.video_thread.frame_queue) > 0:
-                            video_ready = True
-                            status_text = "视频流: √ 已连接"
-                            status_color = (0, 255, 0)  # 绿色
+                    if self.video_thread.has_frame():
+                        video_ready = True
+                        status_text = "视频流: √ 已连接"
+                        status_color = (0, 255, 0)  # 绿色
 
                 # 如果超过检查间隔仍未就绪，则尝试重启视频线程（约每10秒一次）
                 current_time = time.time()
@@ -182,7 +252,10 @@ class MainController:
                         base_width, base_height = self.config_manager.get_camera_dimensions()
                         buffer_size = self.config_manager.config["camera"].getint("buffer")
                         video_backend = self.config_manager.get_video_backend()
-                        self.video_thread = VideoThread(rtsp_url, base_width, base_height, buffer_size, backend=video_backend)
+                        self.video_thread = VideoThread(rtsp_url, base_width, base_height, buffer_size, backend=video_backend,
+                                                        reactor=self.io_reactor, output_size=self._video_output_size(),
+                                                        decode_profile=self.config_manager.get_decode_profile(),
+                                                        snapshot_writer=self.snapshot_writer)
                         self.video_thread.start()
                         print("[DEBUG] 已重启视频线程（初始化阶段）")
                     except Exception as e:
@@ -302,7 +375,7 @@ class MainController:
                 if self.network_worker.running:
                     # 尝试发送控制器数据
                     try:
-                        self.hw_controller.send_controller_data(self.controller_monitor.controller)
+                        self.hw_controller.send_controller_data(self.controller_monitor.snapshot)
                         current_ready = True
                         status_text = "电流下发: √ 已就绪"
                         status_color = (0, 255, 0)  # 绿色
@@ -450,6 +523,10 @@ class MainController:
 
         print("初始化完成，启动主程序\n")
 
+    def _init_timed_out(self):
+        """是否已超过 init_timeout 设定的初始化等待时间"""
+        return self.init_deadline is not None and time.perf_counter() >= self.init_deadline
+
     def _init_motors(self):
         """
         初始化电机参数
@@ -482,8 +559,9 @@ class MainController:
                                      outline=True)
         self.ui_controller.update_display()
 
-        # 首次尝试初始化所有电机
-        all_initialized = self.hw_controller.hwinit()
+        # 首次尝试初始化所有电机：六个电机并发下发，以收到下位机应答为准
+        self._send_motor_params()
+        all_initialized = self.hw_controller.all_motors_initialized()
 
         # 如果首次初始化不成功，进入重试循环
         while not all_initialized and not force_entry and retry_count < max_retry_count:
@@ -493,6 +571,11 @@ class MainController:
                 print("检测到手柄按键，强制进入系统")
                 break
 
+            if self._init_timed_out():
+                force_entry = True
+                print("电机初始化等待超时，强制进入系统")
+                break
+
             # 获取失败的电机列表
             failed_motors = self.hw_controller.get_failed_motors()
 
@@ -518,8 +601,8 @@ class MainController:
                                          outline=True)
             self.ui_controller.update_display()
 
-            # 重试失败的电机
-            still_failed = self.hw_controller.retry_failed_motors()
+            # 只重发仍未应答的电机
+            self._send_motor_params(failed_motors)
 
             # 检查是否所有电机都已初始化成功
             all_initialized = self.hw_controller.all_motors_initialized()
@@ -558,24 +641,144 @@ class MainController:
 
         return all_initialized
 
+    def _send_motor_params(self, motor_names=None):
+        """
+        下发推力参数并等待应答，结果记入 hw_controller.motor_init_status
+
+        网络线程启动前直接用 hwinit_async；启动后（_wait_for_components 中再次初始化）
+        套接字由网络线程读取，改为请求它部署，否则应答会被它读走而把电机记为未应答。
+        """
+        network_worker = getattr(self, "network_worker", None)
+        if network_worker is None:
+            self.hw_controller.hwinit_async(motor_names)
+        else:
+            network_worker.deploy_thrust_curves(motor_names)
+
     def deploy_thrust_curves(self):
-        """部署推力曲线到ROV"""
+        """部署推力曲线到ROV（由网络线程下发并确认应答，不阻塞主循环）"""
+        if not self.network_worker.request_thrust_deployment(self._on_thrust_curves_deployed):
+            print("上一次推力曲线部署尚未完成，请稍后再试")
+            return
         print("正在部署推力曲线...")
-        self.hw_controller.hwinit()
-        print("推力曲线部署完成")
 
-    def run(self):
-        """运行主循环"""
+    def _on_thrust_curves_deployed(self, report):
+        """推力曲线部署结束回调（在网络线程中执行，只打印报告）"""
+        for motor_name, result in report["motors"].items():
+            rtt_text = f"{result['rtt'] * 1000:.1f}ms" if result["rtt"] is not None else "无应答"
+            print(f"  电机 {motor_name}: 发送 {result['attempts']} 次，{rtt_text}")
+        if report["success"]:
+            print(f"推力曲线部署完成，用时 {report['elapsed'] * 1000:.1f}ms")
+        else:
+            print(f"推力曲线部署未完成，未应答电机: {', '.join(report['failed_motors'])}")
+
+    def _video_output_size(self):
+        """解码端输出尺寸：启用 decoder_scale 时跟随窗口，否则为 None（原分辨率）"""
+        if not self.config_manager.get_decoder_scale():
+            return None
+        return self.ui_controller.screen.get_size()
+
+    def _update_video_output_size(self):
+        """
+        窗口缩放、切换全屏后让解码端按新尺寸输出
+
+        重新协商需要重启拉流进程，拖动窗口边框时等尺寸稳定 0.5 秒后再提交；
+        截图/连拍等待或使用摄像头分辨率画面时暂不缩放
+        """
+        output_size = self._video_output_size()
+        if not output_size or self.snapshot_service.full_size_pending:
+            return
+        now = time.time()
+        if output_size != self._video_size_request:
+            self._video_size_request = output_size
+            self._video_size_changed_at = now
+        elif now - self._video_size_changed_at >= 0.5:
+            self.video_thread.set_output_size(*output_size)
+
+    def snapshot_metadata(self):
+        """截图附属文件中的遥测；连拍时在视频读取线程调用，只读取已发布的控制量快照"""
+        snapshot = self.controller_monitor.snapshot
+        return {
+            "depth": self.controller_monitor.depth,
+            "temperature": self.controller_monitor.temperature,
+            "controller": dict(snapshot.items()),
+            "control_generation": snapshot.generation,
+        }
+
+    def capture_snapshot(self, show_undistorted=False):
+        """保存当前画面（截图键/手柄按钮7调用）"""
+        # 解码端缩放到窗口尺寸时先切回摄像头分辨率，由 snapshot_service.poll() 保存
+        return self.snapshot_service.capture_from(self.video_thread, show_undistorted)
+
+    def start_burst_capture(self):
+        """从下一帧开始连拍（连拍键调用）"""
+        return self.snapshot_service.start_burst(self.video_thread)
+
+    def toggle_recording(self):
+        """开始/停止分段录像（录像键调用）"""
+        return self.stream_recorder.toggle()
+
+    def _video_age(self):
+        """界面显示的视频帧龄：尚无画面时按拉流进程启动以来的时间计"""
+        age = self.video_thread.frame_age()
+        if age is None:
+            age = time.perf_counter() - self.video_thread.backend_started_at
+        return age
+
+    def _latest_frame(self):
+        """最新视频帧及其序号（主循环或渲染线程调用）"""
+        try:
+            frame_rgb, frame_seq, _ = self.video_thread.get_latest_frame_info(self.ui_controller.show_undistorted)
+        except Exception as e:
+            print(f"获取视频帧时发生异常: {str(e)}")
+            return None, None
+        return frame_rgb, frame_seq
+
+    def _hud_telemetry(self):
+        """HUD 遥测快照：display_controller_data 的关键字参数，发布给渲染线程后不再修改"""
+        return {
+            "controller_data": self.controller_monitor.snapshot,
+            "depth": self.controller_monitor.depth,
+            "temperature": self.controller_monitor.temperature,
+            "modes": self.joystick_controller.get_current_modes(),
+            "joystick_correction_enabled": self.joystick_controller.joystick_correction.enabled,
+            "link_stats": self.hw_controller.link_stats.snapshot(),
+            "video_age": self._video_age(),
+            "recording_elapsed": self.stream_recorder.elapsed(),
+            "recording_interrupted": self.stream_recorder.interrupted,
+        }
+
+    def run(self, duration=None):
+        """
+        运行主循环
+
+        参数:
+            duration: 运行的秒数，到时后正常退出；None 为一直运行到用户退出
+        """
+        presenter_settings = self.config_manager.get_presenter_settings()
+        if presenter_settings["render_thread"] and not self.headless:
+            # 渲染线程按 render_fps 绘制，主循环只处理输入、控制与网络
+            self.presenter = Presenter(self.ui_controller, self._latest_frame, presenter_settings["render_fps"])
+            self.presenter.start()
+            print(f"渲染线程已启动，目标 {presenter_settings['render_fps']} fps")
+        tick = self.config_manager.config["joystick"].getint("tick")
+        run_until = time.perf_counter() + duration if duration is not None else None
+
         while self.running:
+            loop_started = time.perf_counter()
+            if run_until is not None and loop_started >= run_until:
+                break
+            self._update_video_output_size()
+
             # 处理事件
-            try:
-                frame_rgb = self.video_thread.get_latest_frame(self.ui_controller.show_undistorted)
-            except Exception as e:
-                print(f"获取视频帧时发生异常: {str(e)}")
-                frame_rgb = None
-                
+            if self.presenter is None:
+                frame_rgb, frame_seq = self._latest_frame()
+
             self.running = self.ui_controller.handle_events(self.joystick_handler.joystick, self.video_thread, self)
 
+            # 连拍凑齐后交给编码线程；录像进程意外退出时按间隔重启
+            self.snapshot_service.poll()
+            self.stream_recorder.poll()
+
             # 更新手柄状态
             self.joystick_controller.update()
 
@@ -587,25 +790,22 @@ class MainController:
             # 触发网络通信
             self.network_worker.trigger_communication()
 
-            # 显示视频帧
-            self.ui_controller.display_frame(frame_rgb)
-
-            # 显示控制器数据和模式信息
-            modes = self.joystick_controller.get_current_modes()
-            # 获取手柄辅助修正状态
-            joystick_correction_enabled = self.joystick_controller.joystick_correction.enabled
+            # 控制器数据和模式信息（简化版 - 不再显示电机控制健康状态）
+            telemetry = self._hud_telemetry()
+            if self.presenter is not None:
+                self.presenter.publish(telemetry)
+            else:
+                # 显示视频帧（序号未变时复用上次的画面）
+                self.ui_controller.display_frame(frame_rgb, frame_seq)
+                self.ui_controller.display_controller_data(**telemetry)
 
-            # 简化版 - 不再显示电机控制健康状态
-            self.ui_controller.display_controller_data(
-                self.controller_monitor.controller,
-                self.controller_monitor.depth,
-                self.controller_monitor.temperature,
-                modes,
-                joystick_correction_enabled
-            )
+                # 更新显示
+                self.ui_controller.update_display()
 
-            # 更新显示
-            self.ui_controller.update_display()
+            # 画面停滞超过阈值时重启拉流进程（线程仍在运行，下面的存活检查发现不了）
+            if self.video_thread.is_stalled(self.stale_frame_timeout):
+                if self.video_thread.restart_backend():
+                    print(f"视频超过 {self.stale_frame_timeout:.1f}s 未更新，正在重启拉流进程...")
 
             # 检查视频线程状态（每10秒检查一次）
             current_time = time.time()
@@ -632,15 +832,45 @@ class MainController:
 
                     # 创建并启动新线程
                     video_backend = self.config_manager.get_video_backend()
-                    self.video_thread = VideoThread(rtsp_url, base_width, base_height, buffer_size, backend=video_backend)
+                    self.video_thread = VideoThread(rtsp_url, base_width, base_height, buffer_size, backend=video_backend,
+                                                    reactor=self.io_reactor, output_size=self._video_output_size(),
+                                                    decode_profile=self.config_manager.get_decode_profile(),
+                                                    snapshot_writer=self.snapshot_writer)
                     self.video_thread.start()
                     print("视频线程已重新启动")
 
             # 控制主循环频率
-            self.clock.tick(self.config_manager.config["joystick"].getint("tick"))
+            self.control_timing.record(loop_started, time.perf_counter())
+            self.clock.tick(tick)
+
+    def loop_report(self):
+        """
+        主循环运行统计（无显示器模式结束时输出）
+
+        返回:
+            dict: control_loop（LoopTimer.snapshot()）、render_thread、transmit、video_frames、ui_frames
+        """
+        return {
+            "headless": self.headless,
+            "control_loop": self.control_timing.snapshot(),
+            "render_thread": self.presenter.timing.snapshot() if self.presenter is not None else None,
+            "transmit": self.network_worker.get_transmit_stats(),
+            "missed_send_deadlines": self.network_worker.missed_deadlines,
+            "video_frames": self.video_thread.frames_received,
+            "ui_frames": getattr(self.ui_controller, "frames_presented", None),
+        }
 
     def cleanup(self):
         """清理资源"""
+        # 先停止渲染线程，之后不再有线程访问窗口
+        try:
+            if self.presenter is not None:
+                self.presenter.stop()
+                print(format_loop_summary("渲染线程", self.presenter.timing.snapshot()))
+            print(format_loop_summary("控制循环", self.control_timing.snapshot()))
+        except Exception as e:
+            print(f"停止渲染线程时出错: {str(e)}")
+
         # 停止视频线程
         try:
             if hasattr(self.video_thread, 'stop'):
@@ -658,6 +888,17 @@ class MainController:
         except Exception as e:
             print(f"停止视频线程时出错: {str(e)}")
 
+        # 结束录像并写完排队中的截图
+        try:
+            if hasattr(self, 'stream_recorder'):
+                self.stream_recorder.stop()
+            if hasattr(self, 'snapshot_service'):
+                self.snapshot_service.poll(now=float("inf"))  # 保存已拍到的连拍帧
+            if hasattr(self, 'snapshot_writer'):
+                self.snapshot_writer.close()
+        except Exception as e:
+            print(f"停止录像时出错: {str(e)}")
+
         # 清理其他资源
         self._cleanup_other_resources()
 
@@ -674,9 +915,19 @@ class MainController:
         try:
             if hasattr(self.network_worker, 'stop'):
                 self.network_worker.stop()
+                stats = self.network_worker.get_transmit_stats()
+                print(f"运动控制帧: 发送 {stats['frames_sent']} 帧，省略 {stats['frames_suppressed']} 帧 "
+                      f"({stats['saved_ratio'] * 100:.1f}%)")
         except Exception as e:
             print(f"停止网络线程时出错: {str(e)}")
 
+        # 停止 I/O 反应器（网络和云台的回调已在上面注销）
+        try:
+            if self.io_reactor is not None:
+                self.io_reactor.stop()
+        except Exception as e:
+            print(f"停止 I/O 反应器时出错: {str(e)}")
+
         # 停止深度温度线程（如果存在）
         try:
             if self.depth_temperature_thread is not None:
@@ -697,16 +948,35 @@ class MainController:
         print("程序已退出")
 
 
-def main():
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="ROV控制上位机软件")
+    parser.add_argument("--config", help="配置文件路径，默认按平台选择 config/config_beyond_*.ini")
+    parser.add_argument("--headless", action="store_true",
+                        help="无显示器运行：不绘制界面，仍运行手柄、网络与视频线程")
+    parser.add_argument("--duration", type=float, help="运行的秒数，到时后自动退出")
+    parser.add_argument("--init-timeout", type=float, help="组件/电机初始化最多等待的秒数，超时后强制进入")
+    parser.add_argument("--report", help="退出时把主循环统计写入该 JSON 文件")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """主函数"""
+    args = parse_args(argv)
+
     # 初始化主控制器
     controller = None
 
     try:
-        controller = MainController()
+        controller = MainController(args.headless, args.init_timeout, args.config)
 
         # 运行主循环
-        controller.run()
+        controller.run(args.duration)
+
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump(controller.loop_report(), f, ensure_ascii=False, indent=2)
+            print(f"运行统计已写入 {args.report}")
     except KeyboardInterrupt:
         print("用户中断程序")
     except Exception as e:
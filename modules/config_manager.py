@@ -83,12 +83,67 @@ class ConfigManager:
         """获取视频拉流后端 (ffmpeg / gstreamer)"""
         return self.config["camera"].get("backend", "ffmpeg").strip().lower()
 
+    def get_decode_profile(self):
+        """获取 FFmpeg 解码配置名 (default / low_latency / low_cpu / quality / hwaccel)"""
+        return self.config["camera"].get("decode_profile", "default").strip().lower()
+
+    def get_stale_frame_timeout(self):
+        """获取视频停滞判定时间（秒），超过后重启拉流进程；0 表示不检查"""
+        return self.config["camera"].getfloat("stale_frame_timeout", fallback=3.0)
+
+    def get_decoder_scale(self):
+        """是否由解码后端把视频缩放到窗口尺寸"""
+        return self.config["camera"].getboolean("decoder_scale", fallback=False)
+
+    def get_recording_settings(self):
+        """获取分段录像与截图写盘设置"""
+        settings = {"output_folder": "recordings", "segment_seconds": 300, "container": "mkv",
+                    "record_on_start": False, "snapshot_workers": 2, "snapshot_queue": 8,
+                    "snapshot_folder": "captures", "burst_frames": 5}
+        if not self.config.has_section("recording"):
+            return settings
+
+        section = self.config["recording"]
+        settings["output_folder"] = section.get("output_folder", "recordings").strip() or "recordings"
+        settings["segment_seconds"] = max(1, section.getint("segment_seconds", fallback=300))
+        container = section.get("container", "mkv").strip().lower()
+        settings["container"] = "mp4" if container == "mp4" else "mkv"
+        settings["record_on_start"] = section.getboolean("record_on_start", fallback=False)
+        settings["snapshot_workers"] = max(1, section.getint("snapshot_workers", fallback=2))
+        settings["snapshot_queue"] = max(1, section.getint("snapshot_queue", fallback=8))
+        settings["snapshot_folder"] = section.get("snapshot_folder", "captures").strip() or "captures"
+        settings["burst_frames"] = max(1, section.getint("burst_frames", fallback=5))
+        return settings
+
     def get_server_address(self):
         """获取服务器地址"""
         host = self.config["serial"].get("host")
         port = self.config["serial"].getint("remote_port")
         return (host, port)
 
+    def get_network_settings(self):
+        """获取运动控制帧发送调度及 I/O 调度方式设置"""
+        settings = {"send_mode": "triggered", "send_rate_hz": 100.0, "io_backend": "threads",
+                    "expected_sensor_hz": 0.0, "motion_protocol": "auto",
+                    "transmit_policy": "always", "delta_epsilon": 0.01, "keepalive_interval": 0.2}
+        if not self.config.has_section("network"):
+            return settings
+
+        section = self.config["network"]
+        mode = section.get("send_mode", "triggered").strip().lower()
+        settings["send_mode"] = "fixed_rate" if mode in ("fixed_rate", "fixed", "定频") else "triggered"
+        settings["send_rate_hz"] = section.getfloat("send_rate_hz", fallback=100.0)
+        backend = section.get("io_backend", "threads").strip().lower()
+        settings["io_backend"] = "reactor" if backend == "reactor" else "threads"
+        settings["expected_sensor_hz"] = max(0.0, section.getfloat("expected_sensor_hz", fallback=0.0))
+        protocol = section.get("motion_protocol", "auto").strip().lower()
+        settings["motion_protocol"] = "v1" if protocol in ("v1", "1", "legacy") else "auto"
+        policy = section.get("transmit_policy", "always").strip().lower()
+        settings["transmit_policy"] = "delta" if policy == "delta" else "always"
+        settings["delta_epsilon"] = max(0.0, section.getfloat("delta_epsilon", fallback=0.01))
+        settings["keepalive_interval"] = section.getfloat("keepalive_interval", fallback=0.2)
+        return settings
+
     def get_gimbal_address(self):
         """获取当前云台预设的网络地址。"""
         model = self.get_gimbal_model()
@@ -196,6 +251,13 @@ class ConfigManager:
             "y_offset": self.config["interface"].getint("y_offset")
         }
 
+    def get_presenter_settings(self):
+        """获取渲染线程设置：render_thread 为 True 时视频与 HUD 在独立线程按 render_fps 绘制"""
+        return {
+            "render_thread": self.config.getboolean("interface", "render_thread", fallback=False),
+            "render_fps": max(1, self.config.getint("interface", "render_fps", fallback=60)),
+        }
+
     def get_joystick_settings(self):
         """获取手柄设置"""
         result = {
@@ -400,6 +462,8 @@ class ConfigManager:
             "toggle_undistorted_key": self.config["keyboard_bindings"].get("toggle_undistorted_key"),
             "toggle_fullscreen_key": self.config["keyboard_bindings"].get("toggle_fullscreen_key"),
             "capture_frame_key": self.config["keyboard_bindings"].get("capture_frame_key"),
+            "toggle_recording_key": self.config["keyboard_bindings"].get("toggle_recording_key", "r"),
+            "burst_capture_key": self.config["keyboard_bindings"].get("burst_capture_key", "b"),
             "controller_visualizer_key": self.config["keyboard_bindings"].get("controller_visualizer_key", "v"),
             "controller_mapping_key": self.config["keyboard_bindings"].get("controller_mapping_key", "m"),
             "deploy_thrust_curves_key": self.config["keyboard_bindings"].get("deploy_thrust_curves_key", "c"),
@@ -415,6 +479,8 @@ class ConfigManager:
             "toggle_undistorted_cooldown": self.config["key_cooldowns"].getfloat("toggle_undistorted_cooldown"),
             "toggle_fullscreen_cooldown": self.config["key_cooldowns"].getfloat("toggle_fullscreen_cooldown"),
             "capture_frame_cooldown": self.config["key_cooldowns"].getfloat("capture_frame_cooldown"),
+            "toggle_recording_cooldown": self.config["key_cooldowns"].getfloat("toggle_recording_cooldown", 1.0),
+            "burst_capture_cooldown": self.config["key_cooldowns"].getfloat("burst_capture_cooldown", 1.0),
             "button7_cooldown": self.config["key_cooldowns"].getfloat("button7_cooldown"),
             "controller_visualizer_cooldown": self.config["key_cooldowns"].getfloat("controller_visualizer_cooldown",
                                                                                     0.5),
@@ -31,6 +31,7 @@ class DepthTemperatureController(threading.Thread):
         self.temperatures = []  # 温度数据列表
 
         # 用于非阻塞操作的事件和定时器
+        self.stop_event = threading.Event()
         self.sample_event = threading.Event()
         self.sample_timer = None
         self.log_timer = None
@@ -82,9 +83,9 @@ class DepthTemperatureController(threading.Thread):
             # 立即开始第一次日志记录
             self.log_current_data()
 
-            # 等待停止信号
+            # 等待停止信号，stop_log 会立即唤醒
             while self.running:
-                time.sleep(0.1)  # 短暂休眠，减少CPU使用
+                self.stop_event.wait()
 
             # 线程停止时保存数据
             self.save_to_json()
@@ -106,6 +107,7 @@ class DepthTemperatureController(threading.Thread):
     def start_log(self):
         """启动线程（设置运行状态）"""
         self.running = True
+        self.stop_event.clear()
         if not self.is_alive():
             self.start()
 
@@ -120,6 +122,7 @@ class DepthTemperatureController(threading.Thread):
 
         # 设置停止标志
         self.running = False
+        self.stop_event.set()
 
         # 保存数据（在run方法中会自动调用）
         # 不需要阻塞等待线程结束
@@ -3,21 +3,42 @@
 用于管理与ROV硬件的通信
 """
 
+import asyncio
 import json
 import math
+import random
 import socket
 import struct
 import threading
 import time
 
-
-# 下位机协议帧常量
-FRAME_HEADER = b"\xFA\xAF"
-FRAME_FOOTER = b"\xFB\xBF"
-CMD_MOTION_CTRL = 0x01
-CMD_THRUST_CONFIG = 0x02
-CMD_DEPTH_TEMP = 0x03
-CMD_THRUST_ACK = 0x04
+from modules.link_stats import LinkStatistics, format_link_summary
+from modules.protocol_codec import (
+    CMD_DEPTH_TEMP,
+    CMD_MOTION_CTRL,
+    CMD_MOTION_CTRL_V2,
+    CMD_PROTO_HELLO,
+    CMD_PROTO_HELLO_ACK,
+    CMD_THRUST_ACK,
+    CMD_THRUST_CONFIG,
+    PROTOCOL_VERSION,
+    MotionFrameEncoder,
+    MotionFrameEncoderV2,
+    build_frame,
+    decode_depth_temperature,
+    decode_hello_ack,
+    encode_hello,
+    encode_thrust_config,
+    parse_frame,
+    split_frames,
+    timestamp_ms,
+    xor_checksum,
+)
+
+# 单次 receive_sensor_data 最多读取的数据报数量，防止异常洪泛时卡死网络线程
+MAX_DATAGRAMS_PER_RECEIVE = 256
+
+MOTOR_NAMES = ("m0", "m1", "m2", "m3", "m4", "m5")
 
 
 class GimbalController:
@@ -29,6 +50,31 @@ class GimbalController:
         self._sequence = 0
         self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.client_socket.setblocking(False)
+        self.reactor = None
+        self.replies_received = 0  # 云台回包计数（A2 mini 会应答每条命令）
+        self.last_reply = None
+
+    def attach_reactor(self, reactor):
+        """
+        把云台套接字挂到 IOReactor 上，及时读掉云台回包
+
+        未挂载时回包留在内核缓冲区，写满后由内核丢弃，不影响发送。
+        """
+        # 未绑定的 UDP 套接字在 Windows 上不能 select，先绑定到临时端口
+        self.client_socket.bind(("", 0))
+        reactor.add_reader(self.client_socket, self._on_reply_readable)
+        self.reactor = reactor
+
+    def _on_reply_readable(self, sock):
+        try:
+            for _ in range(MAX_DATAGRAMS_PER_RECEIVE):
+                self.last_reply = sock.recv(1024)
+                self.replies_received += 1
+        except BlockingIOError:
+            pass
+        except OSError as exc:
+            # Windows 上对端不可达会以 ConnectionResetError 的形式出现在接收端
+            print(f"接收云台回包失败: {exc}")
 
     @staticmethod
     def _normalize_model(model):
@@ -154,24 +200,50 @@ class GimbalController:
         try:
             self.send_pitch_speed("00", 0)
         finally:
+            if self.reactor is not None:
+                self.reactor.remove_reader(self.client_socket)
             self.client_socket.close()
 
 
 class HardwareController:
     """硬件控制类，负责与ROV硬件通信"""
 
-    def __init__(self, server_address, motor_params):
+    def __init__(self, server_address, motor_params, link_stats=None):
         """
         初始化硬件控制器
         
         参数:
             server_address: 服务器地址元组 (host, port)
             motor_params: 电机参数字典
+            link_stats: LinkStatistics 实例，默认自动估计传感器回传频率
         """
         self.server_address = server_address
         self.motor_params = motor_params
         self.client_socket = None
 
+        # 链路质量统计：记录运动控制帧发送与深度/温度帧到达的时刻
+        self.link_stats = link_stats if link_stats is not None else LinkStatistics()
+
+        # 运动控制帧编码器，复用同一帧缓冲区；协商成功后切换为带序号/时间戳的 v2 帧
+        self._motion_encoder = MotionFrameEncoder()
+        self.motion_protocol_version = 1
+        self.remote_status = None  # 最近一次 CMD_PROTO_HELLO_ACK 的内容及往返时延
+        # 会话号随 HELLO 发送：v2 序号从 0 开始的新实例（上位机重启）换一个会话号，
+        # 下位机只在会话号变化时重新跟踪序号，心跳 HELLO 不会打断序号跟踪
+        self.session_id = random.randrange(1, 0x10000)
+
+        # 预分配接收缓冲区，recvfrom_into 直接写入，避免每个数据报分配新对象
+        self._recv_buffer = bytearray(4096)
+        self._recv_view = memoryview(self._recv_buffer)
+
+        # 接收统计：收到的深度/温度帧、被更新样本覆盖而丢弃的旧样本、无法解析的帧
+        self.sensor_frames_received = 0
+        self.sensor_frames_dropped = 0
+        self.malformed_frames = 0
+
+        # 收到 CMD_THRUST_ACK 时调用 thrust_ack_listener(motor_num, 接收时刻)，供推力曲线部署跟踪应答
+        self.thrust_ack_listener = None
+
         # 初始化电机状态字典，用于跟踪每个电机的初始化状态
         self.motor_init_status = {
             "m0": False,
@@ -185,47 +257,22 @@ class HardwareController:
     @staticmethod
     def _xor_checksum(data):
         """计算协议定义的 XOR 校验值。"""
-        checksum = 0
-        for byte in data:
-            checksum ^= byte
-        return checksum
+        return xor_checksum(data)
 
-    @classmethod
-    def _build_frame(cls, command, payload=b""):
+    @staticmethod
+    def _build_frame(command, payload=b""):
         """构造带帧头、XOR 校验和帧尾的协议帧。"""
-        body = bytes((command,)) + payload
-        checksum = cls._xor_checksum(body)
-        return FRAME_HEADER + body + bytes((checksum,)) + FRAME_FOOTER
-
-    @classmethod
-    def _parse_frame(cls, frame):
-        """
-        解析一个下位机协议帧。
-
-        返回 (command, payload)，帧格式错误时返回 None。
-        CMD_THRUST_ACK 是协议中唯一不带 XOR 校验的应答帧。
-        """
-        if len(frame) < 6:
-            return None
-        if not frame.startswith(FRAME_HEADER) or not frame.endswith(FRAME_FOOTER):
-            return None
-
-        command = frame[2]
-        if command == CMD_THRUST_ACK:
-            if len(frame) != 6:
-                return None
-            return command, frame[3:4]
+        return build_frame(command, payload)
 
-        expected_lengths = {
-            CMD_DEPTH_TEMP: 14,
-        }
-        if len(frame) != expected_lengths.get(command, -1):
-            return None
+    @staticmethod
+    def _parse_frame(frame):
+        """解析一个下位机协议帧，返回 (command, payload)，帧格式错误时返回 None。"""
+        return parse_frame(frame)
 
-        # frame[2:-3] 覆盖命令字和全部数据，不包含校验字节及帧尾。
-        if frame[-3] != cls._xor_checksum(frame[2:-3]):
-            return None
-        return command, frame[3:-3]
+    @staticmethod
+    def _split_frames(data):
+        """切分一个数据报（bytes 或接收缓冲区的 memoryview）中的全部协议帧，返回 (frames, malformed)。"""
+        return split_frames(data)
 
     def setup_socket(self, local_port):
         """设置UDP套接字"""
@@ -253,20 +300,7 @@ class HardwareController:
             return False
 
         try:
-            params = self.motor_params[motor_name]
-            payload = struct.pack(
-                '<B8f',
-                int(params['num']),
-                float(params['np_mid']),
-                float(params['np_ini']),
-                float(params['pp_ini']),
-                float(params['pp_mid']),
-                float(params['nt_end']),
-                float(params['nt_mid']),
-                float(params['pt_mid']),
-                float(params['pt_end']),
-            )
-            frame = self._build_frame(CMD_THRUST_CONFIG, payload)
+            frame = encode_thrust_config(self.motor_params[motor_name])
             self.client_socket.sendto(frame, self.server_address)
             # 更新电机初始化状态为成功
             self.motor_init_status[motor_name] = True
@@ -277,6 +311,15 @@ class HardwareController:
             self.motor_init_status[motor_name] = False
             return False
 
+    def send_thrust_frame(self, motor_name):
+        """只发送一帧推力参数，不修改初始化状态（由调用方根据应答判断）"""
+        try:
+            self.client_socket.sendto(encode_thrust_config(self.motor_params[motor_name]), self.server_address)
+            return True
+        except Exception as e:
+            print(f"发送电机 {motor_name} 参数失败: {str(e)}")
+            return False
+
     def get_failed_motors(self):
         """
         获取初始化失败的电机列表
@@ -387,6 +430,7 @@ class HardwareController:
             校验: 从命令字到 servo0 末尾的 XOR (1 byte)
             帧尾: 0xFB 0xBF (2 bytes)
             总计: 34 bytes
+        协商到 v2 时使用 CMD_MOTION_CTRL_V2 (0x05)，数据区前加 u16 序号和 u32 毫秒时间戳，共 40 bytes。
 
         参数:
             controller_data: 控制器数据字典
@@ -399,26 +443,23 @@ class HardwareController:
             return False
 
         try:
-            x = float(controller_data.get("y", 0.0))
-            y = float(controller_data.get("x", 0.0))
-            z = float(controller_data.get("z", 0.0))
-            roll = float(controller_data.get("roll", controller_data.get("rx", 0.0)))
-            pitch = float(controller_data.get("pitch", controller_data.get("ry", 0.0)))
-            yaw = -float(controller_data.get("yaw", controller_data.get("rz", 0.0)))
-            servo = float(controller_data.get("servo0", 0.0))
-
-            payload = struct.pack('<7f', x, y, z, roll, pitch, yaw, servo)
-            frame = self._build_frame(CMD_MOTION_CTRL, payload)
+            frame = self._motion_encoder.encode_controller(controller_data)
             self.client_socket.sendto(frame, self.server_address)
+            self.link_stats.record_sent()
             return True
         except Exception as e:
+            self.link_stats.record_send_failure()
             print(f"发送控制器数据失败: {str(e)}")
             return False
 
     def receive_sensor_data(self):
         """
         接收传感器数据
-        
+
+        每次调用读空套接字中积压的全部数据报并解析其中所有帧，电机应答在此消费；
+        只返回最新的一组深度/温度，被覆盖的旧样本计入 sensor_frames_dropped。
+        帧直接在预分配的接收缓冲区上切分，下一个数据报覆盖缓冲区前只复制最新深度/温度帧的数据区。
+
         返回:
             sensor_data: 传感器数据字典，如果没有数据则返回None
         """
@@ -426,26 +467,35 @@ class HardwareController:
             print("错误: 套接字未初始化")
             return None
 
+        latest_payload = None
         try:
-            data, addr = self.client_socket.recvfrom(1024)
-            parsed = self._parse_frame(data)
-            if parsed is None:
-                return None
-
-            command, payload = parsed
-            if command == CMD_DEPTH_TEMP:
-                depth, temperature = struct.unpack('<2f', payload)
-                return {"depth": depth, "temperature": temperature}
-
-            if command == CMD_THRUST_ACK:
-                motor_num = payload[0]
-                motor_name = f"m{motor_num}"
-                if motor_name in self.motor_init_status:
-                    self.motor_init_status[motor_name] = True
-                # 应答不是传感器数据，不能交给 ControllerMonitor 处理。
-                return None
+            for _ in range(MAX_DATAGRAMS_PER_RECEIVE):
+                nbytes, addr = self.client_socket.recvfrom_into(self._recv_buffer)
+                received_at = time.perf_counter()
+                frames, malformed = self._split_frames(self._recv_view[:nbytes])
+                self.malformed_frames += malformed
+
+                newest = None
+                for command, payload in frames:
+                    if command == CMD_DEPTH_TEMP:
+                        if newest is not None or latest_payload is not None:
+                            self.sensor_frames_dropped += 1
+                        newest = payload
+                        self.sensor_frames_received += 1
+                        self.link_stats.record_received(received_at)
+                    elif command == CMD_THRUST_ACK:
+                        motor_name = f"m{payload[0]}"
+                        if motor_name in self.motor_init_status:
+                            self.motor_init_status[motor_name] = True
+                        if self.thrust_ack_listener is not None:
+                            self.thrust_ack_listener(payload[0], received_at)
+                        # 应答不是传感器数据，不能交给 ControllerMonitor 处理。
+                    elif command == CMD_PROTO_HELLO_ACK:
+                        self._handle_hello_ack(payload)
+                if newest is not None:
+                    latest_payload = bytes(newest)
         except BlockingIOError:
-            # 非阻塞模式下没有数据可读，这是正常的
+            # 非阻塞模式下套接字已读空，这是正常的
             pass
         except ConnectionError as e:
             # 连接错误
@@ -454,11 +504,404 @@ class HardwareController:
             # 捕获其他所有异常
             print(f"接收传感器数据时发生错误: {str(e)}")
 
-        return None
+        if latest_payload is None:
+            return None
+        depth, temperature = decode_depth_temperature(latest_payload)
+        return {"depth": depth, "temperature": temperature}
+
+    def set_motion_protocol(self, version):
+        """切换运动控制帧版本（1 = CMD_MOTION_CTRL，2 = CMD_MOTION_CTRL_V2）"""
+        self.motion_protocol_version = 2 if version >= 2 else 1
+        self._motion_encoder = MotionFrameEncoderV2() if self.motion_protocol_version == 2 else MotionFrameEncoder()
+
+    def send_hello(self):
+        """发送 CMD_PROTO_HELLO，应答在 receive_sensor_data 中处理"""
+        if not self.client_socket:
+            return False
+        try:
+            self.client_socket.sendto(encode_hello(timestamp_ms(), self.session_id), self.server_address)
+            return True
+        except OSError as e:
+            print(f"发送协议协商帧失败: {str(e)}")
+            return False
+
+    def _handle_hello_ack(self, payload):
+        """根据 HELLO 应答计算往返时延和下位机时钟偏差"""
+        status = decode_hello_ack(payload)
+        rtt_ms = (timestamp_ms() - status["echo_timestamp"]) & 0xFFFFFFFF
+        # 假设上下行时延对称：下位机时钟 - 应答生成时刻的上位机时钟，按 32 位有符号回绕
+        offset = (status["remote_clock"] - status["echo_timestamp"] - rtt_ms // 2) & 0xFFFFFFFF
+        status["rtt_ms"] = rtt_ms
+        status["clock_offset_ms"] = offset - 0x100000000 if offset & 0x80000000 else offset
+        self.remote_status = status
+        self.link_stats.record_rtt(rtt_ms / 1000.0)
+        return status
+
+    def negotiate_protocol(self, timeout=0.2, attempts=3):
+        """
+        启动时协商运动控制协议版本
+
+        发送 CMD_PROTO_HELLO 并等待应答；旧固件不认识该命令不会应答，超时后回退到 CMD_MOTION_CTRL。
+        调用期间不能有其他线程读取本套接字。
+
+        返回:
+            int: 协商得到的协议版本
+        """
+        if not self.client_socket:
+            raise RuntimeError("套接字未初始化，请先调用setup_socket方法")
+
+        async def hello():
+            link = AsyncHardwareLink(self.server_address, self.motor_params)
+            await link.open(sock=self.client_socket.dup())
+            try:
+                return await link.hello(timeout, attempts, self.session_id)
+            finally:
+                link.close()
+
+        payload = asyncio.run(hello())
+        if payload is None:
+            print("下位机未应答协议协商，使用旧版运动控制帧 (0x01)")
+            self.set_motion_protocol(1)
+            return 1
+
+        status = self._handle_hello_ack(payload)
+        self.set_motion_protocol(min(PROTOCOL_VERSION, status["version"]))
+        print(f"运动控制协议 v{self.motion_protocol_version}，往返时延 {status['rtt_ms']}ms")
+        return self.motion_protocol_version
+
+    def hwinit_async(self, motor_names=None, ack_timeout=0.1, max_attempts=4):
+        """
+        并发下发推力曲线并等待下位机应答（AsyncHardwareLink 的同步封装）
+
+        与 hwinit 不同，只有收到 CMD_THRUST_ACK 的电机才记为初始化成功。
+        在调用线程中运行独立的事件循环，调用期间不能有其他线程读取本套接字。
+
+        参数:
+            motor_names: 需要下发的电机，默认全部 6 个
+            ack_timeout: 首次等待应答的超时（秒），每次重发翻倍
+            max_attempts: 每个电机最多发送次数
+
+        返回:
+            dict: {电机名: {"acked", "attempts", "rtt"}}，同时更新 motor_init_status
+        """
+        if not self.client_socket:
+            raise RuntimeError("套接字未初始化，请先调用setup_socket方法")
+
+        motor_names = [m for m in (motor_names or MOTOR_NAMES) if m in self.motor_init_status]
+        for motor_name in motor_names:
+            self.motor_init_status[motor_name] = False
+
+        async def deploy():
+            link = AsyncHardwareLink(self.server_address, self.motor_params, ack_timeout, max_attempts)
+            # dup 出的套接字与原套接字共享同一个绑定端口，关闭时不影响原套接字
+            await link.open(sock=self.client_socket.dup())
+            try:
+                return await link.init_motors(motor_names)
+            finally:
+                link.close()
+
+        results = asyncio.run(deploy())
+        for motor_name, result in results.items():
+            self.motor_init_status[motor_name] = result["acked"]
+            self.link_stats.record_rtt(result["rtt"])
+        return results
+
+
+class ThrustCurveDeployment:
+    """
+    推力曲线下发的应答跟踪（请求/应答/重发引擎，不绑定收发方式）
+
+    start() 一次性发出全部电机的 CMD_THRUST_CONFIG，on_ack() 按电机编号对应应答，
+    poll() 只重发超过截止时间仍未应答的电机（每次重发超时翻倍）。
+    不自带线程和等待：AsyncHardwareLink 在事件循环中驱动，NetworkWorker 在网络线程（或反应器）中驱动。
+    """
+
+    def __init__(self, motor_params, send_frame, motor_names=MOTOR_NAMES, ack_timeout=0.05, max_attempts=4):
+        """
+        参数:
+            motor_params: 电机参数字典
+            send_frame: send_frame(电机名)，发送一帧该电机的推力参数
+            motor_names: 需要下发的电机
+            ack_timeout: 首次等待应答的超时（秒），每次重发翻倍
+            max_attempts: 每个电机最多发送次数
+        """
+        self.send_frame = send_frame
+        self.ack_timeout = ack_timeout
+        self.max_attempts = max(1, int(max_attempts))
+        self.started_at = None
+        self.finished_at = None
+
+        self.motors = {}
+        self._names_by_num = {}
+        for motor_name in motor_names:
+            params = motor_params.get(motor_name)
+            if params is None:
+                print(f"错误: 未找到电机参数 {motor_name}")
+                continue
+            self.motors[motor_name] = {"attempts": 0, "sent_at": None, "deadline": None, "rtt": None, "acked": False}
+            self._names_by_num[int(params["num"])] = motor_name
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    def start(self):
+        """同一窗口内发出全部电机的推力参数"""
+        self.started_at = time.perf_counter()
+        for motor_name in self.motors:
+            self._transmit(motor_name, self.started_at)
+        self._check_finished(self.started_at)
+
+    def _transmit(self, motor_name, now):
+        state = self.motors[motor_name]
+        state["attempts"] += 1
+        state["sent_at"] = now
+        state["deadline"] = now + self.ack_timeout * (2 ** (state["attempts"] - 1))
+        self.send_frame(motor_name)
+
+    def on_ack(self, motor_num, ack_time):
+        """处理一帧 CMD_THRUST_ACK；重复应答忽略"""
+        motor_name = self._names_by_num.get(motor_num)
+        if motor_name is None or self.done:
+            return
+        state = self.motors[motor_name]
+        if not state["acked"]:
+            state["acked"] = True
+            state["rtt"] = ack_time - state["sent_at"]
+            state["deadline"] = None
+            self._check_finished(ack_time)
+
+    def poll(self, now=None):
+        """重发超时未应答的电机，返回部署是否已结束"""
+        if self.done:
+            return True
+        now = time.perf_counter() if now is None else now
+        for motor_name, state in self.motors.items():
+            if state["deadline"] is None or state["deadline"] > now:
+                continue
+            if state["attempts"] < self.max_attempts:
+                self._transmit(motor_name, now)
+            else:
+                state["deadline"] = None  # 放弃该电机
+                print(f"电机 {motor_name} 未收到应答，已发送 {self.max_attempts} 次")
+        return self._check_finished(now)
+
+    def next_deadline(self):
+        """最近一个未应答电机的截止时间，没有时返回 None"""
+        deadlines = [state["deadline"] for state in self.motors.values() if state["deadline"] is not None]
+        return min(deadlines) if deadlines else None
+
+    def _check_finished(self, now):
+        if self.finished_at is None and self.next_deadline() is None:
+            self.finished_at = now
+        return self.done
+
+    def report(self):
+        """
+        部署报告
+
+        返回:
+            dict: success、elapsed（秒）、failed_motors 以及每个电机的 acked/attempts/rtt
+        """
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return {
+            "success": all(state["acked"] for state in self.motors.values()),
+            "elapsed": end - self.started_at if self.started_at is not None else 0.0,
+            "failed_motors": [name for name, state in self.motors.items() if not state["acked"]],
+            "motors": {name: {"acked": state["acked"], "attempts": state["attempts"], "rtt": state["rtt"]}
+                       for name, state in self.motors.items()},
+        }
+
+
+class AsyncHardwareLink(asyncio.DatagramProtocol):
+    """
+    基于 asyncio 的下位机链路，提供可等待的请求/应答接口
+
+    推力参数的应答等待与重发由 ThrustCurveDeployment 完成，本类只负责收发与等待截止时间：
+    各电机同时发出，只重发超时未应答的电机，正常情况下一个往返时间即可完成初始化。
+    """
+
+    def __init__(self, server_address, motor_params, ack_timeout=0.1, max_attempts=4):
+        """
+        参数:
+            server_address: 下位机地址元组 (host, port)
+            motor_params: 电机参数字典
+            ack_timeout: 首次等待应答的超时（秒），每次重发翻倍
+            max_attempts: 每个电机最多发送次数
+        """
+        self.server_address = server_address
+        self.motor_params = motor_params
+        self.ack_timeout = ack_timeout
+        self.max_attempts = max(1, int(max_attempts))
+        self.transport = None
+        self.latest_sensor = None  # 初始化期间收到的最新深度/温度
+        self.malformed_frames = 0
+        self._deployment = None  # 进行中的 ThrustCurveDeployment
+        self._ack_event = None  # 收到应答时唤醒 init_motors
+        self._hello_waiter = None
+
+    async def open(self, sock=None, local_port=0):
+        """创建数据报端点；传入 sock 时复用已绑定的套接字"""
+        loop = asyncio.get_running_loop()
+        if sock is not None:
+            await loop.create_datagram_endpoint(lambda: self, sock=sock)
+        else:
+            await loop.create_datagram_endpoint(lambda: self, local_addr=("0.0.0.0", local_port))
+        return self
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    # ─── DatagramProtocol 回调 ─────────────────────
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        frames, malformed = split_frames(data)
+        self.malformed_frames += malformed
+        for command, payload in frames:
+            if command == CMD_THRUST_ACK:
+                if self._deployment is not None:
+                    self._deployment.on_ack(payload[0], time.perf_counter())
+                    self._ack_event.set()
+            elif command == CMD_DEPTH_TEMP:
+                depth, temperature = decode_depth_temperature(payload)
+                self.latest_sensor = {"depth": depth, "temperature": temperature}
+            elif command == CMD_PROTO_HELLO_ACK:
+                if self._hello_waiter is not None and not self._hello_waiter.done():
+                    self._hello_waiter.set_result(payload)
+
+    def error_received(self, exc):
+        # Windows 上对端端口不可达会以 ICMP 错误的形式上报，等超时重发即可
+        print(f"下位机链路收到网络错误: {exc}")
+
+    # ─── 请求/应答 ─────────────────────────────────
+
+    def _send_thrust_frame(self, motor_name):
+        self.transport.sendto(encode_thrust_config(self.motor_params[motor_name]), self.server_address)
+
+    async def send_thrust_config(self, motor_name):
+        """
+        发送单个电机的推力参数并等待应答，超时后重发
+
+        返回:
+            dict: {"acked": bool, "attempts": 发送次数, "rtt": 最后一次发送到应答的时间（秒）或 None}
+        """
+        return (await self.init_motors([motor_name]))[motor_name]
+
+    async def hello(self, timeout=0.2, attempts=3, session=0):
+        """发送 CMD_PROTO_HELLO 并等待应答，返回应答数据区；始终无应答时返回 None"""
+        self._hello_waiter = asyncio.get_running_loop().create_future()
+        try:
+            for _ in range(max(1, attempts)):
+                self.transport.sendto(encode_hello(timestamp_ms(), session), self.server_address)
+                try:
+                    return await asyncio.wait_for(asyncio.shield(self._hello_waiter), timeout)
+                except asyncio.TimeoutError:
+                    continue
+            return None
+        finally:
+            self._hello_waiter.cancel()
+            self._hello_waiter = None
+
+    async def init_motors(self, motor_names=MOTOR_NAMES):
+        """
+        同时下发多个电机的推力参数，等待应答或重发截止时间，直到全部应答或放弃
+
+        同一时刻只能有一次 init_motors 在进行。
+
+        返回:
+            dict: {电机名: {"acked", "attempts", "rtt"}}；缺少参数的电机 attempts 为 0
+        """
+        deployment = ThrustCurveDeployment(self.motor_params, self._send_thrust_frame, motor_names,
+                                           self.ack_timeout, self.max_attempts)
+        self._deployment = deployment
+        self._ack_event = asyncio.Event()
+        try:
+            deployment.start()
+            while not deployment.done:
+                self._ack_event.clear()
+                delay = deployment.next_deadline() - time.perf_counter()
+                try:
+                    await asyncio.wait_for(self._ack_event.wait(), max(0.0, delay))
+                except asyncio.TimeoutError:
+                    pass
+                deployment.poll()
+        finally:
+            self._deployment = None
+
+        results = deployment.report()["motors"]
+        return {m: results.get(m, {"acked": False, "attempts": 0, "rtt": None}) for m in motor_names}
+
+
+class ControlSnapshot:
+    """
+    不可变的控制量快照
+
+    由 ControllerMonitor.publish() 在主线程创建，发布后不再修改；网络线程拿到引用即得到
+    同一时刻的一组完整控制量。支持按键名下标访问，可直接交给 send_controller_data。
+    """
+
+    FIELDS = ("x", "y", "z", "roll", "pitch", "yaw", "servo0")
+    __slots__ = ("generation", "published_at") + FIELDS
+
+    def __init__(self, generation, published_at, x=0.0, y=0.0, z=0.0, roll=0.0, pitch=0.0, yaw=0.0, servo0=0.0):
+        init = object.__setattr__
+        init(self, "generation", generation)
+        init(self, "published_at", published_at)
+        init(self, "x", x)
+        init(self, "y", y)
+        init(self, "z", z)
+        init(self, "roll", roll)
+        init(self, "pitch", pitch)
+        init(self, "yaw", yaw)
+        init(self, "servo0", servo0)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ControlSnapshot 不可修改")
+
+    __delattr__ = __setattr__
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def values(self):
+        return (self.x, self.y, self.z, self.roll, self.pitch, self.yaw, self.servo0)
+
+    def items(self):
+        return zip(self.FIELDS, self.values())
+
+    def max_delta(self, other):
+        """与另一快照各控制量差值绝对值的最大值"""
+        return max(abs(a - b) for a, b in zip(self.values(), other.values()))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.items())
+        return f"ControlSnapshot(generation={self.generation}, {fields})"
 
 
 class ControllerMonitor:
-    """控制器监控类，跟踪控制器状态和传感器数据"""
+    """
+    控制器监控类，跟踪控制器状态和传感器数据
+
+    controller 字典只由主线程（JoystickController）修改，每个输入周期结束时调用 publish()
+    生成新的 ControlSnapshot 并整体替换 snapshot 引用；其他线程只读 snapshot，
+    不会读到一半属于本周期、一半属于上个周期的控制量。
+    """
 
     def __init__(self, controller_init):
         """
@@ -470,6 +913,35 @@ class ControllerMonitor:
         self.controller = controller_init.copy()
         self.depth = 0.0  # 深度数据
         self.temperature = 0.0  # 温度数据
+        self.snapshot = self._make_snapshot(0)
+
+    def _make_snapshot(self, generation):
+        get = self.controller.get
+        return ControlSnapshot(generation, time.perf_counter(),
+                               *(float(get(name, 0.0)) for name in ControlSnapshot.FIELDS))
+
+    @property
+    def generation(self):
+        """当前已发布快照的代数，控制量每变化一次加一"""
+        return self.snapshot.generation
+
+    def publish(self):
+        """
+        把 controller 的当前值发布为新快照（仅在主线程调用）
+
+        控制量与上一快照完全相同时不生成新快照，代数保持不变，
+        读者可据此跳过比较和编码。
+
+        返回:
+            ControlSnapshot: 当前快照
+        """
+        current = self.snapshot
+        candidate = self._make_snapshot(current.generation + 1)
+        if candidate.values() == current.values():
+            return current
+        # 单次引用赋值在 GIL 下是原子的，读者要么拿到旧快照要么拿到新快照
+        self.snapshot = candidate
+        return candidate
 
     def update_sensor_data(self, sensor_data):
         """
@@ -493,13 +965,20 @@ class ControllerMonitor:
 class NetworkWorker(threading.Thread):
     """网络工作线程，处理网络通信"""
 
-    def __init__(self, hardware_controller, controller_monitor):
+    def __init__(self, hardware_controller, controller_monitor, send_mode="triggered", send_rate_hz=100.0,
+                 reactor=None, transmit_policy="always", delta_epsilon=0.01, keepalive_interval=0.2):
         """
         初始化网络工作线程
         
         参数:
             hardware_controller: 硬件控制器实例
             controller_monitor: 控制器监控器实例
+            send_mode: 发送模式，"triggered" 由主循环触发，"fixed_rate" 按固定频率自行调度
+            send_rate_hz: fixed_rate 模式下的运动控制帧发送频率（Hz）
+            reactor: IOReactor 实例；提供时不启动独立线程，收发都挂到反应器上
+            transmit_policy: "always" 每次都发送，"delta" 控制量变化时才发送、否则按保活间隔发送
+            delta_epsilon: delta 策略下视为变化的最小差值（各控制量绝对值）
+            keepalive_interval: delta 策略下控制量不变时的最长发送间隔（秒），必须小于下位机失控保护超时
         """
         super().__init__(daemon=True)
         self.hardware_controller = hardware_controller
@@ -508,6 +987,26 @@ class NetworkWorker(threading.Thread):
         self.task_event = threading.Event()
         self.running = True
 
+        # 反应器模式：套接字可读即接收，定时任务负责发送
+        self.reactor = reactor
+        self._reactor_timers = []
+        self._send_timer = None
+
+        # 定频调度：截止时间按固定周期累加，与 UI 帧率和渲染耗时无关
+        self.send_mode = "fixed_rate" if send_mode == "fixed_rate" else "triggered"
+        self.send_period = 1.0 / max(1.0, float(send_rate_hz))
+        self._next_deadline = None
+        self.missed_deadlines = 0  # 因调度落后而跳过的发送周期数
+
+        # 发送策略：delta 模式省略未变化的控制帧，只按保活间隔重复发送
+        self.transmit_policy = "delta" if transmit_policy == "delta" else "always"
+        self.delta_epsilon = float(delta_epsilon)
+        self.keepalive_interval = max(0.01, float(keepalive_interval))
+        self.frames_sent = 0
+        self.frames_suppressed = 0  # 因控制量未变化而省略的帧数
+        self._last_sent_controller = None
+        self._last_sent_at = 0.0
+
         # 连接状态跟踪
         self.connection_status = True
         self.last_successful_comm = time.time()
@@ -520,6 +1019,19 @@ class NetworkWorker(threading.Thread):
         self.last_motor_reinit = time.time()
         self.motor_reinit_interval = 30.0  # 电机重初始化间隔（秒）
 
+        # 运行中推力曲线部署：由主线程请求，在网络线程中发送并跟踪应答
+        self.thrust_ack_timeout = 0.05  # 首次等待应答的超时（秒），每次重发翻倍
+        self.thrust_max_attempts = 4
+        self.last_deployment_report = None
+        self._deployment = None
+        self._deployment_request = None  # 待开始的部署请求 (callback, motor_names)
+        self._deployment_timer = None
+        self._deployment_callback = None
+        hardware_controller.thrust_ack_listener = self._on_thrust_ack
+
+        # 链路质量日志：只在链路状态变化时输出
+        self._link_status = None
+
     def run(self):
         """线程主循环"""
         # 检查必要的属性是否存在
@@ -533,48 +1045,144 @@ class NetworkWorker(threading.Thread):
             current_time = time.time()
             if current_time - self.last_heartbeat >= self.heartbeat_interval:
                 self.send_heartbeat()
+                self.check_link_quality()
                 self.last_heartbeat = current_time
 
             # 注意：根据需求，推力曲线只在初始化时发送，运行过程中不再定期发送
 
-            self.task_event.wait(timeout=0.5)  # 等待被设置，但最多等待0.5秒
-            self.task_event.clear()  # 重置事件，避免重复处理
+            if self.send_mode == "fixed_rate":
+                self._wait_for_next_deadline()
+            else:
+                # 等待被设置，但最多等待0.5秒；部署推力曲线时按重发截止时间提前醒来
+                self.task_event.wait(timeout=self._idle_timeout())
+                self.task_event.clear()  # 重置事件，避免重复处理
 
             # 检查线程是否仍在运行
             if not self.running:
                 break
 
+            self._service_deployment()
+
             self.task_in_progress = True
 
             try:
-                # 发送控制器数据
-                success = self.send_with_retry(self.hardware_controller.send_controller_data,
-                                               self.controller_monitor.controller)
-
-                if success:
-                    # 更新最后成功通信时间
-                    self.last_successful_comm = time.time()
-                    self.comm_failures = 0
-                    if not self.connection_status:
-                        print("电调连接已恢复")
-                        self.connection_status = True
-
-                # 接收并解析深度/温度协议帧；电机应答由控制器内部消费
-                sensor_data = self.hardware_controller.receive_sensor_data()
-                if sensor_data:
-                    self.controller_monitor.update_sensor_data(sensor_data)
+                # 定频模式下失败的帧不再退避重试，下一个周期会发送更新的数据
+                self._send_controller_frame(0 if self.send_mode == "fixed_rate" else None)
+                self._receive_sensor_frames()
             except Exception as e:
-                self.comm_failures += 1
-                print(f"网络通信错误: {str(e)}")
-
-                # 如果连续失败次数过多，标记连接状态为断开
-                if self.comm_failures > 5 and self.connection_status:
-                    self.connection_status = False
-                    print("电调连接已断开，等待自动恢复...")
+                self._record_comm_failure(e)
             finally:
                 # 任务完成
                 self.task_in_progress = False
 
+    def _send_controller_frame(self, retries=None):
+        """发送一帧运动控制数据并更新连接状态（delta 策略下控制量未变化时省略）"""
+        # 只读取一次快照引用，整帧使用同一时刻的控制量，无需加锁
+        snapshot = self.controller_monitor.snapshot
+        now = time.perf_counter()
+        if not self._transmit_due(snapshot, now):
+            self.frames_suppressed += 1
+            return True
+
+        success = self.send_with_retry(self.hardware_controller.send_controller_data, snapshot, retries)
+        if success:
+            self.frames_sent += 1
+            self._last_sent_controller = snapshot
+            self._last_sent_at = now
+            # 更新最后成功通信时间
+            self.last_successful_comm = time.time()
+            self.comm_failures = 0
+            if not self.connection_status:
+                print("电调连接已恢复")
+                self.connection_status = True
+        return success
+
+    def _transmit_due(self, snapshot, now):
+        """判断本次是否需要发送：always 策略总是发送；delta 策略在变化超过阈值或保活到期时发送"""
+        if self.transmit_policy != "delta" or self._last_sent_controller is None:
+            return True
+        if now - self._last_sent_at >= self.keepalive_interval:
+            return True
+
+        last = self._last_sent_controller
+        # 代数未变说明控制量未变，不必逐项比较
+        if snapshot.generation == last.generation:
+            return False
+        return snapshot.max_delta(last) > self.delta_epsilon
+
+    def get_transmit_stats(self):
+        """
+        获取运动控制帧发送统计
+
+        返回:
+            dict: policy、frames_sent、frames_suppressed、saved_ratio（省略帧占比）
+        """
+        total = self.frames_sent + self.frames_suppressed
+        return {
+            "policy": self.transmit_policy,
+            "frames_sent": self.frames_sent,
+            "frames_suppressed": self.frames_suppressed,
+            "saved_ratio": self.frames_suppressed / total if total else 0.0,
+        }
+
+    def _receive_sensor_frames(self):
+        """接收并解析深度/温度协议帧；电机应答由控制器内部消费"""
+        sensor_data = self.hardware_controller.receive_sensor_data()
+        if sensor_data:
+            self.controller_monitor.update_sensor_data(sensor_data)
+
+    def _record_comm_failure(self, error):
+        self.comm_failures += 1
+        print(f"网络通信错误: {str(error)}")
+
+        # 如果连续失败次数过多，标记连接状态为断开
+        if self.comm_failures > 5 and self.connection_status:
+            self.connection_status = False
+            print("电调连接已断开，等待自动恢复...")
+
+    # ─── 反应器模式 ─────────────────────────────────
+
+    def start(self):
+        """启动网络通信；反应器模式下只注册回调，不创建线程"""
+        if self.reactor is None:
+            super().start()
+            return
+
+        self.reactor.add_reader(self.hardware_controller.client_socket, self._on_socket_readable)
+        if self.send_mode == "fixed_rate":
+            self._send_timer = self.reactor.call_every(self.send_period, self._on_send_timer)
+        else:
+            # 与线程模式的等待超时一致：长时间无触发时仍保持发送
+            idle = min(0.5, self.keepalive_interval) if self.transmit_policy == "delta" else 0.5
+            self._send_timer = self.reactor.call_every(idle, self._on_send_timer)
+        self._reactor_timers = [
+            self._send_timer,
+            self.reactor.call_every(self.heartbeat_interval, self.send_heartbeat),
+            self.reactor.call_every(self.heartbeat_interval, self.check_link_quality),
+        ]
+
+    def _on_socket_readable(self, _sock):
+        try:
+            self._receive_sensor_frames()
+        except Exception as e:
+            self._record_comm_failure(e)
+
+    def _on_send_timer(self):
+        if not self.running:
+            return
+        self.missed_deadlines = self._send_timer.missed
+        self._send_now()
+
+    def _send_now(self):
+        self.task_in_progress = True
+        try:
+            # 回调在反应器线程中执行，不能用 sleep 退避重试
+            self._send_controller_frame(0)
+        except Exception as e:
+            self._record_comm_failure(e)
+        finally:
+            self.task_in_progress = False
+
     def send_with_retry(self, send_func, data, retries=None):
         """
         使用重试机制发送数据
@@ -606,8 +1214,26 @@ class NetworkWorker(threading.Thread):
                     return False
 
     def send_heartbeat(self):
-        """新协议未定义心跳命令，保留接口但不发送未定义帧。"""
-        return False
+        """
+        协议 v2 下用 CMD_PROTO_HELLO 兼作心跳，应答用于测量往返时延；
+        旧协议未定义心跳命令，不发送未定义帧。
+        """
+        if getattr(self.hardware_controller, "motion_protocol_version", 1) < 2:
+            return False
+        return self.hardware_controller.send_hello()
+
+    def check_link_quality(self):
+        """检查链路质量，链路状态变化时输出日志"""
+        link_stats = getattr(self.hardware_controller, "link_stats", None)
+        if link_stats is None:
+            return None
+
+        snapshot = link_stats.snapshot()
+        if snapshot["status"] != self._link_status:
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{timestamp} {format_link_summary(snapshot)}")
+            self._link_status = snapshot["status"]
+        return snapshot
 
     def reinitialize_motors(self):
         """
@@ -628,33 +1254,163 @@ class NetworkWorker(threading.Thread):
         仅发送推力曲线数据，不执行完整的电机初始化
         
         注意：根据需求，此方法仅用于系统初始化时，不再用于运行过程中的定期发送。
-        保留此方法仅用于手动调试或特殊情况下的手动发送。
+        保留此方法仅用于手动调试或特殊情况下的手动发送；现在只提交部署请求，不阻塞调用方。
         """
         print("手动发送推力曲线数据...")
-        success_count = 0
+        return self.request_thrust_deployment()
 
-        # 为每个电机单独发送推力曲线，并单独处理错误
-        for motor_name in ["m0", "m1", "m2", "m3", "m4", "m5"]:
+    def request_thrust_deployment(self, callback=None, motor_names=None):
+        """
+        请求在网络线程中部署推力曲线（非阻塞）
+
+        各电机在同一窗口内发出，按应答确认，只重发缺失的电机。
+        结束后报告保存到 last_deployment_report，并在网络线程中调用 callback(report)。
+
+        参数:
+            callback: 部署结束回调
+            motor_names: 需要下发的电机，默认全部 6 个
+
+        返回:
+            bool: 是否已受理；上一次部署未结束时返回 False
+        """
+        if self._deployment_request is not None or (self._deployment is not None and not self._deployment.done):
+            return False
+
+        self._deployment_request = (callback, motor_names or MOTOR_NAMES)
+        if self.reactor is not None:
+            self.reactor.call_soon_threadsafe(self._service_deployment)
+        elif self.send_mode != "fixed_rate":
+            # 定频模式下一个周期内就会处理，不打乱发送节拍
+            self.task_event.set()
+        return True
+
+    def deploy_thrust_curves(self, motor_names=None, timeout=2.0):
+        """
+        部署推力曲线并等待结束（阻塞调用方，收发仍在网络线程/反应器中进行）
+
+        网络线程启动后由它独占套接字读取，电机应答只能经它转交；
+        此时不能再调用 HardwareController.hwinit_async，否则应答会被网络线程读走。
+
+        返回:
+            dict: 部署报告；未受理或超时时返回 None
+        """
+        finished = threading.Event()
+        if not self.request_thrust_deployment(lambda report: finished.set(), motor_names):
+            return None
+        if not finished.wait(timeout):
+            return None
+        return self.last_deployment_report
+
+    def _idle_timeout(self):
+        if self._deployment_request is not None:
+            return 0.0
+        deadline = self._deployment.next_deadline() if self._deployment is not None else None
+        # delta 策略下主循环不再触发时，仍要按保活间隔醒来
+        idle = min(0.5, self.keepalive_interval) if self.transmit_policy == "delta" else 0.5
+        if deadline is None:
+            return idle
+        return min(idle, max(0.0, deadline - time.perf_counter()))
+
+    def _service_deployment(self):
+        """开始新的部署或为进行中的部署重发超时电机（在网络线程/反应器中调用）"""
+        if self._deployment_request is not None and (self._deployment is None or self._deployment.done):
+            callback, motor_names = self._deployment_request
+            hardware_controller = self.hardware_controller
+            self._deployment = ThrustCurveDeployment(hardware_controller.motor_params,
+                                                     hardware_controller.send_thrust_frame, motor_names,
+                                                     ack_timeout=self.thrust_ack_timeout,
+                                                     max_attempts=self.thrust_max_attempts)
+            self._deployment_callback = callback
+            self._deployment_request = None
+            for motor_name in self._deployment.motors:
+                hardware_controller.motor_init_status[motor_name] = False
+            self._deployment.start()
+        elif self._deployment is None or self._deployment.done:
+            return
+        else:
+            if self.reactor is None:
+                # 线程模式下先读掉已到达的应答，避免把已应答的电机当作超时重发
+                self._receive_sensor_frames()
+            if self._deployment.done:
+                return
+            self._deployment.poll()
+
+        if self._deployment.done:
+            self._finish_deployment()
+        elif self.reactor is not None:
+            delay = self._deployment.next_deadline() - time.perf_counter()
+            self._deployment_timer = self.reactor.call_later(delay, self._service_deployment)
+
+    def _on_thrust_ack(self, motor_num, ack_time):
+        deployment = self._deployment
+        if deployment is None or deployment.done:
+            return
+        deployment.on_ack(motor_num, ack_time)
+        if deployment.done:
+            if self._deployment_timer is not None:
+                self._deployment_timer.cancel()
+            self._finish_deployment()
+
+    def _finish_deployment(self):
+        report = self._deployment.report()
+        self.last_deployment_report = report
+        link_stats = getattr(self.hardware_controller, "link_stats", None)
+        if link_stats is not None:
+            for result in report["motors"].values():
+                link_stats.record_rtt(result["rtt"])
+        callback, self._deployment_callback = self._deployment_callback, None
+        if callback is not None:
             try:
-                if self.hardware_controller.send_thrust_data(motor_name):
-                    success_count += 1
-                # 短暂延迟，避免发送过快
-                time.sleep(0.05)
+                callback(report)
             except Exception as e:
-                print(f"发送电机 {motor_name} 推力曲线失败: {str(e)}")
+                print(f"推力曲线部署回调出错: {str(e)}")
+
+    def _wait_for_next_deadline(self):
+        """
+        定频模式：等待下一个发送截止时间
 
-        print(f"推力曲线发送完成: {success_count}/6 个电机成功")
-        return success_count > 0
+        截止时间在上一个截止时间上累加一个周期，而不是从本次唤醒时刻起算，
+        因此单次唤醒延迟不会累积成频率漂移；落后超过一个周期时（如系统卡顿）
+        直接跳过积压的周期，避免突发补发一串过期的控制帧。
+        """
+        now = time.perf_counter()
+        if self._next_deadline is None:
+            self._next_deadline = now
+
+        remaining = self._next_deadline - now
+        if remaining > 0:
+            # 使用 Event.wait 而不是 sleep，stop() 可以立即唤醒线程
+            self.task_event.wait(timeout=remaining)
+            self.task_event.clear()
+
+        self._next_deadline += self.send_period
+        lag = time.perf_counter() - self._next_deadline
+        if lag > self.send_period:
+            skipped = int(lag / self.send_period)
+            self.missed_deadlines += skipped
+            self._next_deadline += skipped * self.send_period
 
     def trigger_communication(self):
-        """触发通信任务"""
+        """触发通信任务（fixed_rate 模式下由线程自行调度，忽略触发）"""
+        if self.send_mode == "fixed_rate":
+            return
         if not self.task_in_progress:
-            self.task_event.set()
+            if self.reactor is not None:
+                self.reactor.call_soon_threadsafe(self._send_now)
+            else:
+                self.task_event.set()
 
     def stop(self):
         """停止线程"""
         self.running = False
         self.task_event.set()  # 确保线程不会卡在wait()
+        if self.reactor is not None:
+            for timer in self._reactor_timers:
+                timer.cancel()
+            if self._deployment_timer is not None:
+                self._deployment_timer.cancel()
+            if self.hardware_controller.client_socket is not None:
+                self.reactor.remove_reader(self.hardware_controller.client_socket)
 
 
 class DepthTemperatureThread(threading.Thread):
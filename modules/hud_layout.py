@@ -0,0 +1,75 @@
+"""
+HUD 布局模块
+按 (窗口尺寸, 竖屏, 字体) 计算一次 HUD 各栏的锚点并缓存，每次刷新只查表，不再逐行计算位置
+"""
+
+
+class HudLayout:
+    """
+    HUD 几何布局
+
+    三栏：
+    - left：左上角的控制量与模式名，逐行向下（竖屏时沿 x 方向排列、底部对齐窗口下沿）
+    - right：右上角的传感器/状态行，右对齐窗口右边距（竖屏时排在左侧 y=250 处）
+    - catch：竖屏时抓取模式名的单独位置（只有竖屏布局有这一栏，横屏时接在 left 栏之后）
+
+    anchor() 返回 (x, y, 对齐方式)，对齐方式为 "left" 或 "right"（右对齐时 x 为文字右缘）。
+    右对齐的宽度由 UIController 排版时用已缓存的字形步进求和，不再调用 font.size()。
+    update() 发现窗口尺寸、竖屏状态或字体变化时才重新计算（缩放窗口、切换全屏或旋转后）。
+    """
+
+    def __init__(self, settings):
+        """
+        参数:
+            settings: 界面设置字典，使用 padding / y_h / y_offset
+        """
+        self.settings = settings
+        self.rebuilds = 0  # 重新计算布局的次数
+        self._key = None
+        self._columns = {}  # 栏名 -> (x0, y0, dx, dy, 对齐方式)
+        self._anchors = {}  # (栏名, 行号) -> (x, y, 对齐方式)
+
+    def update(self, screen_size, rotate, font):
+        """
+        确认布局与当前窗口一致，必要时重新计算
+
+        返回:
+            HudLayout: self，便于链式调用
+        """
+        key = (screen_size, rotate, font)
+        if key != self._key:
+            self._key = key
+            self._build(screen_size, rotate)
+        return self
+
+    def invalidate(self):
+        """强制下次 update() 重新计算"""
+        self._key = None
+
+    def anchor(self, column, index=0):
+        """返回某栏第 index 行的锚点 (x, y, 对齐方式)"""
+        anchor = self._anchors.get((column, index))
+        if anchor is None:
+            x0, y0, dx, dy, align = self._columns[column]
+            anchor = (x0 + dx * index, y0 + dy * index, align)
+            self._anchors[(column, index)] = anchor
+        return anchor
+
+    def _build(self, screen_size, rotate):
+        screen_width, screen_height = screen_size
+        padding = self.settings['padding']
+        y_h = self.settings['y_h']
+        step = self.settings['y_offset']
+        if rotate:
+            self._columns = {
+                "left": (y_h + padding, screen_height - padding, step, 0, "left"),
+                "right": (padding, 250, step, 0, "left"),
+                "catch": (y_h + screen_width - 100, screen_height - padding, 0, 0, "left"),
+            }
+        else:
+            self._columns = {
+                "left": (padding, y_h + padding, 0, step, "left"),
+                "right": (screen_width - padding, y_h + padding, 0, step, "right"),
+            }
+        self._anchors = {}
+        self.rebuilds += 1
@@ -0,0 +1,221 @@
+"""
+I/O 反应器模块
+基于 selectors 的单线程事件循环，统一管理套接字/管道的可读回调和定时任务
+"""
+
+import heapq
+import itertools
+import selectors
+import socket
+import threading
+import time
+
+
+class TimerHandle:
+    """定时任务句柄，接口与 threading.Timer 的 cancel() 保持一致"""
+
+    __slots__ = ("when", "interval", "callback", "args", "cancelled", "missed")
+
+    def __init__(self, when, interval, callback, args):
+        self.when = when  # 下一次触发时刻（perf_counter）
+        self.interval = interval  # 周期任务的间隔，单次任务为 None
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self.missed = 0  # 周期任务因回调阻塞而跳过的周期数
+
+    def cancel(self):
+        """取消任务；已经在执行的回调不受影响"""
+        self.cancelled = True
+
+
+class IOReactor(threading.Thread):
+    """
+    I/O 反应器线程
+
+    一个线程内用 selectors 等待所有已注册文件对象的可读事件，select 的超时
+    取最近一个定时任务的截止时间，因此定时回调的唤醒精度由系统调度决定，
+    而不是由固定的 sleep 步长决定。其他线程注册/取消任务后通过 socketpair
+    唤醒 select，新任务立即生效。
+
+    所有回调都在反应器线程中串行执行，回调内不能阻塞。
+    Windows 的 select 只支持套接字，管道无法注册（add_reader 会抛出异常，由调用方回退到线程）。
+    """
+
+    def __init__(self, name="IOReactor"):
+        super().__init__(name=name, daemon=True)
+        self.running = True
+        self.callback_errors = 0  # 回调抛出异常的次数
+
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._timers = []  # (when, 序号, TimerHandle) 小顶堆
+        self._ready = []  # 待执行的即时回调
+        self._sequence = itertools.count()
+
+        # 唤醒通道：其他线程写入一个字节即可打断 select
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ, self._drain_wakeup)
+
+    # ─── 注册接口（线程安全） ───────────────────────
+
+    def add_reader(self, fileobj, callback):
+        """
+        注册可读回调
+
+        参数:
+            fileobj: 套接字或带 fileno() 的文件对象
+            callback: 可读时调用 callback(fileobj)
+
+        异常:
+            ValueError/OSError: 当前平台的 selector 不支持该文件对象
+        """
+        with self._lock:
+            self._selector.register(fileobj, selectors.EVENT_READ, callback)
+        self._wakeup()
+
+    def remove_reader(self, fileobj):
+        """取消可读回调，文件对象未注册或已关闭时静默忽略"""
+        with self._lock:
+            try:
+                self._selector.unregister(fileobj)
+            except (KeyError, ValueError, OSError):
+                return False
+        self._wakeup()
+        return True
+
+    def call_later(self, delay, callback, *args):
+        """delay 秒后在反应器线程中执行一次 callback(*args)，返回 TimerHandle"""
+        handle = TimerHandle(time.perf_counter() + max(0.0, delay), None, callback, args)
+        self._push_timer(handle)
+        return handle
+
+    def call_every(self, interval, callback, *args):
+        """
+        每 interval 秒执行一次 callback(*args)，返回 TimerHandle
+
+        截止时间按固定周期累加，单次唤醒延迟不会累积成频率漂移；
+        落后超过一个周期时跳过积压的周期（计入 handle.missed），不会突发补执行。
+        """
+        if interval <= 0:
+            raise ValueError("定时周期必须大于 0")
+        handle = TimerHandle(time.perf_counter() + interval, interval, callback, args)
+        self._push_timer(handle)
+        return handle
+
+    def call_soon_threadsafe(self, callback, *args):
+        """从任意线程投递一个回调，反应器线程会尽快执行"""
+        with self._lock:
+            self._ready.append((callback, args))
+        self._wakeup()
+
+    def stop(self):
+        """停止反应器线程"""
+        self.running = False
+        self._wakeup()
+
+    # ─── 内部实现 ───────────────────────────────────
+
+    def _push_timer(self, handle):
+        with self._lock:
+            heapq.heappush(self._timers, (handle.when, next(self._sequence), handle))
+        self._wakeup()
+
+    def _wakeup(self):
+        """在非反应器线程中打断 select"""
+        if threading.current_thread() is self:
+            return
+        try:
+            self._wakeup_send.send(b"\x00")
+        except (BlockingIOError, OSError):
+            # 缓冲区已满说明反应器已经有待处理的唤醒，套接字关闭说明反应器已退出
+            pass
+
+    def _drain_wakeup(self, _sock):
+        try:
+            while self._wakeup_recv.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _next_timeout(self):
+        """计算 select 的超时：有即时回调时不等待，否则等到最近的定时任务"""
+        with self._lock:
+            if self._ready:
+                return 0
+            while self._timers and self._timers[0][2].cancelled:
+                heapq.heappop(self._timers)
+            if not self._timers:
+                return None
+            return max(0.0, self._timers[0][0] - time.perf_counter())
+
+    def _invoke(self, callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            self.callback_errors += 1
+            print(f"反应器回调执行出错 ({getattr(callback, '__name__', callback)}): {e}")
+
+    def _run_ready(self):
+        with self._lock:
+            ready, self._ready = self._ready, []
+        for callback, args in ready:
+            self._invoke(callback, *args)
+
+    def _run_timers(self):
+        now = time.perf_counter()
+        due = []
+        with self._lock:
+            while self._timers and self._timers[0][0] <= now:
+                _, _, handle = heapq.heappop(self._timers)
+                if not handle.cancelled:
+                    due.append(handle)
+
+        for handle in due:
+            self._invoke(handle.callback, *handle.args)
+            if handle.interval is None or handle.cancelled:
+                continue
+
+            handle.when += handle.interval
+            lag = time.perf_counter() - handle.when
+            if lag > handle.interval:
+                skipped = int(lag / handle.interval)
+                handle.missed += skipped
+                handle.when += skipped * handle.interval
+            with self._lock:
+                heapq.heappush(self._timers, (handle.when, next(self._sequence), handle))
+
+    def run(self):
+        """反应器主循环"""
+        try:
+            while self.running:
+                timeout = self._next_timeout()
+                try:
+                    events = self._selector.select(timeout)
+                except OSError as e:
+                    # 某个已注册的文件对象被外部关闭，丢弃失效的注册后继续
+                    print(f"反应器 select 出错: {e}")
+                    self._discard_closed()
+                    continue
+
+                for key, _ in events:
+                    self._invoke(key.data, key.fileobj)
+                self._run_ready()
+                self._run_timers()
+        finally:
+            self._selector.close()
+            self._wakeup_recv.close()
+            self._wakeup_send.close()
+
+    def _discard_closed(self):
+        """移除已经关闭的文件对象"""
+        with self._lock:
+            for key in list(self._selector.get_map().values()):
+                try:
+                    fd = key.fileobj if isinstance(key.fileobj, int) else key.fileobj.fileno()
+                except (OSError, ValueError):
+                    fd = -1
+                if fd < 0:
+                    self._selector.unregister(key.fileobj)
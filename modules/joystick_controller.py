@@ -374,6 +374,9 @@ class JoystickController:
         # 处理舵机控制
         self.process_servo_controls()
 
+        # 本周期的控制量全部写完后一次性发布，网络线程只读取发布后的快照
+        self.controller_monitor.publish()
+
         return False  # 继续处理其他输入
 
     def set_depth_temp_block(self):
@@ -0,0 +1,198 @@
+"""
+链路质量统计模块
+根据运动控制帧的发送时刻和深度/温度帧的到达时刻估计 ROV UDP 链路的到达间隔波动、丢包和数据新鲜度
+"""
+
+import collections
+import math
+import threading
+import time
+
+
+def _percentile(sorted_values, q):
+    """最近秩百分位数，sorted_values 已升序"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LinkStatistics:
+    """
+    链路质量估计器
+
+    - 到达间隔：EWMA 均值 + 滑动窗口百分位（p50/p95/p99）
+    - 间隔偏差：|到达间隔 - 间隔 EWMA| 的 1/16 平滑。传感器帧不带发送时间戳，
+      无法按 RFC 3550 计算传输时延差的抖动，这里只反映到达间隔相对均值的波动
+    - 丢包：下位机按固定频率回传深度/温度，每个到达间隔折算成应到帧数，多出的部分计为丢失；
+      未配置期望频率时以窗口内间隔的中位数作为名义周期
+    - 新鲜度：距最后一帧传感器数据的时间
+    - 往返时延：由推力曲线应答等请求/应答交互提供
+
+    记录接口在网络线程调用，snapshot() 可在任意线程调用。
+    每次记录使窗口代数加一，snapshot() 只在代数变化后重新排序窗口，界面逐帧调用时复用上次的排序结果。
+    """
+
+    # 链路状态判定阈值
+    STALE_LOST_S = 1.0  # 超过该时间未收到传感器数据视为链路中断
+    DEGRADED_LOSS_RATIO = 0.05
+    DEGRADED_STALE_PERIODS = 5  # 超过名义周期的倍数视为降级
+
+    def __init__(self, expected_sensor_hz=0.0, window=256, alpha=0.1):
+        """
+        参数:
+            expected_sensor_hz: 下位机深度/温度帧的回传频率，0 表示自动估计
+            window: 百分位与丢包统计的滑动窗口（帧数）
+            alpha: EWMA 平滑系数
+        """
+        self.expected_period = 1.0 / expected_sensor_hz if expected_sensor_hz > 0 else None
+        self.alpha = alpha
+        self._lock = threading.Lock()
+
+        self.tx_frames = 0
+        self.tx_failures = 0
+        self._last_tx = None
+        self._tx_interval = None  # 发送间隔 EWMA
+
+        self.rx_frames = 0
+        self._last_rx = None
+        self._rx_interval = None  # 到达间隔 EWMA
+        self._interval_deviation = 0.0
+        self._intervals = collections.deque(maxlen=window)
+        self._lost = collections.deque(maxlen=window)  # 每个间隔推算的丢失帧数
+        self.lost_frames = 0
+
+        self._rtt = None
+        self._rtts = collections.deque(maxlen=64)
+
+        # 排序后的窗口缓存：(代数, 到达间隔, 往返时延)
+        self._window_generation = 0
+        self._sorted_windows = (None, [], [])
+
+    def _ewma(self, current, sample):
+        return sample if current is None else current + self.alpha * (sample - current)
+
+    def record_sent(self, timestamp=None):
+        """记录一帧运动控制数据发送成功"""
+        now = time.perf_counter() if timestamp is None else timestamp
+        with self._lock:
+            self.tx_frames += 1
+            if self._last_tx is not None:
+                self._tx_interval = self._ewma(self._tx_interval, now - self._last_tx)
+            self._last_tx = now
+
+    def record_send_failure(self):
+        with self._lock:
+            self.tx_failures += 1
+
+    def record_received(self, timestamp=None):
+        """记录一帧深度/温度数据到达"""
+        now = time.perf_counter() if timestamp is None else timestamp
+        with self._lock:
+            self.rx_frames += 1
+            if self._last_rx is not None:
+                interval = now - self._last_rx
+                self._intervals.append(interval)
+                self._window_generation += 1
+                if self._rx_interval is not None:
+                    deviation = abs(interval - self._rx_interval)
+                    self._interval_deviation += (deviation - self._interval_deviation) / 16.0
+                self._rx_interval = self._ewma(self._rx_interval, interval)
+
+                period = self._nominal_period()
+                lost = max(0, int(round(interval / period)) - 1) if period else 0
+                self._lost.append(lost)
+                self.lost_frames += lost
+            self._last_rx = now
+
+    def record_rtt(self, rtt):
+        """记录一次请求/应答往返时间（秒）"""
+        if rtt is None:
+            return
+        with self._lock:
+            self._rtt = self._ewma(self._rtt, rtt)
+            self._rtts.append(rtt)
+            self._window_generation += 1
+
+    def _nominal_period(self, intervals=None):
+        """名义周期；intervals 为已排序的到达间隔窗口，省略时现场排序"""
+        if self.expected_period is not None:
+            return self.expected_period
+        if len(self._intervals) < 8:
+            return None
+        return _percentile(intervals if intervals is not None else sorted(self._intervals), 50)
+
+    def _sorted(self):
+        """返回排序后的 (到达间隔, 往返时延) 窗口，窗口代数未变时直接复用（调用方持有锁）"""
+        generation, intervals, rtts = self._sorted_windows
+        if generation != self._window_generation:
+            intervals = sorted(self._intervals)
+            rtts = sorted(self._rtts)
+            self._sorted_windows = (self._window_generation, intervals, rtts)
+        return intervals, rtts
+
+    def snapshot(self, now=None):
+        """
+        返回当前链路统计
+
+        返回:
+            dict: status（ok/degraded/lost/no_data）、tx/rx 帧数与频率、到达间隔百分位、
+                  interval_deviation_ms、loss_ratio、staleness_s、rtt_ms 等；无数据的字段为 None
+        """
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            intervals, rtts = self._sorted()
+            received_in_window = len(self._lost)
+            lost_in_window = sum(self._lost)
+            period = self._nominal_period(intervals)
+            snapshot = {
+                "tx_frames": self.tx_frames,
+                "tx_failures": self.tx_failures,
+                "tx_rate_hz": 1.0 / self._tx_interval if self._tx_interval else None,
+                "rx_frames": self.rx_frames,
+                "rx_rate_hz": 1.0 / self._rx_interval if self._rx_interval else None,
+                "interval_ms": self._rx_interval * 1000 if self._rx_interval is not None else None,
+                "interval_p50_ms": None,
+                "interval_p95_ms": None,
+                "interval_p99_ms": None,
+                "interval_deviation_ms": self._interval_deviation * 1000 if self._rx_interval is not None else None,
+                "lost_frames": self.lost_frames,
+                "loss_ratio": lost_in_window / (lost_in_window + received_in_window)
+                if received_in_window else None,
+                "staleness_s": now - self._last_rx if self._last_rx is not None else None,
+                "rtt_ms": self._rtt * 1000 if self._rtt is not None else None,
+                "rtt_p95_ms": _percentile(rtts, 95) * 1000 if rtts else None,
+            }
+        for q in (50, 95, 99):
+            if intervals:
+                snapshot[f"interval_p{q}_ms"] = _percentile(intervals, q) * 1000
+        snapshot["status"] = self._classify(snapshot, period)
+        return snapshot
+
+    def _classify(self, snapshot, period):
+        staleness = snapshot["staleness_s"]
+        if staleness is None:
+            return "no_data"
+        if staleness > self.STALE_LOST_S:
+            return "lost"
+        loss_ratio = snapshot["loss_ratio"] or 0.0
+        if loss_ratio > self.DEGRADED_LOSS_RATIO:
+            return "degraded"
+        if period and staleness > self.DEGRADED_STALE_PERIODS * period:
+            return "degraded"
+        return "ok"
+
+
+def format_link_summary(snapshot):
+    """把 snapshot 格式化为一行日志/界面文本"""
+    status_names = {"ok": "正常", "degraded": "降级", "lost": "中断", "no_data": "无数据"}
+    parts = [f"链路: {status_names.get(snapshot['status'], snapshot['status'])}"]
+    if snapshot["loss_ratio"] is not None:
+        parts.append(f"丢包 {snapshot['loss_ratio'] * 100:.1f}%")
+    if snapshot["interval_deviation_ms"] is not None:
+        parts.append(f"间隔偏差 {snapshot['interval_deviation_ms']:.1f}ms")
+    if snapshot["staleness_s"] is not None and snapshot["status"] != "ok":
+        parts.append(f"{snapshot['staleness_s']:.1f}s 未更新")
+    if snapshot["rtt_ms"] is not None:
+        parts.append(f"RTT {snapshot['rtt_ms']:.1f}ms")
+    return " ".join(parts)
@@ -54,7 +54,13 @@ class MainController:
         self._init_motors()
 
         # 初始化网络工作线程
-        self.network_worker = NetworkWorker(self.hw_controller, self.controller_monitor)
+        network_settings = self.config_manager.get_network_settings()
+        self.network_worker = NetworkWorker(
+            self.hw_controller,
+            self.controller_monitor,
+            send_mode=network_settings["send_mode"],
+            send_rate_hz=network_settings["send_rate_hz"]
+        )
         self.network_worker.start()
 
         # 初始化视频处理线程
@@ -0,0 +1,144 @@
+"""
+画面呈现模块
+把视频显示与 HUD 绘制放到独立的渲染线程，输入/控制循环只发布遥测快照，不再等待缩放和绘制
+"""
+
+import collections
+import threading
+import time
+
+from modules.link_stats import _percentile
+
+
+class LoopTimer:
+    """
+    周期循环的耗时统计
+
+    每次迭代记录开始与结束时刻：工作耗时超过周期预算的计为一次超时（卡顿），
+    相邻两次开始时刻之差为实际周期。record() 在循环线程调用，snapshot() 可在任意线程调用。
+    """
+
+    def __init__(self, period, window=512):
+        """
+        参数:
+            period: 目标周期（秒），作为单次迭代的耗时预算
+            window: 计算百分位的滑动窗口长度
+        """
+        self.period = period
+        self.iterations = 0
+        self.overruns = 0  # 工作耗时超过周期预算的次数
+        self.max_work = 0.0
+        self._work = collections.deque(maxlen=window)
+        self._intervals = collections.deque(maxlen=window)
+        self._last_start = None
+        self._lock = threading.Lock()
+
+    def record(self, started, finished):
+        """记录一次迭代（time.perf_counter() 时刻）"""
+        work = finished - started
+        with self._lock:
+            if self._last_start is not None:
+                self._intervals.append(started - self._last_start)
+            self._last_start = started
+            self._work.append(work)
+            self.iterations += 1
+            if work > self.period:
+                self.overruns += 1
+            self.max_work = max(self.max_work, work)
+
+    def snapshot(self):
+        """返回统计字典，耗时单位为毫秒；样本不足时对应项为 None"""
+        with self._lock:
+            work = sorted(self._work)
+            intervals = sorted(self._intervals)
+            snapshot = {
+                "iterations": self.iterations,
+                "overruns": self.overruns,
+                "target_hz": 1.0 / self.period,
+                "rate_hz": len(intervals) / sum(intervals) if intervals and sum(intervals) > 0 else None,
+                "work_max_ms": self.max_work * 1000 if self.iterations else None,
+            }
+        for q in (50, 95, 99):
+            snapshot[f"work_p{q}_ms"] = _percentile(work, q) * 1000 if work else None
+            snapshot[f"interval_p{q}_ms"] = _percentile(intervals, q) * 1000 if intervals else None
+        return snapshot
+
+
+def format_loop_summary(name, snapshot):
+    """把 LoopTimer.snapshot() 格式化为一行日志"""
+    if not snapshot["iterations"]:
+        return f"{name}: 尚无数据"
+    rate = f"{snapshot['rate_hz']:.1f}" if snapshot["rate_hz"] is not None else "-"
+    return (f"{name}: {snapshot['iterations']} 次，{rate}/{snapshot['target_hz']:.0f} Hz，"
+            f"耗时 p50 {snapshot['work_p50_ms']:.2f} ms / p99 {snapshot['work_p99_ms']:.2f} ms / "
+            f"最大 {snapshot['work_max_ms']:.2f} ms，超时 {snapshot['overruns']} 次")
+
+
+class Presenter(threading.Thread):
+    """
+    渲染线程
+
+    以 fps 为目标帧率调用 UIController.display_frame / display_controller_data / update_display。
+    两个线程之间只交接两样东西：
+    - 视频帧：由 frame_source() 从 VideoThread 的帧环形缓冲区取最新的 (帧, 序号)
+    - 遥测：主线程每个控制周期调用 publish() 整体替换遥测字典的引用，发布后不再修改
+
+    绘制期间持有 UIController.render_lock，主线程切换全屏重建窗口时也要先取得该锁。
+    渲染耗时由 timing（LoopTimer）单独统计，超过帧周期的计为一次渲染卡顿。
+    """
+
+    def __init__(self, ui_controller, frame_source, fps=60):
+        """
+        参数:
+            ui_controller: UIController 实例
+            frame_source: 无参可调用对象，返回 (帧, 序号)；无画面时帧为 None
+            fps: 目标渲染帧率
+        """
+        super().__init__(daemon=True)
+        self.ui_controller = ui_controller
+        self.frame_source = frame_source
+        self.period = 1.0 / max(1.0, float(fps))
+        self.timing = LoopTimer(self.period)
+        self.telemetry = None  # display_controller_data 的关键字参数，None 时只显示画面
+        self.running = True
+        self._stop_event = threading.Event()
+
+    def publish(self, telemetry):
+        """发布新的遥测快照（主线程调用）；单次引用赋值，渲染线程要么拿到旧字典要么拿到新字典"""
+        self.telemetry = telemetry
+
+    def run(self):
+        """线程主循环：截止时间按固定周期累加，落后时从当前时刻重新计时而不连续补帧"""
+        deadline = time.perf_counter()
+        while self.running:
+            started = time.perf_counter()
+            try:
+                self.render_once()
+            except Exception as e:
+                print(f"渲染线程异常: {str(e)}")
+            self.timing.record(started, time.perf_counter())
+
+            deadline += self.period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                deadline = time.perf_counter()
+
+    def render_once(self):
+        """绘制一帧画面与最新遥测"""
+        frame, frame_seq = self.frame_source()
+        telemetry = self.telemetry
+        ui = self.ui_controller
+        with ui.render_lock:
+            ui.display_frame(frame, frame_seq)
+            if telemetry is not None:
+                ui.display_controller_data(**telemetry)
+            ui.update_display()
+
+    def stop(self, timeout=1.0):
+        """停止渲染线程并等待当前帧画完"""
+        self.running = False
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
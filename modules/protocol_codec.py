@@ -0,0 +1,272 @@
+"""
+下位机协议编解码模块
+使用预编译的 struct.Struct 打包/解析二进制协议帧，供高频控制与回放工具复用
+"""
+
+import struct
+import time
+
+# 下位机协议帧常量
+FRAME_HEADER = b"\xFA\xAF"
+FRAME_FOOTER = b"\xFB\xBF"
+CMD_MOTION_CTRL = 0x01
+CMD_THRUST_CONFIG = 0x02
+CMD_DEPTH_TEMP = 0x03
+CMD_THRUST_ACK = 0x04
+CMD_MOTION_CTRL_V2 = 0x05  # 带序号和时间戳的运动控制帧
+CMD_PROTO_HELLO = 0x06  # 协议协商/心跳请求
+CMD_PROTO_HELLO_ACK = 0x07  # 协议协商应答
+
+# 上位机支持的最高运动控制协议版本
+PROTOCOL_VERSION = 2
+
+# 上位机会收到的定长协议帧（含帧头帧尾），用于切分同一数据报中粘连的多帧
+FRAME_LENGTHS = {
+    CMD_DEPTH_TEMP: 14,
+    CMD_THRUST_ACK: 6,
+    CMD_PROTO_HELLO_ACK: 19,
+}
+
+# 下位机会收到的定长协议帧，供回环测试的模拟下位机解析
+HOST_FRAME_LENGTHS = {
+    CMD_MOTION_CTRL: 34,
+    CMD_THRUST_CONFIG: 39,
+    CMD_MOTION_CTRL_V2: 40,
+    CMD_PROTO_HELLO: 13,
+}
+
+# 运动控制帧: 帧头(2) + 命令(1) + 7 个 float(28) + 校验(1) + 帧尾(2) = 34 字节
+MOTION_FRAME_SIZE = 34
+MOTION_VALUES = struct.Struct('<7f')
+# v2 运动控制帧: 帧头(2) + 命令(1) + 序号 u16 + 时间戳 u32(ms) + 7 个 float + 校验(1) + 帧尾(2) = 40 字节
+MOTION_V2_FRAME_SIZE = 40
+MOTION_V2_VALUES = struct.Struct('<HI7f')
+PROTO_HELLO_PAYLOAD = struct.Struct('<BIH')  # 上位机最高版本、上位机时间戳、会话号
+PROTO_HELLO_ACK_PAYLOAD = struct.Struct('<BIIHH')  # 下位机版本、回显时间戳、下位机时钟、最后接受的序号、丢弃帧数
+THRUST_CONFIG_PAYLOAD = struct.Struct('<B8f')
+DEPTH_TEMP_PAYLOAD = struct.Struct('<2f')
+
+# 推力曲线参数在 CMD_THRUST_CONFIG 中的顺序
+THRUST_PARAM_KEYS = ("np_mid", "np_ini", "pp_ini", "pp_mid", "nt_end", "nt_mid", "pt_mid", "pt_end")
+
+
+def _fold_shifts(length):
+    """计算把 length 字节整数折叠到 1 字节所需的右移位数序列"""
+    shifts = []
+    shift = 4 << (length - 1).bit_length()
+    while shift >= 8:
+        shifts.append(shift)
+        shift >>= 1
+    return tuple(shifts)
+
+
+# 常见帧长度的折叠序列预先算好
+_FOLD_SHIFTS = {length: _fold_shifts(length) for length in range(1, 65)}
+
+
+def xor_checksum(data):
+    """
+    计算协议定义的 XOR 校验值
+
+    把整段数据当作一个大整数，每次将高半部分异或到低半部分，
+    log2(n) 次折叠后最低字节即为全部字节的异或，避免逐字节的 Python 循环。
+    """
+    value = int.from_bytes(data, 'little')
+    shifts = _FOLD_SHIFTS.get(len(data))
+    if shifts is None:
+        shifts = _fold_shifts(len(data))
+    for shift in shifts:
+        value ^= value >> shift
+    return value & 0xFF
+
+
+def build_frame(command, payload=b""):
+    """构造带帧头、XOR 校验和帧尾的协议帧。"""
+    body = bytes((command,)) + payload
+    return FRAME_HEADER + body + bytes((xor_checksum(body),)) + FRAME_FOOTER
+
+
+def timestamp_ms():
+    """协议时间戳：单调时钟毫秒数，按 u32 回绕"""
+    return int(time.monotonic() * 1000) & 0xFFFFFFFF
+
+
+def seq_newer(seq, last_seq):
+    """16 位序号的回绕比较（RFC 1982），seq 比 last_seq 新时返回 True"""
+    return 0 < ((seq - last_seq) & 0xFFFF) < 0x8000
+
+
+def parse_frame(frame, lengths=FRAME_LENGTHS):
+    """
+    解析一个下位机协议帧。
+
+    返回 (command, payload)，帧格式错误时返回 None。
+    CMD_THRUST_ACK 是协议中唯一不带 XOR 校验的应答帧。
+    lengths 为允许的命令及帧长，解析上位机发出的帧时传入 HOST_FRAME_LENGTHS。
+    """
+    if len(frame) < 6:
+        return None
+    if frame[:2] != FRAME_HEADER or frame[-2:] != FRAME_FOOTER:
+        return None
+
+    command = frame[2]
+    if command == CMD_THRUST_ACK:
+        if len(frame) != 6:
+            return None
+        return command, frame[3:4]
+
+    if command not in lengths or len(frame) != lengths[command]:
+        return None
+
+    # frame[2:-3] 覆盖命令字和全部数据，不包含校验字节及帧尾。
+    if frame[-3] != xor_checksum(frame[2:-3]):
+        return None
+    return command, frame[3:-3]
+
+
+def _find_header(data, start):
+    """
+    查找 data[start:] 中的下一个帧头，找不到返回 -1
+
+    memoryview 没有 find：帧紧挨着时直接比较 start 处的两个字节，
+    只有需要跳过垃圾数据重新同步时才把剩余部分拷成 bytes 搜索。
+    """
+    if not isinstance(data, memoryview):
+        return data.find(FRAME_HEADER, start)
+    if data[start:start + 2] == FRAME_HEADER:
+        return start
+    index = bytes(data[start:]).find(FRAME_HEADER)
+    return index if index < 0 else start + index
+
+
+def split_frames(data, lengths=FRAME_LENGTHS):
+    """
+    切分一个数据报中的全部协议帧（下位机可能把多帧合并在一个数据报里发送）。
+
+    返回 (frames, malformed)：frames 为 (command, payload) 列表，
+    malformed 为无法解析而被跳过的帧数，跳过后重新同步到下一个帧头。
+    data 可以是接收缓冲区的 memoryview，此时 payload 也是该缓冲区的视图，
+    下一次接收覆盖缓冲区前必须处理完或复制。
+    """
+    frames = []
+    malformed = 0
+    start = _find_header(data, 0)
+    while 0 <= start < len(data) - 2:
+        length = lengths.get(data[start + 2])
+        parsed = parse_frame(data[start:start + length], lengths) if length else None
+        if parsed is None:
+            malformed += 1
+            start = _find_header(data, start + 2)
+            continue
+        frames.append(parsed)
+        start = _find_header(data, start + length)
+    return frames, malformed
+
+
+def encode_thrust_config(params):
+    """打包单个电机的 CMD_THRUST_CONFIG 帧"""
+    payload = THRUST_CONFIG_PAYLOAD.pack(int(params['num']),
+                                         *(float(params[key]) for key in THRUST_PARAM_KEYS))
+    return build_frame(CMD_THRUST_CONFIG, payload)
+
+
+def decode_depth_temperature(payload):
+    """解析 CMD_DEPTH_TEMP 数据区，返回 (depth, temperature)"""
+    return DEPTH_TEMP_PAYLOAD.unpack(payload)
+
+
+def encode_hello(host_timestamp, session=0, version=PROTOCOL_VERSION):
+    """打包 CMD_PROTO_HELLO 帧；session 变化时下位机才重新开始跟踪 v2 序号"""
+    return build_frame(CMD_PROTO_HELLO, PROTO_HELLO_PAYLOAD.pack(version, host_timestamp, session))
+
+
+def decode_hello_ack(payload):
+    """解析 CMD_PROTO_HELLO_ACK 数据区"""
+    version, echo_timestamp, remote_clock, last_seq, dropped = PROTO_HELLO_ACK_PAYLOAD.unpack(payload)
+    return {
+        "version": version,
+        "echo_timestamp": echo_timestamp,
+        "remote_clock": remote_clock,
+        "last_seq": last_seq,
+        "dropped": dropped,
+    }
+
+
+class MotionFrameEncoder:
+    """
+    CMD_MOTION_CTRL 帧编码器
+
+    帧头、命令字和帧尾只写入一次，之后每帧只用 pack_into 原地覆盖 7 个 float
+    并重算校验字节，编码过程不分配新对象。
+    注意：encode 返回的是内部复用的 bytearray，下一次编码前必须已经发送或复制。
+    """
+
+    def __init__(self):
+        self.buffer = bytearray(MOTION_FRAME_SIZE)
+        self.buffer[0:2] = FRAME_HEADER
+        self.buffer[2] = CMD_MOTION_CTRL
+        self.buffer[-2:] = FRAME_FOOTER
+        # 校验范围：从命令字到 servo0 末尾
+        self._checksum_view = memoryview(self.buffer)[2:31]
+
+    def encode(self, x, y, z, roll, pitch, yaw, servo):
+        """按协议字段顺序编码一帧运动控制数据"""
+        buffer = self.buffer
+        MOTION_VALUES.pack_into(buffer, 3, x, y, z, roll, pitch, yaw, servo)
+        # 校验范围固定 29 字节，展开 xor_checksum 的折叠（补齐到 32 字节），省去循环和函数调用
+        value = int.from_bytes(self._checksum_view, 'little')
+        value ^= value >> 128
+        value ^= value >> 64
+        value ^= value >> 32
+        value ^= value >> 16
+        value ^= value >> 8
+        buffer[31] = value & 0xFF
+        return buffer
+
+    def encode_controller(self, controller_data):
+        """
+        从控制器数据字典编码一帧
+
+        上位机的 x/y 与下位机坐标系互换，yaw 取反；roll/pitch 兼容旧键名 rx/ry。
+        ControllerMonitor 的字典总是包含 x/y/z/yaw/servo0，直接下标访问；
+        缺键时才走逐键回退的慢路径。
+        """
+        try:
+            x = controller_data["y"]
+            y = controller_data["x"]
+            z = controller_data["z"]
+            yaw = controller_data["yaw"]
+            servo = controller_data["servo0"]
+        except KeyError:
+            get = controller_data.get
+            x, y, z, servo = get("y", 0.0), get("x", 0.0), get("z", 0.0), get("servo0", 0.0)
+            yaw = get("yaw")
+            if yaw is None:
+                yaw = get("rz", 0.0)
+        roll = controller_data["roll"] if "roll" in controller_data else controller_data.get("rx", 0.0)
+        pitch = controller_data["pitch"] if "pitch" in controller_data else controller_data.get("ry", 0.0)
+        return self.encode(x, y, z, roll, pitch, -yaw, servo)
+
+
+class MotionFrameEncoderV2(MotionFrameEncoder):
+    """
+    CMD_MOTION_CTRL_V2 帧编码器
+
+    在 7 个 float 之前附加 16 位序号和 32 位毫秒时间戳，下位机据此丢弃乱序/重复/过期的帧。
+    """
+
+    def __init__(self):
+        self.buffer = bytearray(MOTION_V2_FRAME_SIZE)
+        self.buffer[0:2] = FRAME_HEADER
+        self.buffer[2] = CMD_MOTION_CTRL_V2
+        self.buffer[-2:] = FRAME_FOOTER
+        self._checksum_view = memoryview(self.buffer)[2:-3]
+        self.sequence = 0  # 下一帧使用的序号
+
+    def encode(self, x, y, z, roll, pitch, yaw, servo):
+        """按协议字段顺序编码一帧，序号自动递增"""
+        buffer = self.buffer
+        MOTION_V2_VALUES.pack_into(buffer, 3, self.sequence, timestamp_ms(), x, y, z, roll, pitch, yaw, servo)
+        buffer[-3] = xor_checksum(self._checksum_view)
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        return buffer
@@ -0,0 +1,111 @@
+"""
+协议回环模块
+在本机 UDP 端口上模拟下位机（protocol_process.c 的行为），用于无硬件时测试上位机协议
+"""
+
+import socket
+import threading
+
+from modules.protocol_codec import (
+    CMD_DEPTH_TEMP,
+    CMD_MOTION_CTRL,
+    CMD_MOTION_CTRL_V2,
+    CMD_PROTO_HELLO,
+    CMD_PROTO_HELLO_ACK,
+    CMD_THRUST_ACK,
+    CMD_THRUST_CONFIG,
+    DEPTH_TEMP_PAYLOAD,
+    FRAME_FOOTER,
+    FRAME_HEADER,
+    HOST_FRAME_LENGTHS,
+    MOTION_V2_VALUES,
+    MOTION_VALUES,
+    PROTO_HELLO_ACK_PAYLOAD,
+    PROTO_HELLO_PAYLOAD,
+    build_frame,
+    seq_newer,
+    split_frames,
+    timestamp_ms,
+)
+
+
+class LoopbackLowerController(threading.Thread):
+    """
+    模拟下位机线程
+
+    - CMD_MOTION_CTRL / CMD_MOTION_CTRL_V2：记录收到的控制量；v2 帧按序号丢弃乱序、重复帧
+      （不模拟固件按时钟偏差丢弃过期帧）
+    - CMD_THRUST_CONFIG：回 CMD_THRUST_ACK
+    - CMD_PROTO_HELLO：protocol_version >= 2 时回 CMD_PROTO_HELLO_ACK，会话号变化时重新跟踪序号；
+      protocol_version < 2 时像旧固件一样忽略
+    - send_depth_temperature() 主动上报深度/温度
+    """
+
+    def __init__(self, protocol_version=2, host="127.0.0.1"):
+        super().__init__(daemon=True)
+        self.protocol_version = protocol_version
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, 0))
+        self.sock.settimeout(0.05)
+        self.running = True
+        self.lock = threading.Lock()
+
+        self.peer = None  # 最近一次发来数据的上位机地址
+        self.motion_frames = []  # (命令, 序号或 None, 时间戳或 None, 7 个控制量)
+        self.thrust_motors = []
+        self.hellos = 0
+        self.last_seq = 0
+        self.seq_valid = False  # 与固件一致：HELLO 的会话号变化后重新开始跟踪序号
+        self.session = None
+        self.dropped = 0  # 因乱序/重复被丢弃的 v2 帧
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def run(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.peer = addr
+            frames, _ = split_frames(data, HOST_FRAME_LENGTHS)
+            for command, payload in frames:
+                self._handle(command, payload, addr)
+
+    def _handle(self, command, payload, addr):
+        with self.lock:
+            if command == CMD_MOTION_CTRL:
+                self.motion_frames.append((command, None, None, MOTION_VALUES.unpack(payload)))
+            elif command == CMD_MOTION_CTRL_V2 and self.protocol_version >= 2:
+                seq, timestamp, *values = MOTION_V2_VALUES.unpack(payload)
+                if self.seq_valid and not seq_newer(seq, self.last_seq):
+                    self.dropped += 1
+                    return
+                self.last_seq = seq
+                self.seq_valid = True
+                self.motion_frames.append((command, seq, timestamp, tuple(values)))
+            elif command == CMD_THRUST_CONFIG:
+                self.thrust_motors.append(payload[0])
+                self.sock.sendto(FRAME_HEADER + bytes((CMD_THRUST_ACK, payload[0])) + FRAME_FOOTER, addr)
+            elif command == CMD_PROTO_HELLO and self.protocol_version >= 2:
+                self.hellos += 1
+                host_version, host_timestamp, session = PROTO_HELLO_PAYLOAD.unpack(payload)
+                if session != self.session:
+                    self.session = session
+                    self.seq_valid = False
+                ack = PROTO_HELLO_ACK_PAYLOAD.pack(min(host_version, self.protocol_version), host_timestamp,
+                                                   timestamp_ms(), self.last_seq, self.dropped & 0xFFFF)
+                self.sock.sendto(build_frame(CMD_PROTO_HELLO_ACK, ack), addr)
+
+    def send_depth_temperature(self, depth, temperature, addr=None):
+        """向上位机上报一帧深度/温度"""
+        self.sock.sendto(build_frame(CMD_DEPTH_TEMP, DEPTH_TEMP_PAYLOAD.pack(depth, temperature)), addr or self.peer)
+
+    def stop(self):
+        self.running = False
+        self.join(timeout=1)
+        self.sock.close()
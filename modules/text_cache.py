@@ -0,0 +1,152 @@
+"""
+文本渲染缓存模块
+缓存 HUD 文本渲染（及竖屏旋转）后的 Surface，数值部分用逐字符的数字图集拼接，遥测数值变化时不必重新渲染整行
+"""
+
+import collections
+import re
+
+import pygame
+
+# 数值片段：可带符号的整数或小数，如 -12.5
+_NUMBER_PATTERN = re.compile(r'([-+]?\d+(?:\.\d+)?)')
+DIGIT_CHARS = "0123456789.-+"
+OUTLINE_COLOR = (0, 0, 0)
+
+
+class TextSurfaceCache:
+    """
+    文本 Surface 的 LRU 缓存
+
+    - label()：按 (文本, 颜色, 加粗, 轮廓, 旋转) 缓存渲染好的文字，轮廓与正文预先合成到一张 Surface，每段只需 blit 一次
+    - glyphs()：同一组样式下 DIGIT_CHARS 每个字符单独渲染成图集，作为一个缓存条目
+    - 条目数与像素字节数都有上限，超出时淘汰最久未用的条目；hits / misses / evictions 统计命中情况
+
+    不加锁：关闭 render_thread 时只在主线程使用；启用时由呈现线程在 UIController.render_lock 下绘制，
+    主线程需要访问时也要先取得该锁。更换字体后调用 set_font()。
+    """
+
+    def __init__(self, font, max_entries=256, max_bytes=4 * 1024 * 1024):
+        """
+        参数:
+            font: pygame.font.Font
+            max_entries: 最多缓存的条目数
+            max_bytes: 缓存 Surface 像素数据的字节上限
+        """
+        self.font = font
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()  # key -> (value, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_font(self, font):
+        """更换字体并清空缓存"""
+        self.font = font
+        self.clear()
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    @staticmethod
+    def segments(text):
+        """
+        把文本拆成 (是否数值, 片段) 列表，如 "深度: -1.25 m" → 静态 "深度: "、数值 "-1.25"、静态 " m"
+        """
+        return [(index % 2 == 1, piece) for index, piece in enumerate(_NUMBER_PATTERN.split(text)) if piece]
+
+    def label(self, text, color, bold=False, outline=True, rotate=False):
+        """
+        返回整段文本的 (Surface, 偏移, 步进)
+
+        偏移为合成 Surface 相对正文位置在排列方向垂直方向上的偏移（竖屏轮廓与正文错开时为负），
+        步进为正文沿排列方向的长度。rotate 为 True 时文字逆时针旋转 90°（竖屏显示）
+        """
+        key = ("text", text, self._color_key(color), bold, outline, rotate)
+        entry = self._lookup(key)
+        if entry is None:
+            entry = self._render(text, color, bold, outline, rotate)
+            self._store(key, entry, self._surface_bytes(entry))
+        return entry
+
+    def glyphs(self, color, bold=False, outline=True, rotate=False):
+        """返回 {字符: (Surface, 偏移, 步进)} 数字图集，数值按字符查表拼接"""
+        key = ("glyphs", self._color_key(color), bold, outline, rotate)
+        atlas = self._lookup(key)
+        if atlas is None:
+            atlas = {char: self._render(char, color, bold, outline, rotate) for char in DIGIT_CHARS}
+            self._store(key, atlas, sum(self._surface_bytes(entry) for entry in atlas.values()))
+        return atlas
+
+    def stats(self):
+        """返回缓存统计"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else None,
+        }
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def _store(self, key, value, size):
+        self._entries[key] = (value, size)
+        self.bytes += size
+        # 至少保留刚放入的条目
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def _render(self, text, color, bold, outline, rotate):
+        # 共享字体的加粗状态只在渲染时切换，渲染后恢复为不加粗
+        self.font.set_bold(bold)
+        fill = self.font.render(text, True, color)
+        shadow = self.font.render(text, True, OUTLINE_COLOR) if outline else None
+        if bold:
+            self.font.set_bold(False)
+        if rotate:
+            fill = pygame.transform.rotate(fill, 90)
+            if shadow is not None:
+                shadow = pygame.transform.rotate(shadow, 90)
+
+        width, height = fill.get_size()
+        advance = height if rotate else width
+        if shadow is None:
+            return self._to_display_format(fill), 0, advance
+
+        # 轮廓在正文之下；竖屏时沿用原有位置：轮廓右缘对齐正文 x + 36
+        shadow_x = 36 - width if rotate else 0
+        left = min(0, shadow_x)
+        combined = pygame.Surface((max(width, shadow_x + width) - left, height), pygame.SRCALPHA)
+        combined.blit(shadow, (shadow_x - left, 0))
+        combined.blit(fill, (-left, 0))
+        return self._to_display_format(combined), left, advance
+
+    @staticmethod
+    def _to_display_format(surface):
+        # 与窗口像素格式一致时 blit 最快；尚未创建窗口时保持原样
+        return surface.convert_alpha() if pygame.display.get_surface() is not None else surface
+
+    @staticmethod
+    def _surface_bytes(entry):
+        surface = entry[0]
+        return surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+    @staticmethod
+    def _color_key(color):
+        # pygame.Color 不可哈希，统一转换为 RGBA 元组
+        return tuple(pygame.Color(color))
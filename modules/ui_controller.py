@@ -6,10 +6,15 @@
 import os
 import random
 import subprocess
+import threading
 import time
 
 import pygame
 
+from modules.hud_layout import HudLayout
+from modules.link_stats import format_link_summary
+from modules.text_cache import TextSurfaceCache
+
 
 # 字符到 Pygame 键常量的映射
 _CHAR_TO_PYGAME_KEY = {
@@ -34,6 +39,9 @@ def _is_key_pressed(key_name):
 class UIController:
     """用户界面控制类，负责管理界面显示和输入处理"""
 
+    VIDEO_AGE_WARN_S = 0.2  # 视频帧龄超过该值时以橙色提示
+    HUD_LAYERS = ("static", "telemetry")  # HUD 层自下而上的绘制顺序，都位于视频层之上
+
     def __init__(self, interface_settings, config_manager=None):
         """
         初始化用户界面控制器
@@ -48,6 +56,26 @@ class UIController:
         self.font = None
         self.rotate_mode = False  # 初始为横屏
         self.in_fullscreen = False
+        self.frame_blit_listener = None  # 视频帧绘制后回调 (frame, time.perf_counter())，延迟测量用
+        self._frame_cache_key = None  # (帧序号, 去畸变, 窗口尺寸)
+        self._frame_cache_surface = None
+        self._scaled_default = None
+        self.frames_uploaded = 0  # 新帧转换/缩放次数
+        self.frames_reused = 0  # 复用缓存画面的次数
+
+        # 分层合成：视频层 → 静态 HUD 层 → 遥测层。屏幕上的视频层不变时只擦除并重画内容变化的文字，
+        # update_display 只提交这些矩形
+        self._video_layer = None  # 屏幕上当前视频层的 Surface（None 为黑屏），擦除文字时从中恢复
+        self._layer_screen = None  # 视频层所在的屏幕 Surface；窗口重建或被外部绘制后失效
+        self._hud_queue = []  # 本次刷新排队的 HUD 文字
+        self._hud_drawn = {}  # (层, 序号) -> (内容键, 屏幕矩形)
+        self._full_redraw = True
+        self._dirty_rects = []
+        self.full_updates = 0  # 整屏 flip 次数
+        self.partial_updates = 0  # 按脏矩形提交的次数
+        self.skipped_updates = 0  # 画面无变化、未提交的次数
+        # 启用渲染线程（Presenter）时绘制期间持有该锁，重建窗口前也要先取得
+        self.render_lock = threading.RLock()
         self.show_undistorted = False
         self.default_image = None  # 存储默认图像
 
@@ -72,6 +100,10 @@ class UIController:
                 {'last_press': 0, 'cooldown': self.key_cooldowns.get('toggle_fullscreen_cooldown', 0.5)},  # 切换全屏
             self.keyboard_bindings.get('capture_frame_key', 'p'):
                 {'last_press': 0, 'cooldown': self.key_cooldowns.get('capture_frame_cooldown', 0.2)},  # 捕获当前帧
+            self.keyboard_bindings.get('toggle_recording_key', 'r'):
+                {'last_press': 0, 'cooldown': self.key_cooldowns.get('toggle_recording_cooldown', 1.0)},  # 开始/停止录像
+            self.keyboard_bindings.get('burst_capture_key', 'b'):
+                {'last_press': 0, 'cooldown': self.key_cooldowns.get('burst_capture_cooldown', 1.0)},  # 连拍
             self.keyboard_bindings.get('controller_visualizer_key', 'v'):
                 {'last_press': 0, 'cooldown': self.key_cooldowns.get('controller_visualizer_cooldown', 0.5)},
             # 控制器可视化工具
@@ -89,6 +121,8 @@ class UIController:
         pygame.init()
         self._init_display()
         self._init_font()
+        self.text_cache = TextSurfaceCache(self.font)  # draw_text 的渲染缓存
+        self.hud_layout = HudLayout(self.settings)  # HUD 各栏锚点，窗口尺寸/旋转/字体变化时才重新计算
         self._load_icon()
 
         # 读取温度回退配置（用于异常时显示默认温度）
@@ -227,6 +261,8 @@ class UIController:
         toggle_undistorted_key = self.keyboard_bindings.get('toggle_undistorted_key', 's')
         toggle_fullscreen_key = self.keyboard_bindings.get('toggle_fullscreen_key', 'f')
         capture_frame_key = self.keyboard_bindings.get('capture_frame_key', 'p')
+        toggle_recording_key = self.keyboard_bindings.get('toggle_recording_key', 'r')
+        burst_capture_key = self.keyboard_bindings.get('burst_capture_key', 'b')
         controller_visualizer_key = self.keyboard_bindings.get('controller_visualizer_key', 'v')
         controller_mapping_key = self.keyboard_bindings.get('controller_mapping_key', 'm')
         deploy_thrust_curves_key = self.keyboard_bindings.get('deploy_thrust_curves_key', 'c')
@@ -273,11 +309,28 @@ class UIController:
                     self.toggle_joystick_correction(main_controller)
                 self.key_states[toggle_joystick_correction_key]['last_press'] = current_time
 
+        # 使用非阻塞方式处理开始/停止录像键
+        if _is_key_pressed(toggle_recording_key):
+            if current_time - self.key_states[toggle_recording_key]['last_press'] > \
+                    self.key_states[toggle_recording_key]['cooldown']:
+                if main_controller:
+                    self.toggle_recording(main_controller)
+                self.key_states[toggle_recording_key]['last_press'] = current_time
+
+        # 使用非阻塞方式处理连拍键
+        if _is_key_pressed(burst_capture_key):
+            if current_time - self.key_states[burst_capture_key]['last_press'] > \
+                    self.key_states[burst_capture_key]['cooldown']:
+                if main_controller:
+                    self.start_burst_capture(main_controller)
+                self.key_states[burst_capture_key]['last_press'] = current_time
+
         # 使用非阻塞方式处理切换屏幕方向键
         if _is_key_pressed(toggle_rotation_key):
             if current_time - self.key_states[toggle_rotation_key]['last_press'] > self.key_states[toggle_rotation_key][
                 'cooldown']:
-                self.rotate_mode = not self.rotate_mode
+                with self.render_lock:
+                    self.rotate_mode = not self.rotate_mode
                 self.key_states[toggle_rotation_key]['last_press'] = current_time
 
         # 使用非阻塞方式处理切换无失真视图键
@@ -291,13 +344,17 @@ class UIController:
         if _is_key_pressed(toggle_fullscreen_key):
             if current_time - self.key_states[toggle_fullscreen_key]['last_press'] > \
                     self.key_states[toggle_fullscreen_key]['cooldown']:
-                if self.in_fullscreen:
-                    self.screen = pygame.display.set_mode((screen_width, screen_height))
-                    pygame.display.set_mode((screen_width, screen_height))
-                    self.in_fullscreen = False
-                else:
-                    self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-                    self.in_fullscreen = True
+                with self.render_lock:
+                    if self.in_fullscreen:
+                        self.screen = pygame.display.set_mode((screen_width, screen_height))
+                        pygame.display.set_mode((screen_width, screen_height))
+                        self.in_fullscreen = False
+                    else:
+                        self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+                        self.in_fullscreen = True
+                    # 新窗口内容未定义，下次刷新整屏重画
+                    self._layer_screen = None
+                    self.hud_layout.invalidate()
                 self.key_states[toggle_fullscreen_key]['last_press'] = current_time
 
         # 使用非阻塞方式处理切换温度糊弄模式键（i）
@@ -317,22 +374,12 @@ class UIController:
 
             if button7_pressed:
                 if current_time - self.key_states['button7']['last_press'] > self.key_states['button7']['cooldown']:
-                    try:
-                        frame = video_thread.get_latest_frame(self.show_undistorted)
-                        if frame is not None:
-                            video_thread.save_frame(frame)
-                    except Exception as e:
-                        print(f"捕获帧时发生异常: {str(e)}")
+                    self.capture_frame(video_thread, main_controller)
                     self.key_states['button7']['last_press'] = current_time
             elif p_key_pressed:
                 if current_time - self.key_states[capture_frame_key]['last_press'] > self.key_states[capture_frame_key][
                     'cooldown']:
-                    try:
-                        frame = video_thread.get_latest_frame(self.show_undistorted)
-                        if frame is not None:
-                            video_thread.save_frame(frame)
-                    except Exception as e:
-                        print(f"捕获帧时发生异常: {str(e)}")
+                    self.capture_frame(video_thread, main_controller)
                     self.key_states[capture_frame_key]['last_press'] = current_time
 
         return running
@@ -348,95 +395,139 @@ class UIController:
             bold: 是否加粗
             outline: 是否绘制轮廓
             outline_thickness: 轮廓厚度
-        """
-        # 使用已初始化的字体，确保中文显示正常
-        word_font = self.font
 
-        # 如果需要加粗
-        if bold:
-            word_font.set_bold(True)
-        else:
-            word_font.set_bold(False)  # 确保不加粗
-
-        # 如果需要绘制轮廓
-        if outline:
-            # 渲染并旋转轮廓
-            outline_surface = word_font.render(text, True, (0, 0, 0))  # 黑色轮廓
-            if self.rotate_mode:
-                outline_surface = pygame.transform.rotate(outline_surface, 90)
-
-            # 获取旋转后轮廓的宽度和高度
-            outline_width, outline_height = outline_surface.get_size()
-
-            # 旋转后轮廓位置的计算
-            if self.rotate_mode:
-                outline_x = x - outline_width + 36  # 旋转后的轮廓左上角X
-                outline_y = y - outline_height  # 旋转后的轮廓左上角Y
-            else:
-                outline_x, outline_y = x, y
-
-            # 绘制轮廓
-            self.screen.blit(outline_surface, (outline_x, outline_y))
-
-        # 渲染文本
-        video_text_surface = word_font.render(text, True, color)
-
-        # 旋转文本，如果需要竖屏
-        if self.rotate_mode:
-            video_text_surface = pygame.transform.rotate(video_text_surface, 90)
-
-        # 获取旋转后的文本宽度和高度
-        video_text_width, text_height = video_text_surface.get_size()
+        返回:
+            pygame.Rect: 文字覆盖的屏幕区域
+        """
+        blits, rect = self._layout_text(text, x, y, color, bold, outline)
+        self.screen.blits(blits, False)
+        # 直接绘制的文字不受合成器管理，下次刷新整屏重画
+        self._layer_screen = None
+        return rect
 
-        # 旋转后文本位置的调整
-        if self.rotate_mode:
-            # 旋转后，确保文本底部对齐
-            y -= text_height  # 需要把Y坐标调整为底部对齐
+    def _layout_text(self, text, x, y, color=(255, 255, 255), bold=False, outline=True, align="left"):
+        """
+        排版一行文字，不绘制
 
-        # 绘制文本
-        self.screen.blit(video_text_surface, (x, y))
+        align 为 "right" 时（仅横屏）x 为文字右缘，宽度取各段缓存的步进之和，不调用 font.size()
 
-    def display_frame(self, frame_rgb):
+        返回:
+            tuple: (screen.blits 的参数列表, 覆盖的屏幕矩形)
+        """
+        # 静态文字整段取缓存，数值按字符从数字图集拼接，遥测变化时不重新渲染
+        cache = self.text_cache
+        rotate = self.rotate_mode
+        glyphs = None
+        parts = []
+        for numeric, piece in cache.segments(text):
+            if numeric:
+                if glyphs is None:
+                    glyphs = cache.glyphs(color, bold, outline, rotate)
+                parts.extend(glyphs[char] for char in piece)
+            else:
+                parts.append(cache.label(piece, color, bold, outline, rotate))
+        if align == "right" and not rotate:
+            x -= sum(advance for _, _, advance in parts)
+
+        blits = []
+        for surface, offset, advance in parts:
+            if rotate:
+                # 竖屏：文字逆时针旋转 90°，自下而上排列，底部对齐 y
+                y -= advance
+                blits.append((surface, (x + offset, y)))
+            else:
+                blits.append((surface, (x, y)))
+                x += advance
+        if not blits:
+            return blits, pygame.Rect(x, y, 0, 0)
+        rects = [surface.get_rect(topleft=position) for surface, position in blits]
+        return blits, rects[0].unionall(rects[1:])
+
+    def display_frame(self, frame_rgb, frame_seq=None):
         """
         显示视频帧
         
         参数:
             frame_rgb: RGB格式的视频帧或pygame Surface对象
+            frame_seq: VideoThread 给出的帧序号；与上次相同（且窗口尺寸、去畸变状态未变）时直接复用上次缩放好的画面
         """
-        # 首先清空屏幕，防止渲染数据重叠
-        self.screen.fill((0, 0, 0))  # 用黑色填充屏幕
-
         # 获取当前窗口的大小
-        screen_width, screen_height = self.screen.get_size()
+        screen_size = self.screen.get_size()
 
+        surface = None
         if frame_rgb is not None:
-            # 检查输入类型
-            if isinstance(frame_rgb, pygame.Surface):
-                # 如果是pygame Surface对象，直接使用
-                frame_surface = frame_rgb
+            cache_key = (frame_seq, self.show_undistorted, screen_size)
+            if frame_seq is not None and cache_key == self._frame_cache_key:
+                surface = self._frame_cache_surface
+                self.frames_reused += 1
             else:
-                # 如果是numpy数组，转换为pygame Surface
-                try:
-                    frame_surface = pygame.surfarray.make_surface(frame_rgb.swapaxes(0, 1))
-                except Exception as e:
-                    print(f"转换视频帧失败: {e}")
-                    # 如果转换失败，使用默认图像
-                    if self.default_image is not None:
-                        frame_surface = self.default_image
-                    else:
-                        return
+                surface = self._prepare_frame_surface(frame_rgb, screen_size)
+                # 同一帧在后续刷新中复用，不再重复包装、缩放和转换像素格式
+                self._frame_cache_key = cache_key if frame_seq is not None and surface is not None else None
+                self._frame_cache_surface = surface
+                if surface is not None:
+                    self.frames_uploaded += 1
+
+        if surface is not None:
+            # 视频画面铺满窗口，不需要先清屏；屏幕上已是这一帧时不再 blit
+            if self._present_video_layer(surface) and self.frame_blit_listener is not None:
+                self.frame_blit_listener(frame_rgb, time.perf_counter())
+            return
 
-            # 确保图像大小适应当前窗口大小
-            scaled_surface = pygame.transform.scale(frame_surface, (screen_width, screen_height))
+        if self.default_image is not None:
+            # 如果没有视频帧但有默认图像，则显示默认图像（按窗口尺寸缓存缩放结果）
+            if self._scaled_default is None or self._scaled_default.get_size() != screen_size:
+                self._scaled_default = pygame.transform.scale(self.default_image, screen_size)
+            self._present_video_layer(self._scaled_default)
+        else:
+            self._present_video_layer(None)
 
-            # 绘制到屏幕
-            self.screen.blit(scaled_surface, (0, 0))
-        elif self.default_image is not None:
-            # 如果没有视频帧但有默认图像，则显示默认图像
-            scaled_default = pygame.transform.scale(self.default_image, (screen_width, screen_height))
-            self.screen.blit(scaled_default, (0, 0))
+    def _present_video_layer(self, surface):
+        """
+        把视频层画到屏幕（surface 为 None 时清为黑色），之后整屏重画 HUD
 
-    def display_controller_data(self, controller_data, depth, temperature, modes, joystick_correction_enabled=None):
+        返回:
+            bool: 是否实际绘制；屏幕上已是同一个 Surface 时跳过
+        """
+        if surface is self._video_layer and self._layer_screen is self.screen:
+            return False
+        if surface is None:
+            self.screen.fill((0, 0, 0))
+        else:
+            self.screen.blit(surface, (0, 0))
+        self._video_layer = surface
+        self._layer_screen = self.screen
+        self._hud_drawn = {}
+        self._full_redraw = True
+        return True
+
+    def _prepare_frame_surface(self, frame_rgb, screen_size):
+        """把视频帧转换为与窗口同尺寸、与屏幕像素格式一致的 Surface，失败时返回 None"""
+        # 检查输入类型
+        if isinstance(frame_rgb, pygame.Surface):
+            # 如果是pygame Surface对象，直接使用
+            frame_surface = frame_rgb
+        else:
+            # 如果是numpy数组，按 RGB 行优先排列直接包装为 Surface（不复制、不转置）
+            try:
+                if not frame_rgb.flags['C_CONTIGUOUS']:
+                    # 去畸变裁剪后的帧是非连续视图
+                    frame_rgb = frame_rgb.copy()
+                height, width = frame_rgb.shape[:2]
+                frame_surface = pygame.image.frombuffer(frame_rgb, (width, height), "RGB")
+            except Exception as e:
+                print(f"转换视频帧失败: {e}")
+                return None
+
+        # 确保图像大小适应当前窗口大小；解码端已缩放到窗口尺寸时直接使用
+        if frame_surface.get_size() != screen_size:
+            frame_surface = pygame.transform.scale(frame_surface, screen_size)
+        # 转换为屏幕像素格式：只转换一次，之后复用时的 blit 是直接拷贝；同时与视频缓冲区脱离
+        return frame_surface.convert()
+
+    def display_controller_data(self, controller_data, depth, temperature, modes, joystick_correction_enabled=None,
+                                link_stats=None, video_age=None, recording_elapsed=None,
+                                recording_interrupted=False):
         """
         显示控制器数据和模式信息 - 简化版
         
@@ -446,91 +537,158 @@ class UIController:
             temperature: 温度值
             modes: 模式信息字典
             joystick_correction_enabled: 手柄辅助修正是否启用
+            link_stats: LinkStatistics.snapshot() 返回的链路统计，None 时不显示
+            video_age: 最新视频帧距今的秒数（VideoThread.frame_age()），None 时不显示
+            recording_elapsed: 本次录像已持续的秒数（StreamRecorder.elapsed()），None 表示未录像
+            recording_interrupted: 录像进程意外退出、正在等待重启（StreamRecorder.interrupted）
         """
-        padding = self.settings['padding']
-        screen_width, screen_height = self.screen.get_size()
+        white = (255, 255, 255)
+        rotate = self.rotate_mode
+        layout = self.hud_layout.update(self.screen.get_size(), rotate, self.font)
 
         # 控制器数据
-        data_lines = [
-            f"X: {controller_data['x']:.1f}",
-            f"Y: {controller_data['y']:.1f}",
-            f"Z: {controller_data['z']:.1f}",
-            f"Yaw: {controller_data['yaw']:.1f}",
-            f"Servo: {controller_data['servo0']:.2f}"
+        left_lines = [
+            (f"X: {controller_data['x']:.1f}", white),
+            (f"Y: {controller_data['y']:.1f}", white),
+            (f"Z: {controller_data['z']:.1f}", white),
+            (f"Yaw: {controller_data['yaw']:.1f}", white),
+            (f"Servo: {controller_data['servo0']:.2f}", white)
         ]
 
         # 计算温度显示（异常情况下显示默认温度并标红）
         display_temp, temp_is_fake = self.get_display_temperature(depth, temperature)
 
         # 传感器数据
-        right_data_lines = [
-            f"深度: {depth:.3f} m",
-            f"温度: {display_temp:.2f} °C"
+        right_lines = [
+            (f"深度: {depth:.3f} m", white),
+            (f"温度: {display_temp:.2f} °C", white)
         ]
 
-        # 添加手柄辅助修正状态
+        # 添加手柄辅助修正状态（绿色表示启用，橙色表示禁用）
         if joystick_correction_enabled is not None:
-            status_text = "辅助修正: 已启用" if joystick_correction_enabled else "辅助修正: 已禁用"
-            status_color = (0, 255, 0) if joystick_correction_enabled else (255, 165, 0)  # 绿色表示启用，橙色表示禁用
-            right_data_lines.append(status_text)
-
-        # 渲染控制器数据
-        y_offset = padding
-        for line in data_lines:
-            if self.rotate_mode:
-                self.draw_text(line, self.settings['y_h'] + y_offset, screen_height - padding,
-                               color=(255, 255, 255))
-            else:
-                self.draw_text(line, padding, self.settings['y_h'] + y_offset, color=(255, 255, 255))
-            y_offset += self.settings['y_offset']
-
-        # 渲染模式信息
-        if self.rotate_mode:
-            self.draw_text(f"{modes['speed_mode']['name']}", self.settings['y_h'] + y_offset,
-                           screen_height - padding, color=pygame.Color(modes['speed_mode']['color']))
-            y_offset += self.settings['y_offset']
-            self.draw_text(f"{modes['lock_mode']['name']}", self.settings['y_h'] + y_offset,
-                           screen_height - padding, color=pygame.Color(modes['lock_mode']['color']))
-            self.draw_text(f"{modes['catch_mode']['name']}", self.settings['y_h'] + screen_width - 100,
-                           screen_height - padding, color=pygame.Color(modes['catch_mode']['color']))
-        else:
-            self.draw_text(f"{modes['speed_mode']['name']}", padding, self.settings['y_h'] + y_offset,
-                           color=pygame.Color(modes['speed_mode']['color']))
-            y_offset += self.settings['y_offset']
-            self.draw_text(f"{modes['lock_mode']['name']}", padding, self.settings['y_h'] + y_offset,
-                           color=pygame.Color(modes['lock_mode']['color']))
-            y_offset += self.settings['y_offset']
-            self.draw_text(f"{modes['catch_mode']['name']}", padding, self.settings['y_h'] + y_offset,
-                           color=pygame.Color(modes['catch_mode']['color']))
-
-        # 渲染传感器数据
-        y_offset = padding
-        for i, line in enumerate(right_data_lines):
-            text_width = self.font.size(line)[0]
-
-            if self.rotate_mode:
-                x_pos = padding
+            right_lines.append(("辅助修正: 已启用", (0, 255, 0)) if joystick_correction_enabled
+                               else ("辅助修正: 已禁用", (255, 165, 0)))
+
+        # 添加链路质量（正常绿色、降级橙色、中断红色）
+        if link_stats is not None:
+            link_color = {"ok": (0, 255, 0), "degraded": (255, 165, 0), "lost": (255, 0, 0)}.get(
+                link_stats["status"], (180, 180, 180))
+            right_lines.append((format_link_summary(link_stats), link_color))
+
+        # 添加视频帧龄（新鲜绿色、偏旧橙色、超过 1 秒红色）
+        if video_age is not None:
+            if video_age < 1:
+                video_color = (0, 255, 0) if video_age < self.VIDEO_AGE_WARN_S else (255, 165, 0)
+                right_lines.append((f"视频: {video_age * 1000:.0f}ms", video_color))
             else:
-                x_pos = screen_width - text_width - padding
+                right_lines.append((f"视频: {video_age:.1f}s 未更新", (255, 0, 0)))
 
-            # 使用特定颜色显示状态信息
-            text_color = (255, 255, 255)  # 默认白色
+        # 录像中以红色显示已录制时长；录像进程意外退出时提示中断
+        if recording_elapsed is not None:
+            minutes, seconds = divmod(int(recording_elapsed), 60)
+            right_lines.append((f"录像: {minutes:02d}:{seconds:02d}", (255, 0, 0)))
+        elif recording_interrupted:
+            right_lines.append(("录像: 中断，正在重连", (255, 165, 0)))
 
-            # 辅助修正状态行
-            if joystick_correction_enabled is not None and line.startswith("辅助修正"):
-                text_color = status_color
+        # 渲染控制器数据
+        for row, (line, color) in enumerate(left_lines):
+            self._queue_hud_text("telemetry", line, *layout.anchor("left", row), color=color)
+
+        # 渲染模式信息：速度、锁定模式接在控制量之后；竖屏时抓取模式单独放在右侧
+        row = len(left_lines)
+        for name in ("speed_mode", "lock_mode"):
+            self._queue_hud_text("static", f"{modes[name]['name']}", *layout.anchor("left", row),
+                                 color=pygame.Color(modes[name]['color']))
+            row += 1
+        catch_anchor = layout.anchor("catch") if rotate else layout.anchor("left", row)
+        self._queue_hud_text("static", f"{modes['catch_mode']['name']}", *catch_anchor,
+                             color=pygame.Color(modes['catch_mode']['color']))
+
+        # 渲染传感器数据（横屏右对齐，宽度由排版时的字形步进得到）
+        for row, (line, color) in enumerate(right_lines):
+            self._queue_hud_text("telemetry", line, *layout.anchor("right", row), color=color)
+
+        self._compose_hud()
+
+    def _queue_hud_text(self, layer, text, x, y, align="left", color=(255, 255, 255)):
+        """登记一行 HUD 文字，由 _compose_hud 决定是否需要重画；align 为 "right" 时 x 为文字右缘"""
+        self._hud_queue.append((layer, text, x, y, align, color))
+
+    def _compose_hud(self):
+        """
+        绘制本次刷新登记的 HUD 文字
+
+        视频层刚重画时全部绘制；否则只处理与上次内容不同的文字：从视频层恢复其旧矩形后重画，
+        与擦除区域重叠的未变化文字一并重画（抗锯齿轮廓不能在原位置叠加绘制）。
+        """
+        queue, self._hud_queue = self._hud_queue, []
+        items = []
+        counters = dict.fromkeys(self.HUD_LAYERS, 0)
+        for layer, text, x, y, align, color in sorted(queue, key=lambda item: self.HUD_LAYERS.index(item[0])):
+            slot = (layer, counters[layer])
+            counters[layer] += 1
+            items.append((slot, (text, x, y, align, tuple(color), self.rotate_mode),
+                          (text, x, y, color, False, True, align)))
+
+        previous = self._hud_drawn
+        if self._full_redraw or self._layer_screen is not self.screen:
+            self._hud_drawn = {}
+            for slot, key, args in items:
+                blits, rect = self._layout_text(*args)
+                self.screen.blits(blits, False)
+                self._hud_drawn[slot] = (key, rect)
+            return
 
+        layouts = {}
+        dirty = [previous[slot][1] for slot in previous if slot not in {item[0] for item in items}]
+        for slot, key, args in items:
+            if slot not in previous or previous[slot][0] != key:
+                layouts[slot] = self._layout_text(*args)
+                dirty.append(layouts[slot][1])
+                if slot in previous:
+                    dirty.append(previous[slot][1])
+
+        # 与擦除/新绘制区域重叠的未变化文字也要重画，直到不再扩大
+        grown = True
+        while grown:
+            grown = False
+            for slot, key, args in items:
+                if slot not in layouts and previous[slot][1].collidelist(dirty) != -1:
+                    layouts[slot] = self._layout_text(*args)
+                    dirty.append(previous[slot][1])
+                    grown = True
+        if not dirty:
+            return
 
-            if self.rotate_mode:
-                self.draw_text(line, y_offset, 250, color=text_color)
+        for rect in dirty:
+            if self._video_layer is None:
+                self.screen.fill((0, 0, 0), rect)
             else:
-                self.draw_text(line, x_pos, self.settings['y_h'] + y_offset, color=text_color)
-
-            y_offset += self.settings['y_offset']
+                self.screen.blit(self._video_layer, rect, rect)
+        self._hud_drawn = {}
+        for slot, key, args in items:
+            if slot in layouts:
+                blits, rect = layouts[slot]
+                self.screen.blits(blits, False)
+                self._hud_drawn[slot] = (key, rect)
+            else:
+                self._hud_drawn[slot] = previous[slot]
+        self._dirty_rects.extend(dirty)
 
     def update_display(self):
-        """更新显示"""
-        pygame.display.flip()
+        """
+        更新显示：视频层重画过时整屏 flip，否则只提交 HUD 的脏矩形，画面无变化时不提交
+        """
+        if self._full_redraw or self._layer_screen is not self.screen:
+            pygame.display.flip()
+            self.full_updates += 1
+        elif self._dirty_rects:
+            pygame.display.update(self._dirty_rects)
+            self.partial_updates += 1
+        else:
+            self.skipped_updates += 1
+        self._full_redraw = False
+        self._dirty_rects = []
 
     # 公共方法：根据深度和温度返回用于显示的温度值
     def get_display_temperature(self, depth, temperature):
@@ -669,6 +827,88 @@ class UIController:
         except Exception as e:
             print(f"切换手柄辅助修正失败: {e}")
 
+    def toggle_recording(self, main_controller):
+        """开始/停止分段录像"""
+        try:
+            main_controller.toggle_recording()
+        except Exception as e:
+            print(f"切换录像失败: {e}")
+
+    def start_burst_capture(self, main_controller):
+        """开始连拍"""
+        try:
+            main_controller.start_burst_capture()
+        except Exception as e:
+            print(f"连拍失败: {e}")
+
+    def capture_frame(self, video_thread, main_controller=None):
+        """保存当前画面；有主控制器时由截图服务附带遥测信息"""
+        try:
+            if main_controller:
+                main_controller.capture_snapshot(self.show_undistorted)
+                return
+            frame = video_thread.get_latest_frame(self.show_undistorted)
+            if frame is not None:
+                video_thread.save_frame(frame)
+        except Exception as e:
+            print(f"捕获帧时发生异常: {str(e)}")
+
+
+class HeadlessUIController(UIController):
+    """
+    无显示器运行时的界面控制器
+
+    用 SDL dummy 驱动创建不可见的窗口，键盘/手柄事件照常处理；绘制接口只记录最近一次调用而不渲染，
+    供上位机在没有显示器的机器上运行控制链路，或在 CI 上做长时间浸泡测试。
+    """
+
+    def __init__(self, interface_settings, config_manager=None):
+        """
+        参数:
+            interface_settings: 界面设置字典
+            config_manager: 配置管理器实例
+        """
+        # 必须在 pygame 初始化显示之前设置；已初始化时（如测试中）沿用现有驱动
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        self.frames_presented = 0  # display_frame 调用次数
+        self.last_frame_seq = None
+        self.last_telemetry = None  # 最近一次 display_controller_data 的参数
+        self.last_status = None  # 最近一次 draw_text 的文字（初始化状态提示等）
+        super().__init__(interface_settings, config_manager)
+
+    def _load_icon(self):
+        """无窗口，不设置图标"""
+
+    def display_frame(self, frame_rgb, frame_seq=None):
+        """只记录帧序号，不转换和缩放画面"""
+        self.frames_presented += 1
+        self.last_frame_seq = frame_seq
+
+    def display_controller_data(self, controller_data, depth, temperature, modes, joystick_correction_enabled=None,
+                                link_stats=None, video_age=None, recording_elapsed=None,
+                                recording_interrupted=False):
+        """只记录遥测，不排版 HUD"""
+        self.last_telemetry = {
+            "controller_data": controller_data,
+            "depth": depth,
+            "temperature": temperature,
+            "modes": modes,
+            "joystick_correction_enabled": joystick_correction_enabled,
+            "link_stats": link_stats,
+            "video_age": video_age,
+            "recording_elapsed": recording_elapsed,
+            "recording_interrupted": recording_interrupted,
+        }
+
+    def draw_text(self, text, x, y, color=(255, 255, 255), bold=False, outline=True, outline_thickness=1):
+        """只记录文字"""
+        self.last_status = text
+        return pygame.Rect(x, y, 0, 0)
+
+    def update_display(self):
+        """没有需要提交的画面"""
+        self.skipped_updates += 1
+
 
 class JoystickHandler:
     """手柄处理类，负责处理手柄输入"""
@@ -4,23 +4,47 @@
 """
 
 import os
-import shutil
 import subprocess
-import sys
 import threading
+import time
 
 import cv2
 import numpy as np
 
+from modules.video_recorder import SnapshotWriter, find_executable, unique_snapshot_stem
+
 # Windows 专用常量，Linux 上不需要
 if not hasattr(subprocess, 'CREATE_NO_WINDOW'):
     subprocess.CREATE_NO_WINDOW = 0
 
+# FFmpeg 解码配置：放在 -i 之前的解码器参数，由 [camera] decode_profile 选择
+DECODE_PROFILES = {
+    # 与早期版本相同，不追加任何解码参数
+    "default": [],
+    # 只用片级多线程（帧级多线程每个线程会多缓冲一帧），并允许不严格符合标准的快速解码
+    "low_latency": ['-thread_type', 'slice', '-flags2', 'fast'],
+    # 跳过环路滤波并限制线程数，画质略降，适合性能较弱的笔记本
+    "low_cpu": ['-threads', '2', '-flags2', 'fast', '-skip_loop_filter', 'all'],
+    # 自动线程数（含帧级多线程），完整解码
+    "quality": ['-threads', '0'],
+    # 使用平台可用的硬件解码（DXVA2/D3D11VA/VAAPI 等），不可用时 FFmpeg 自动回退软件解码
+    "hwaccel": ['-hwaccel', 'auto'],
+}
+
+
+def ffmpeg_decode_args(profile):
+    """返回解码配置对应的 FFmpeg 参数列表，未知配置回退到 default"""
+    if profile not in DECODE_PROFILES:
+        print(f"未知的解码配置 {profile!r}，使用 default（可选: {', '.join(DECODE_PROFILES)}）")
+        profile = "default"
+    return list(DECODE_PROFILES[profile])
+
 
 class VideoThread(threading.Thread):
     """视频处理线程，处理视频流和图像处理"""
 
-    def __init__(self, rtsp_url, base_width, base_height, buffer_size=5, output_folder="captures", backend="ffmpeg"):
+    def __init__(self, rtsp_url, base_width, base_height, buffer_size=5, output_folder="captures", backend="ffmpeg",
+                 reactor=None, output_size=None, decode_profile="default", snapshot_writer=None):
         """
         初始化视频处理线程
         
@@ -31,6 +55,10 @@ class VideoThread(threading.Thread):
             buffer_size: 缓冲区大小
             output_folder: 截图保存文件夹
             backend: 拉流后端 (ffmpeg / gstreamer)
+            reactor: IOReactor 实例；提供时由反应器读取后端 stderr，不再单独起线程
+            output_size: 解码端输出尺寸 (宽, 高)，通常为窗口尺寸；不超过摄像头分辨率，None 表示按原分辨率输出
+            decode_profile: FFmpeg 解码配置名（见 DECODE_PROFILES），GStreamer 后端忽略
+            snapshot_writer: 共享的 SnapshotWriter；None 时首次截图再创建，线程停止时关闭
         """
         super().__init__()
         self.rtsp_url = rtsp_url
@@ -39,63 +67,117 @@ class VideoThread(threading.Thread):
         self.buffer_size = buffer_size
         self.output_folder = output_folder
         self.backend = backend
+        self.decode_profile = decode_profile
         self.running = True
-        self.frame_queue = []
-        self.max_queue_size = 10  # 队列大小
         self.video_connected = None
-        self.lock = threading.Lock()  # 用于同步对队列的访问
+        self.lock = threading.Lock()  # 用于同步对日志的访问
+
+        # 解码端缩放：输出尺寸变化时由读取线程重启后端进程并重新分配帧缓冲区
+        self.output_width, self.output_height = self._clamp_output_size(output_size)
+        self._pending_output_size = None
+        self.renegotiations = 0
+        self._restart_requested = False  # 画面停滞时请求重启后端，见 restart_backend
+        self.restarts = 0
+
+        # 预分配的帧环形缓冲区：读取线程轮流写入各槽位，写完后发布最新槽位下标。
+        # get_latest_frame 返回槽位视图，在环形缓冲区绕回前（ring_size - 1 帧内）保持有效
+        self.ring_size = 4
+        self._allocate_frame_slots()
+        self.frames_received = 0
+        self.frame_listeners = []  # 每帧解码完成后在读取线程回调，见 add_frame_listener
+        # 去畸变器及其结果缓存由 _undistort_lock 保护：渲染线程取帧显示、主线程截图都会调用
+        self.undistortion = UndistortionEngine()
+        self._undistort_lock = threading.Lock()
+        self._undistorted_seq = 0
+        self._undistorted_frame = None
         self.capture_count = 0  # 用于生成照片编号
+        self.snapshot_writer = snapshot_writer
+        self._owns_snapshot_writer = False
         self.process = None
         self.proc_log = []  # 存储后端进程日志
         self.stderr_thread = None  # 后端错误输出处理线程
+        self.reactor = reactor
+        self._stderr_registered = False
+        self._stderr_pending = b""  # 反应器模式下尚未凑成整行的 stderr 数据
 
         # 确保输出文件夹存在
         if not os.path.exists(self.output_folder):
             os.makedirs(self.output_folder)
 
         # 初始化拉流进程
+        self._init_backend_process()
+
+    def _clamp_output_size(self, size):
+        """解码端只做缩小，放大交给显示端，避免增加管道带宽"""
+        if not size:
+            return self.base_width, self.base_height
+        width, height = size
+        return max(1, min(int(width), self.base_width)), max(1, min(int(height), self.base_height))
+
+    def _allocate_frame_slots(self):
+        self._latest_index = -1  # 先作废下标，再替换缓冲区
+        self._frame_slots = np.empty((self.ring_size, self.output_height, self.output_width, 3), dtype=np.uint8)
+        self._slot_views = [memoryview(slot).cast('B') for slot in self._frame_slots]
+        # 每个槽位的帧序号（从 1 开始，与 frames_received 一致）与读出完整帧的时刻（time.perf_counter()）
+        self._slot_seq = [0] * self.ring_size
+        self._slot_time = [0.0] * self.ring_size
+
+    def _init_backend_process(self):
+        self.backend_started_at = time.perf_counter()
         if self.backend == "gstreamer":
             self._init_gst_process()
         else:
             self._init_ffmpeg_process()
 
+    def is_scaled(self):
+        """解码端是否输出缩小后的画面（不是摄像头原分辨率）"""
+        return (self.output_width, self.output_height) != (self.base_width, self.base_height)
+
+    def has_full_size_frame(self):
+        """最新帧是否为摄像头原分辨率（解码端切回原分辨率后的第一帧到达前为 False）"""
+        # 与 get_latest_frame_info 相同：先取缓冲区再取下标
+        slots = self._frame_slots
+        return self._latest_index >= 0 and slots.shape[1:3] == (self.base_height, self.base_width)
+
     # ─── FFmpeg 后端 ─────────────────────────────────
 
     def _find_executable(self, name):
         """查找可执行文件路径（优先打包目录）"""
-        if getattr(sys, 'frozen', False):
-            base_dir = os.path.dirname(sys.executable)
-            candidate = os.path.join(base_dir, '_internal', name + '.exe')
-            if os.path.exists(candidate):
-                return candidate
-        path = shutil.which(name)
-        if path:
-            return path
-        return name
+        return find_executable(name)
 
-    def _init_ffmpeg_process(self):
-        """初始化FFmpeg进程"""
+    def _build_ffmpeg_command(self):
+        """按输入源、解码配置和输出尺寸生成 FFmpeg 命令行"""
         ffmpeg_exe = self._find_executable('ffmpeg')
 
-        command = [
-            ffmpeg_exe,
-            '-rtsp_transport', 'tcp',  # 强制使用TCP传输
+        command = [ffmpeg_exe]
+        if self.rtsp_url.startswith('rtsp://'):
+            command += ['-rtsp_transport', 'tcp']  # 强制使用TCP传输（文件等本地源不支持该选项）
+        command += ffmpeg_decode_args(self.decode_profile)
+        command += [
             '-fflags', 'nobuffer',  # 禁用缓冲区
             '-flags', 'low_delay',  # 低延迟标志
             '-i', self.rtsp_url,  # 输入URL
+        ]
+        if self.is_scaled():
+            # 在解码端缩放到窗口尺寸，管道带宽与显示端缩放开销随窗口而非摄像头分辨率变化
+            command += ['-vf', f'scale={self.output_width}:{self.output_height}:flags=fast_bilinear']
+        command += [
             '-f', 'image2pipe',
-            '-pix_fmt', 'bgr24',
+            '-pix_fmt', 'rgb24',  # 直接输出 pygame 使用的 RGB 排列，无需逐帧转换
             '-vcodec', 'rawvideo',
             '-an', '-sn',  # 禁用音频和字幕
             '-probesize', '32',  # 减少探测大小
             '-analyzeduration', '0',  # 立即开始解码
             '-'
         ]
+        return command
 
-        self.process = subprocess.Popen(command,
+    def _init_ffmpeg_process(self):
+        """初始化FFmpeg进程"""
+        self.process = subprocess.Popen(self._build_ffmpeg_command(),
                                         stdout=subprocess.PIPE,
                                         stderr=subprocess.PIPE,
-                                        bufsize=self.base_width * self.base_height * 3 * self.buffer_size,
+                                        bufsize=self.output_width * self.output_height * 3 * self.buffer_size,
                                         creationflags=subprocess.CREATE_NO_WINDOW)
 
         self._start_stderr_thread()
@@ -114,44 +196,145 @@ class VideoThread(threading.Thread):
             '!', 'rtph264depay',
             '!', 'avdec_h264',
             '!', 'videoconvert',
-            '!', 'video/x-raw,format=BGR',
-            '!', 'fdsink', 'fd=1',  # 输出到 stdout
         ]
+        if self.is_scaled():
+            command += ['!', 'videoscale',
+                        '!', f'video/x-raw,format=RGB,width={self.output_width},height={self.output_height}']
+        else:
+            command += ['!', 'video/x-raw,format=RGB']
+        command += ['!', 'fdsink', 'fd=1']  # 输出到 stdout
 
         self.process = subprocess.Popen(command,
                                         stdout=subprocess.PIPE,
                                         stderr=subprocess.PIPE,
-                                        bufsize=self.base_width * self.base_height * 3 * self.buffer_size)
+                                        bufsize=self.output_width * self.output_height * 3 * self.buffer_size)
 
         self._start_stderr_thread()
 
     # ─── 通用 ────────────────────────────────────────
 
     def _start_stderr_thread(self):
-        """启动stderr读取线程"""
-        self.stderr_thread = threading.Thread(target=self._read_stderr)
+        """启动stderr读取线程（有反应器时优先注册到反应器）"""
+        if self.reactor is not None:
+            try:
+                self.reactor.add_reader(self.process.stderr, self._on_stderr_readable)
+                self._stderr_registered = True
+                return
+            except (ValueError, OSError) as e:
+                # Windows 的 select 不支持管道，回退到读取线程
+                print(f"反应器无法监听{self.backend.upper()}日志管道，改用读取线程: {e}")
+
+        self.stderr_thread = threading.Thread(target=self._read_stderr, args=(self.process.stderr,))
         self.stderr_thread.daemon = True
         self.stderr_thread.start()
 
-    def _read_stderr(self):
-        """读取后端进程的stderr输出并打印"""
+    def _log_backend_line(self, line):
+        """打印并保存一行后端日志"""
+        line_text = line.decode('utf-8', errors='replace').strip()
+        if line_text:
+            print(f"{self.backend.upper()}: {line_text}")
+            with self.lock:
+                self.proc_log.append(line_text)
+                if len(self.proc_log) > 100:
+                    self.proc_log = self.proc_log[-100:]
+
+    def _read_stderr(self, stderr):
+        """读取后端进程的stderr输出并打印（绑定启动时的进程，重启后由新线程接管）"""
         tag = self.backend.upper()
-        while self.running and self.process:
+        while self.running:
             try:
-                line = self.process.stderr.readline()
+                line = stderr.readline()
                 if not line:
                     break
-                line_text = line.decode('utf-8', errors='replace').strip()
-                if line_text:
-                    print(f"{tag}: {line_text}")
-                    with self.lock:
-                        self.proc_log.append(line_text)
-                        if len(self.proc_log) > 100:
-                            self.proc_log = self.proc_log[-100:]
+                self._log_backend_line(line)
             except Exception as e:
                 print(f"读取{tag}日志时出错: {e}")
                 break
 
+    def _on_stderr_readable(self, stderr):
+        """反应器回调：管道可读时只读取已到达的数据，按行切分"""
+        data = os.read(stderr.fileno(), 4096)
+        if not data:
+            # 后端进程已退出
+            self._detach_stderr(stderr)
+            if self._stderr_pending:
+                self._log_backend_line(self._stderr_pending)
+                self._stderr_pending = b""
+            return
+
+        *lines, self._stderr_pending = (self._stderr_pending + data).split(b"\n")
+        for line in lines:
+            self._log_backend_line(line)
+
+    def _detach_stderr(self, stderr=None):
+        if stderr is None:
+            stderr = self.process.stderr
+        elif stderr is not self.process.stderr:
+            # 已被重启替换的旧进程
+            self.reactor.remove_reader(stderr)
+            return
+        if self._stderr_registered:
+            self._stderr_registered = False
+            self.reactor.remove_reader(stderr)
+
+    def set_output_size(self, width, height):
+        """
+        请求解码端输出新的尺寸（窗口缩放、切换全屏时调用）
+
+        只记录请求并结束当前后端进程；读取线程读到管道结束后重新分配帧缓冲区并按新尺寸重启后端。
+
+        返回:
+            bool: 是否触发了重新协商
+        """
+        size = self._clamp_output_size((width, height))
+        if size == (self._pending_output_size or (self.output_width, self.output_height)):
+            return False
+        self._pending_output_size = size
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+        return True
+
+    def restart_backend(self):
+        """
+        请求重启拉流进程（画面停滞时调用）
+
+        与 set_output_size 相同，只结束当前进程，由读取线程重新启动。
+
+        返回:
+            bool: 是否发出了新的重启请求（上一次请求尚未完成时返回 False）
+        """
+        if self._restart_requested:
+            return False
+        self._restart_requested = True
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+        return True
+
+    def _restart_backend(self):
+        """在读取线程中重启后端进程，有待定尺寸时同时调整输出尺寸"""
+        size, self._pending_output_size = self._pending_output_size, None
+        restart_requested, self._restart_requested = self._restart_requested, False
+        old = self.process
+        self._detach_stderr()
+        if old.poll() is None:
+            old.terminate()
+        try:
+            old.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            old.kill()
+        old.stdout.close()
+
+        if size and size != (self.output_width, self.output_height):
+            self.output_width, self.output_height = size
+            self._allocate_frame_slots()
+            self.renegotiations += 1
+            print(f"视频输出尺寸调整为 {self.output_width}x{self.output_height}")
+        self._stderr_pending = b""
+        self._init_backend_process()
+        if restart_requested:
+            self.restarts += 1
+            print(f"{self.backend.upper()}拉流进程已重启")
+
     def run(self):
         """线程主循环"""
         tag = self.backend.upper()
@@ -159,28 +342,91 @@ class VideoThread(threading.Thread):
             print(f"{tag}进程未初始化")
             return
 
-        frame_size = self.base_width * self.base_height * 3
+        write_index = 0
         while self.running:
             try:
-                raw_frame = self.process.stdout.read(frame_size)
-                if len(raw_frame) == frame_size:
-                    frame = np.frombuffer(raw_frame, np.uint8).reshape((self.base_height, self.base_width, 3))
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                    with self.lock:
-                        while len(self.frame_queue) >= self.max_queue_size:
-                            self.frame_queue.pop(0)
-                        self.frame_queue.append(frame_rgb)
-
-                    self.video_connected = True
+                # 直接读入下一个槽位，稳态下每帧不再分配新的缓冲区
+                if not self._read_exact(self.process.stdout, self._slot_views[write_index]):
+                    if (self._pending_output_size or self._restart_requested) and self.running:
+                        self._restart_backend()
+                        write_index = 0
+                    continue
+
+                decoded_at = time.perf_counter()
+                self._slot_seq[write_index] = self.frames_received + 1
+                self._slot_time[write_index] = decoded_at
+
+                # 单次赋值发布，读者拿到的总是完整的一帧
+                self._latest_index = write_index
+                self.frames_received += 1
+                for listener in self.frame_listeners:
+                    listener(self._frame_slots[write_index], decoded_at)
+                write_index = (write_index + 1) % self.ring_size
+                self.video_connected = True
 
             except Exception as e:
                 print(f"视频读取错误 ({tag}): {e}")
                 self.video_connected = False
 
+    def _read_exact(self, stream, view):
+        """
+        从管道读满一帧到 view
+
+        返回:
+            bool: 是否读到完整帧；管道关闭时返回 False
+        """
+        filled = 0
+        size = len(view)
+        while filled < size:
+            count = stream.readinto(view[filled:])
+            if not count:
+                return False
+            filled += count
+        return True
+
+    def add_frame_listener(self, callback):
+        """
+        注册帧回调 callback(frame, decoded_at)
+
+        在读取线程中、帧发布后立即调用，decoded_at 为 time.perf_counter()；回调须尽快返回，
+        否则会拖慢读取并在管道中积压帧。用于延迟测量、连拍等。
+        """
+        # 整体替换列表，读取线程正在遍历的旧列表不受影响
+        self.frame_listeners = self.frame_listeners + [callback]
+
+    def remove_frame_listener(self, callback):
+        """注销 add_frame_listener 注册的回调，未注册时忽略"""
+        self.frame_listeners = [listener for listener in self.frame_listeners if listener != callback]
+
+    def has_frame(self):
+        """是否已收到至少一帧完整视频"""
+        return self._latest_index >= 0
+
+    def frame_age(self, now=None):
+        """最新帧距今的秒数，尚无帧时返回 None"""
+        index = self._latest_index
+        if index < 0:
+            return None
+        return (time.perf_counter() if now is None else now) - self._slot_time[index]
+
+    def is_stalled(self, timeout, now=None):
+        """
+        画面是否已停滞：自最新帧（或后端最近一次启动，取较晚者）起超过 timeout 秒没有新帧
+
+        timeout <= 0 表示不检查。
+        """
+        if timeout <= 0:
+            return False
+        now = time.perf_counter() if now is None else now
+        index = self._latest_index
+        last = self._slot_time[index] if index >= 0 else 0.0
+        return now - max(last, self.backend_started_at) > timeout
+
     def stop(self):
         """设置线程停止标志"""
         self.running = False  # 设置线程停止标志
+        self._detach_stderr()
+        self._close_snapshot_writer()
 
         # 等待stderr线程结束
         if self.stderr_thread and self.stderr_thread.is_alive():
@@ -189,6 +435,8 @@ class VideoThread(threading.Thread):
     def stop_force(self):
         """强制停止线程"""
         self.running = False  # 强制停止
+        self._detach_stderr()
+        self._close_snapshot_writer()
         self.join(timeout=3)  # 加入超时限制，防止无限等待
 
         # 等待stderr线程结束
@@ -208,39 +456,77 @@ class VideoThread(threading.Thread):
             show_undistorted: 是否显示去畸变后的图像
             
         返回:
-            最新的视频帧，如果队列为空返回None
+            最新的视频帧（环形缓冲区槽位的视图，需要长期保留时请 copy()），尚无帧时返回None
+        """
+        return self.get_latest_frame_info(show_undistorted)[0]
+
+    def get_latest_frame_info(self, show_undistorted=False, copy=False):
+        """
+        获取最新的帧及其序号和读出时刻
+
+        参数:
+            show_undistorted: 是否显示去畸变后的图像
+            copy: 返回独立的拷贝（截图用）；否则返回槽位或去畸变缓冲区的视图
+
+        返回:
+            tuple: (帧, 序号, 读出时刻 time.perf_counter())；尚无帧时为 (None, 0, None)。
+                   序号不变说明没有新帧，界面可复用上次的绘制结果
         """
         try:
-            if self.frame_queue:
-                with self.lock:  # 使用锁来确保线程安全
-                    if len(self.frame_queue) > 0:  # 再次检查队列是否为空
-                        latest_frame = self.frame_queue[-1]
+            # 先取缓冲区再取下标：重新协商时下标先作废，不会用新下标访问旧缓冲区之外的槽位
+            slots, seqs, times = self._frame_slots, self._slot_seq, self._slot_time
+            index = self._latest_index
+            if index < 0:
+                return None, 0, None
+            latest_frame = slots[index]
+
+            seq = seqs[index]
+            if show_undistorted:
+                with self._undistort_lock:
+                    if copy and seq != self._undistorted_seq:
+                        # 截图写入新数组，不覆盖显示端可能仍在读取的输出缓冲区
+                        latest_frame = self.undistortion.undistort(latest_frame, (self.base_width, self.base_height),
+                                                                   copy=True)
                     else:
-                        return None
-
-                if show_undistorted:
-                    undistorted_frame = undistort_frame(latest_frame, self.base_width, self.base_height)
-                    return undistorted_frame
-                else:
-                    return latest_frame
-            return None
+                        # 同一帧只去畸变一次，界面刷新率高于视频帧率时不重复 remap
+                        if seq != self._undistorted_seq:
+                            self._undistorted_frame = self.undistortion.undistort(
+                                latest_frame, (self.base_width, self.base_height))
+                            self._undistorted_seq = seq
+                        latest_frame = self._undistorted_frame.copy() if copy else self._undistorted_frame
+            elif copy:
+                latest_frame = latest_frame.copy()
+            return latest_frame, seq, times[index]
         except Exception as e:
             print(f"获取视频帧时出错: {str(e)}")
-            return None
+            return None, 0, None
 
-    def save_frame(self, frame):
+    def save_frame(self, frame, metadata=None):
         """
-        保存当前帧
+        保存当前帧：交给 SnapshotWriter 在后台编码写盘，不阻塞调用线程
         
         参数:
-            frame: 要保存的帧
+            frame: 要保存的帧（RGB，与 get_latest_frame 返回的格式一致）
+            metadata: 写入同名 .json 附属文件的遥测数据，None 时不写
+
+        返回:
+            bool: 是否已进入写盘队列
         """
+        if self.snapshot_writer is None:
+            self.snapshot_writer = SnapshotWriter()
+            self._owns_snapshot_writer = True
         self.capture_count += 1
-        # 使用项目内的assets目录保存图像
+        # 使用项目内的assets目录保存图像，文件名带时间戳，重启后不会覆盖之前的照片
         assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
-        filename = os.path.join(assets_dir, f"capture_{self.capture_count:04d}.jpg")
-        cv2.imwrite(filename, frame)  # 保存图像为 JPEG 文件
-        print(f"保存照片: {filename}")
+        filename = os.path.join(assets_dir, unique_snapshot_stem(assets_dir, "capture") + ".jpg")
+        return self.snapshot_writer.submit(frame, filename, metadata)
+
+    def _close_snapshot_writer(self):
+        """只关闭自己创建的 SnapshotWriter，外部传入的由创建者负责"""
+        if self._owns_snapshot_writer and self.snapshot_writer is not None:
+            self.snapshot_writer.close()
+            self.snapshot_writer = None
+            self._owns_snapshot_writer = False
 
     def get_ffmpeg_logs(self, max_lines=10):
         """
@@ -265,14 +551,29 @@ camera_matrix = np.array([[605.571998544127, 0, 641.654856317165],  # 内参矩
 distortion_coefficients = np.array([-0.326257291325774, 0.0854715353372504, 0, 0])  # 畸变系数
 
 
-def undistort_frame(frame, video_base_width, video_base_height):
+def scale_camera_matrix(matrix, calibration_size, image_size):
+    """把按 calibration_size 标定的内参矩阵换算到 image_size（焦距与主点按比例缩放）"""
+    if calibration_size is None or tuple(calibration_size) == tuple(image_size):
+        return matrix
+    sx = image_size[0] / calibration_size[0]
+    sy = image_size[1] / calibration_size[1]
+    scaled = matrix.copy()
+    scaled[0, 0] *= sx
+    scaled[0, 2] *= sx
+    scaled[1, 1] *= sy
+    scaled[1, 2] *= sy
+    return scaled
+
+
+def undistort_frame(frame, video_base_width, video_base_height, calibration_size=None):
     """
-    对图像进行去畸变处理
+    对图像进行去畸变处理（只做几何映射，与通道排列无关，RGB 帧无需先转换为 BGR）
     
     参数:
         frame: 输入图像
         video_base_width: 视频宽度
         video_base_height: 视频高度
+        calibration_size: 标定时的分辨率 (宽, 高)；与当前帧尺寸不同时（解码端缩放）换算内参
         
     返回:
         去畸变后的图像
@@ -281,16 +582,80 @@ def undistort_frame(frame, video_base_width, video_base_height):
     if frame is None:
         raise ValueError("传递给 undistort_frame 的帧是 None，无法进行去畸变处理")
 
+    matrix = scale_camera_matrix(camera_matrix, calibration_size, (video_base_width, video_base_height))
+
     # 计算去畸变的映射矩阵
-    new_camera_matrix, roi = cv2.getOptimalNewCameraMatrix(camera_matrix, distortion_coefficients,
+    new_camera_matrix, roi = cv2.getOptimalNewCameraMatrix(matrix, distortion_coefficients,
                                                            (video_base_width, video_base_height), 1,
                                                            (video_base_width, video_base_height))
 
     # 去畸变
-    undistorted_frame = cv2.undistort(frame, camera_matrix, distortion_coefficients, None, new_camera_matrix)
+    undistorted_frame = cv2.undistort(frame, matrix, distortion_coefficients, None, new_camera_matrix)
 
     # 裁剪去畸变后图像的有效区域
     x, y, w, h = roi
     undistorted_frame = undistorted_frame[y:y + h, x:x + w]
 
     return undistorted_frame
+
+
+class UndistortionEngine:
+    """
+    缓存映射表的去畸变器
+
+    按 (宽, 高, 标定分辨率, alpha) 计算一次 initUndistortRectifyMap，保存定点映射表（CV_16SC2）和 ROI，
+    之后每帧只做一次 cv2.remap，写入预分配的输出缓冲区。
+    本身不加锁，多线程共用时由调用方串行化（见 VideoThread._undistort_lock）；
+    返回的是输出缓冲区的裁剪视图，下一次调用时会被覆盖，copy=True 时写入新数组。
+    """
+
+    MAX_CACHED = 4  # 窗口尺寸可变，只保留最近使用的几组映射表
+
+    def __init__(self, camera_mtx=camera_matrix, dist_coeffs=distortion_coefficients, alpha=1.0):
+        self.camera_matrix = camera_mtx
+        self.distortion_coefficients = dist_coeffs
+        self.alpha = alpha
+        self._cache = {}
+        self.maps_built = 0
+
+    def _get_entry(self, width, height, channels, calibration_size):
+        key = (width, height, channels, calibration_size, self.alpha)
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            matrix = scale_camera_matrix(self.camera_matrix, calibration_size, (width, height))
+            new_matrix, roi = cv2.getOptimalNewCameraMatrix(matrix, self.distortion_coefficients,
+                                                            (width, height), self.alpha, (width, height))
+            map1, map2 = cv2.initUndistortRectifyMap(matrix, self.distortion_coefficients, None, new_matrix,
+                                                     (width, height), cv2.CV_16SC2)
+            dst = np.empty((height, width, channels), dtype=np.uint8)
+            entry = (map1, map2, roi, dst)
+            self.maps_built += 1
+            while len(self._cache) >= self.MAX_CACHED:
+                self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = entry  # 重新插入到末尾，按最近使用排序
+        return entry
+
+    def undistort(self, frame, calibration_size=None, copy=False):
+        """
+        对图像进行去畸变处理，结果与 undistort_frame 一致
+
+        参数:
+            frame: 输入图像（任意通道排列）
+            calibration_size: 标定时的分辨率 (宽, 高)；None 表示与帧尺寸相同
+            copy: 写入新分配的数组，不覆盖共享的输出缓冲区
+
+        返回:
+            去畸变并裁剪到有效区域的图像
+        """
+        if frame is None:
+            raise ValueError("传递给 UndistortionEngine 的帧是 None，无法进行去畸变处理")
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        if calibration_size is not None:
+            calibration_size = tuple(calibration_size)
+        map1, map2, roi, dst = self._get_entry(width, height, channels, calibration_size)
+        if copy:
+            dst = np.empty_like(dst)
+        cv2.remap(frame, map1, map2, cv2.INTER_LINEAR, dst=dst.reshape(frame.shape))
+        x, y, w, h = roi
+        return dst[y:y + h, x:x + w]
@@ -0,0 +1,577 @@
+"""
+视频录制模块
+与实时画面并行地把摄像头码流分段录制到磁盘，并在后台线程池中编码截图，主循环只负责投递
+"""
+
+import collections
+import glob
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Windows 专用常量，Linux 上不需要
+if not hasattr(subprocess, 'CREATE_NO_WINDOW'):
+    subprocess.CREATE_NO_WINDOW = 0
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def find_executable(name):
+    """查找可执行文件路径（优先打包目录下的 _internal/name.exe），找不到时原样返回 name"""
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+        candidate = os.path.join(base_dir, '_internal', name + '.exe')
+        if os.path.exists(candidate):
+            return candidate
+    path = shutil.which(name)
+    if path:
+        return path
+    return name
+
+
+def resolve_output_folder(folder):
+    """相对路径按项目根目录解析，与 assets 等目录保持一致"""
+    return folder if os.path.isabs(folder) else os.path.join(PROJECT_ROOT, folder)
+
+
+_stem_lock = threading.Lock()
+_recent_stems = collections.deque(maxlen=256)
+
+
+def unique_snapshot_stem(folder, prefix, now=None):
+    """
+    生成 prefix_年月日_时分秒_毫秒 形式的文件名主干（不含扩展名）
+
+    同一毫秒内重复截图或目录中已有同名文件时追加 _1、_2…，保证不覆盖之前的照片；
+    已分配的主干在进程内登记，文件尚未写完时也不会重复。
+    """
+    now = time.time() if now is None else now
+    stem = f"{prefix}_{time.strftime('%Y%m%d_%H%M%S', time.localtime(now))}_{int(now * 1000) % 1000:03d}"
+    with _stem_lock:
+        candidate, suffix = stem, 1
+        while candidate in _recent_stems or glob.glob(glob.escape(os.path.join(folder, candidate)) + ".*"):
+            candidate = f"{stem}_{suffix}"
+            suffix += 1
+        _recent_stems.append(candidate)
+    return candidate
+
+
+class StreamRecorder:
+    """
+    分段录像
+
+    单独起一个 FFmpeg 进程拉同一路 RTSP，-c copy 直接封装摄像头的 H.264/H.265 码流，不解码也不重新编码；
+    与 VideoThread 的解码进程互不影响，实时画面重启拉流时录像不断。
+    按 segment_seconds 切分文件，进程意外退出时最多损失最后一段。
+    录像期间进程意外退出（如摄像头断开）时，poll() 每隔 RESTART_DELAY_S 秒重启一次，
+    新分段按重启时刻命名；等待重启期间 interrupted 为 True，供界面提示。
+    """
+
+    CONTAINERS = ("mkv", "mp4")
+    RESTART_DELAY_S = 3.0
+
+    def __init__(self, rtsp_url, output_folder="recordings", segment_seconds=300, container="mkv"):
+        """
+        参数:
+            rtsp_url: 摄像头地址（与 VideoThread 相同）
+            output_folder: 录像目录，相对路径按项目根目录解析
+            segment_seconds: 每段时长（秒）
+            container: mkv（断电也能播放已写入部分）或 mp4
+        """
+        self.rtsp_url = rtsp_url
+        self.output_folder = resolve_output_folder(output_folder)
+        self.segment_seconds = max(1, int(segment_seconds))
+        self.container = container if container in self.CONTAINERS else "mkv"
+        self.process = None
+        self.started_at = None  # time.time()，未录制时为 None
+        self.proc_log = collections.deque(maxlen=50)
+        self.stderr_thread = None
+        self.wanted = False  # 用户已开始录像且尚未停止（进程意外退出时仍为 True）
+        self.restarts = 0
+        self._restart_at = None  # time.perf_counter()，等待重启时的重启时刻
+
+    @property
+    def is_recording(self):
+        return self.process is not None and self.process.poll() is None
+
+    @property
+    def interrupted(self):
+        """录像进程意外退出、正在等待重启"""
+        return self.wanted and not self.is_recording
+
+    def elapsed(self, now=None):
+        """本次录制已持续的秒数，未录制时返回 None"""
+        if not self.is_recording:
+            return None
+        return (time.time() if now is None else now) - self.started_at
+
+    def build_command(self):
+        """构造 FFmpeg 录像命令（分段文件名按开始时刻命名，不会覆盖之前的录像）"""
+        command = [find_executable('ffmpeg'), '-loglevel', 'error']
+        if self.rtsp_url.startswith('rtsp://'):
+            command += ['-rtsp_transport', 'tcp']
+        command += [
+            '-i', self.rtsp_url,
+            '-map', '0:v', '-c', 'copy',
+            '-f', 'segment', '-segment_time', str(self.segment_seconds), '-reset_timestamps', '1',
+            '-strftime', '1',
+        ]
+        if self.container == "mp4":
+            # 分片 MP4：未正常收尾的分段也能播放
+            command += ['-segment_format_options', 'movflags=+frag_keyframe+empty_moov']
+        command.append(os.path.join(self.output_folder, f"dive_%Y%m%d_%H%M%S.{self.container}"))
+        return command
+
+    def start(self):
+        """开始录像，返回是否成功启动"""
+        if self.is_recording:
+            return True
+        command = self.build_command()
+        if shutil.which(command[0]) is None:
+            print(f"未找到 {command[0]}，无法录像")
+            return False
+        os.makedirs(self.output_folder, exist_ok=True)
+        if not self._launch(command):
+            return False
+        self.wanted = True
+        self.started_at = time.time()
+        print(f"开始录像: {self.output_folder}")
+        return True
+
+    def _launch(self, command):
+        """启动 FFmpeg 录像进程及其 stderr 读取线程"""
+        try:
+            # stdin 用于发送 q 让 FFmpeg 正常收尾当前分段
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                            stderr=subprocess.PIPE, creationflags=subprocess.CREATE_NO_WINDOW)
+        except OSError as e:
+            print(f"启动录像进程失败: {str(e)}")
+            self.process = None
+            return False
+        self.stderr_thread = threading.Thread(target=self._read_stderr, args=(self.process.stderr,), daemon=True)
+        self.stderr_thread.start()
+        return True
+
+    def poll(self, now=None):
+        """
+        主循环调用：发现录像进程意外退出时安排重启，到时后重新拉流
+
+        返回:
+            bool: 本次是否重启了录像进程
+        """
+        if not self.wanted or self.is_recording:
+            return False
+        now = time.perf_counter() if now is None else now
+        if self._restart_at is None:
+            process, self.process = self.process, None
+            if process is not None:
+                if self.stderr_thread:
+                    self.stderr_thread.join(timeout=1)
+                reason = self.proc_log[-1] if self.proc_log else f"退出码 {process.returncode}"
+                print(f"录像进程意外退出（{reason}），{self.RESTART_DELAY_S:.0f} 秒后重试")
+            self._restart_at = now + self.RESTART_DELAY_S
+            return False
+        if now < self._restart_at:
+            return False
+
+        self._restart_at = None
+        if not self._launch(self.build_command()):
+            return False
+        self.restarts += 1
+        print(f"录像已恢复（第 {self.restarts} 次重启）")
+        return True
+
+    def stop(self, timeout=5.0):
+        """停止录像：先请求 FFmpeg 正常退出，超时后再终止进程"""
+        was_wanted, self.wanted = self.wanted, False
+        self._restart_at = None
+        process, self.process = self.process, None
+        if process is None:
+            if was_wanted:
+                self.started_at = None
+                print("录像已停止")
+            return
+        if process.poll() is None:
+            try:
+                process.stdin.write(b"q")
+                process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.terminate()
+                try:
+                    process.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        if self.stderr_thread:
+            self.stderr_thread.join(timeout=1)
+        self.started_at = None
+        print("录像已停止")
+
+    def toggle(self):
+        """切换录像状态，返回切换后是否在录像；等待重启时切换为停止"""
+        if self.wanted or self.is_recording:
+            self.stop()
+            return False
+        return self.start()
+
+    def _read_stderr(self, stderr):
+        for line in iter(stderr.readline, b""):
+            text = line.decode("utf-8", errors="replace").rstrip()
+            if text:
+                self.proc_log.append(text)
+        stderr.close()
+
+    def get_logs(self, max_lines=10):
+        """返回录像进程最近的日志行"""
+        return list(self.proc_log)[-max_lines:]
+
+
+class SnapshotWriter:
+    """
+    后台截图编码
+
+    submit() 拷贝一份帧后放入有界队列立即返回，由 workers 个线程转换为 BGR 并 cv2.imwrite；
+    队列已满时丢弃本次截图而不是阻塞主循环（dropped 计数）。cv2 编码期间释放 GIL，多个线程可以并行。
+    """
+
+    def __init__(self, workers=2, max_pending=8):
+        """
+        参数:
+            workers: 编码线程数
+            max_pending: 等待编码的截图上限
+        """
+        self._queue = queue.Queue(maxsize=max(1, max_pending))
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self._closed = False
+        self._threads = [threading.Thread(target=self._worker, daemon=True, name=f"snapshot-writer-{i}")
+                         for i in range(max(1, workers))]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def submit(self, frame, path, metadata=None, copy=True):
+        """
+        投递一帧截图
+
+        参数:
+            frame: RGB 帧（可以是环形缓冲区槽位视图，默认会拷贝）
+            path: 输出文件路径，扩展名决定编码格式
+            metadata: 可 JSON 序列化的 dict，图片写完后写入同名 .json 附属文件
+            copy: 调用方不再修改 frame 时可传 False 省去拷贝
+
+        返回:
+            bool: 是否已入队；队列满或已关闭时返回 False
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait((frame.copy() if copy else frame, path, metadata))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            print(f"截图队列已满，丢弃: {path}")
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                frame, path, metadata = item
+                if self._write(frame, path) and metadata is not None:
+                    self._write_metadata(metadata, path)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, frame, path):
+        try:
+            # OpenCV 按 BGR 写文件，在编码线程中转换
+            ok = cv2.imwrite(path, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        except cv2.error as e:
+            print(f"保存照片失败: {path} ({str(e)})")
+            ok = False
+        with self._lock:
+            if ok:
+                self.written += 1
+            else:
+                self.failed += 1
+        if ok:
+            print(f"保存照片: {path}")
+        return ok
+
+    def _write_metadata(self, metadata, path):
+        metadata_path = os.path.splitext(path)[0] + ".json"
+        try:
+            with open(metadata_path, "w", encoding="utf-8") as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=2)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"写入截图信息失败: {metadata_path} ({str(e)})")
+
+    def flush(self):
+        """等待已入队的截图全部写完"""
+        self._queue.join()
+
+    def close(self, timeout=5.0):
+        """写完已入队的截图后结束编码线程"""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = time.perf_counter() + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.perf_counter()))
+
+
+class _Burst:
+    """一次连拍：在视频读取线程把连续 count 帧拷入预分配的内存，凑齐后再交给编码线程"""
+
+    def __init__(self, stem, count, frame_shape, video_thread, metadata_provider, timeout):
+        self.stem = stem
+        self.frames = np.empty((count,) + frame_shape, dtype=np.uint8)
+        self.records = []  # 每帧的序号、读出时刻与遥测
+        self.video_thread = video_thread
+        self.metadata_provider = metadata_provider
+        self.deadline = time.perf_counter() + timeout
+        self.done = threading.Event()
+
+    def on_frame(self, frame, decoded_at):
+        """VideoThread 帧回调（读取线程）"""
+        if self.done.is_set():
+            return
+        if frame.shape != self.frames.shape[1:]:
+            self.done.set()  # 解码尺寸重新协商，保留已拍到的帧
+            return
+        np.copyto(self.frames[len(self.records)], frame)
+        self.records.append({
+            "frame_seq": self.video_thread.frames_received,
+            "decoded_at": decoded_at,
+            "telemetry": self.metadata_provider() if self.metadata_provider else {},
+        })
+        if len(self.records) == len(self.frames):
+            self.done.set()
+
+
+class SnapshotService:
+    """
+    截图服务：单张截图与连拍，统一命名并附带遥测
+
+    - capture()：保存当前显示的帧，文件名为 capture_时间戳.jpg
+    - start_burst()：从下一帧起按视频帧率连续取 burst_frames 帧（解码输出，不去畸变），
+      全部在内存中凑齐后由 poll() 一次性交给 SnapshotWriter，文件名为 burst_时间戳_00.jpg…
+    - 每张图片写一个同名 .json，记录拍摄时刻、帧序号以及 metadata_provider() 返回的深度、温度、控制量等
+    - 解码端缩放到窗口尺寸时，capture_from() / start_burst() 先让 VideoThread 切回摄像头分辨率
+      （重启拉流），原分辨率的帧到达后再拍；full_size_pending 期间调用方不应恢复缩放
+
+    metadata_provider 在连拍时于视频读取线程调用，只能读取线程安全的数据。
+    """
+
+    def __init__(self, writer, output_folder="captures", burst_frames=5, metadata_provider=None,
+                 image_format="jpg", burst_timeout=2.0, full_size_timeout=10.0):
+        """
+        参数:
+            writer: SnapshotWriter，队列长度应不小于 burst_frames
+            output_folder: 截图目录，相对路径按项目根目录解析
+            burst_frames: 每次连拍的帧数
+            metadata_provider: 返回遥测 dict 的回调，None 时只记录帧信息
+            image_format: 图片扩展名
+            burst_timeout: 视频中断时连拍最多等待的秒数，超时保存已拍到的帧
+            full_size_timeout: 等待解码端切回摄像头分辨率的最长秒数，超时放弃本次截图
+        """
+        self.writer = writer
+        self.output_folder = resolve_output_folder(output_folder)
+        self.burst_frames = max(1, int(burst_frames))
+        self.metadata_provider = metadata_provider
+        self.image_format = image_format
+        self.burst_timeout = burst_timeout
+        self.full_size_timeout = full_size_timeout
+        self._burst = None
+        self._full_size_request = None  # 等待原分辨率画面的截图/连拍请求
+        os.makedirs(self.output_folder, exist_ok=True)
+
+    @property
+    def burst_active(self):
+        return self._burst is not None
+
+    @property
+    def full_size_pending(self):
+        """是否有截图/连拍正在等待或使用摄像头原分辨率的画面"""
+        return self._full_size_request is not None
+
+    def capture_from(self, video_thread, show_undistorted=False):
+        """
+        保存 video_thread 当前画面，始终为摄像头分辨率
+
+        解码端未缩放时立即保存并返回图片路径；缩放时切回原分辨率，由 poll() 在原分辨率帧到达后保存，返回 None。
+        """
+        if self._full_size_request is not None or video_thread.is_scaled():
+            self._request_full_size(video_thread, "capture", undistorted=show_undistorted)
+            return None
+        # 取帧时即拷贝：渲染线程可能同时在去畸变缓冲区上写入下一帧
+        frame, frame_seq, captured_at = video_thread.get_latest_frame_info(show_undistorted, copy=True)
+        if frame is None:
+            return None
+        return self.capture(frame, frame_seq, captured_at, show_undistorted, copy=False)
+
+    def _request_full_size(self, video_thread, kind, **options):
+        if self._full_size_request is not None:
+            print("正在切换到摄像头分辨率，请稍后再拍")
+            return False
+        self._full_size_request = dict(options, kind=kind, video_thread=video_thread, started=False,
+                                       deadline=time.perf_counter() + self.full_size_timeout)
+        video_thread.set_output_size(video_thread.base_width, video_thread.base_height)
+        print("切换到摄像头分辨率后拍摄...")
+        return True
+
+    def _service_full_size_request(self, now):
+        """原分辨率的帧到达后执行等待中的截图/连拍，连拍结束后释放请求"""
+        request = self._full_size_request
+        if request is None or self._burst is not None:
+            return
+        if request["started"]:
+            self._full_size_request = None  # 连拍已结束，调用方可以恢复解码端缩放
+            return
+        video_thread = request["video_thread"]
+        if not video_thread.has_full_size_frame():
+            if now >= request["deadline"]:
+                print("等待摄像头分辨率画面超时，放弃本次截图")
+                self._full_size_request = None
+            return
+        if request["kind"] == "capture":
+            self._full_size_request = None
+            self.capture_from(video_thread, request["undistorted"])
+        else:
+            request["started"] = self._start_burst_now(video_thread, request["count"])
+            if not request["started"]:
+                self._full_size_request = None
+
+    def capture(self, frame, frame_seq=None, captured_at=None, undistorted=False, copy=True):
+        """
+        保存一张截图
+
+        参数:
+            frame: RGB 帧
+            frame_seq / captured_at: VideoThread.get_latest_frame_info() 返回的序号与读出时刻
+            undistorted: 是否为去畸变画面
+            copy: frame 已是调用方不再使用的拷贝时传 False
+
+        返回:
+            str: 图片路径；未能入队时返回 None
+        """
+        now = time.time()
+        stem = unique_snapshot_stem(self.output_folder, "capture", now)
+        path = os.path.join(self.output_folder, f"{stem}.{self.image_format}")
+        metadata = {
+            "file": os.path.basename(path),
+            "captured_at": self._wall_time(captured_at, now),
+            "frame_seq": frame_seq,
+            "undistorted": undistorted,
+        }
+        if self.metadata_provider:
+            metadata.update(self.metadata_provider())
+        return path if self.writer.submit(frame, path, metadata, copy=copy) else None
+
+    def start_burst(self, video_thread, count=None):
+        """
+        开始连拍，返回是否开始；上一次连拍未结束时忽略
+
+        参数:
+            video_thread: 提供帧回调的 VideoThread
+            count: 本次帧数，None 时使用 burst_frames
+        """
+        if self._burst is not None:
+            return False
+        count = max(1, int(count or self.burst_frames))
+        if self._full_size_request is not None or video_thread.is_scaled():
+            return self._request_full_size(video_thread, "burst", count=count)
+        return self._start_burst_now(video_thread, count)
+
+    def _start_burst_now(self, video_thread, count):
+        shape = (video_thread.output_height, video_thread.output_width, 3)
+        stem = unique_snapshot_stem(self.output_folder, "burst")
+        self._burst = _Burst(stem, count, shape, video_thread, self.metadata_provider, self.burst_timeout)
+        video_thread.add_frame_listener(self._burst.on_frame)
+        print(f"开始连拍 {count} 帧")
+        return True
+
+    def poll(self, now=None):
+        """
+        主循环调用：连拍凑齐或超时后注销帧回调并提交编码
+
+        返回:
+            int: 本次提交的帧数
+        """
+        now = time.perf_counter() if now is None else now
+        self._service_full_size_request(now)
+        burst = self._burst
+        if burst is None:
+            return 0
+        if not burst.done.is_set() and now < burst.deadline:
+            return 0
+        burst.video_thread.remove_frame_listener(burst.on_frame)
+        burst.done.set()
+        self._burst = None
+
+        records = list(burst.records)
+        submitted = 0
+        for index, record in enumerate(records):
+            path = os.path.join(self.output_folder, f"{burst.stem}_{index:02d}.{self.image_format}")
+            metadata = {
+                "file": os.path.basename(path),
+                "captured_at": self._wall_time(record["decoded_at"]),
+                "frame_seq": record["frame_seq"],
+                "undistorted": False,
+                "burst": {
+                    "id": burst.stem,
+                    "index": index,
+                    "count": len(records),
+                    "offset_ms": round((record["decoded_at"] - records[0]["decoded_at"]) * 1000, 1),
+                },
+            }
+            metadata.update(record["telemetry"])
+            # 连拍缓冲区不再复用，直接交给编码线程
+            if self.writer.submit(burst.frames[index], path, metadata, copy=False):
+                submitted += 1
+        print(f"连拍结束: {len(records)}/{len(burst.frames)} 帧，已提交 {submitted} 帧")
+        return submitted
+
+    def cancel_burst(self):
+        """放弃进行中的连拍"""
+        burst, self._burst = self._burst, None
+        if burst is not None:
+            burst.video_thread.remove_frame_listener(burst.on_frame)
+            burst.done.set()
+
+    @staticmethod
+    def _wall_time(perf_time, now=None):
+        """把 time.perf_counter() 时刻换算为本地时间字符串（毫秒精度）"""
+        now = time.time() if now is None else now
+        if perf_time is not None:
+            now -= time.perf_counter() - perf_time
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)) + f".{int(now * 1000) % 1000:03d}"
@@ -22,9 +22,39 @@ extern uint8_t transbuf[256];
 
 extern float servo0angle;
 
+/* v2 协议命令：带序号/时间戳的运动控制帧与协议协商（protocol_process.h 未定义时使用默认值）
+ * 注意：comm.c 的帧长校验需要同时接受 0x05 (40 字节) 和 0x06 (13 字节) */
+#ifndef CMD_MOTION_CTRL_V2
+#define CMD_MOTION_CTRL_V2   0x05
+#endif
+#ifndef CMD_PROTO_HELLO
+#define CMD_PROTO_HELLO      0x06
+#endif
+#ifndef CMD_PROTO_HELLO_ACK
+#define CMD_PROTO_HELLO_ACK  0x07
+#endif
+#ifndef PROTOCOL_VERSION
+#define PROTOCOL_VERSION     2
+#endif
+#ifndef MOTION_MAX_AGE_MS
+#define MOTION_MAX_AGE_MS    200   // 传输时延超过该值的 v2 帧视为过期
+#endif
+
+/* v2 运动控制帧状态 */
+static uint16_t motion_last_seq = 0;     // 最后接受的序号
+static uint8_t  motion_seq_valid = 0;    // HELLO 的会话号变化后清零，重新开始跟踪序号
+static uint16_t host_session = 0;        // 最近一次 HELLO 的上位机会话号
+static uint8_t  host_session_valid = 0;
+static uint16_t motion_dropped = 0;      // 因乱序/重复/过期丢弃的帧数
+static int32_t  host_clock_offset = 0;   // 下位机时钟 - 上位机时间戳 (ms)，含 HELLO 的单程时延
+static uint8_t  host_clock_valid = 0;
+
 /* 私有函数 */
 static void process_motion_ctrl(uint8_t *pdata);
+static void process_motion_ctrl_v2(uint8_t *pdata);
+static void forward_motion_values(uint8_t *values);
 static void process_thrust_config(uint8_t *pdata);
+static void process_proto_hello(uint8_t *pdata);
 static void apply_motor_control(void);
 
 /*
@@ -53,6 +83,14 @@ void Protocol_Process_Data(uint8_t *pdata, uint16_t length)
             process_thrust_config(pdata);
             break;
 
+        case CMD_MOTION_CTRL_V2:
+            process_motion_ctrl_v2(pdata);
+            break;
+
+        case CMD_PROTO_HELLO:
+            process_proto_hello(pdata);
+            break;
+
         default:
             // 未知命令
             break;
@@ -80,6 +118,59 @@ void Protocol_Process_Data(uint8_t *pdata, uint16_t length)
  * 备注  : 解析后将内部转发到 INTER_COMM，并设置 servo0angle
  */
 static void process_motion_ctrl(uint8_t *pdata)
+{
+    forward_motion_values(pdata + 1);
+}
+
+/*
+ * 函数名: process_motion_ctrl_v2
+ * 描述  : 解析带序号和时间戳的运动控制帧 (CMD 0x05)
+ *          帧格式:
+ *            [0]      CMD = 0x05
+ *            [1 - 2]  seq       (uint16_t, 小端)
+ *            [3 - 6]  timestamp (uint32_t, 小端, 上位机毫秒时钟)
+ *            [7 -34]  x, y, z, roll, pitch, yaw, servo0 (7 个 float, 同 CMD 0x01)
+ *            [35]     CHECK_XOR
+ *          帧总长度: 40 字节 (含帧头帧尾)
+ * 输入  : pdata - 协议数据区指针
+ * 输出  : 无
+ * 备注  : 序号不比上一帧新（乱序/重复）或已协商时钟且传输时延超过 MOTION_MAX_AGE_MS 时丢弃
+ */
+static void process_motion_ctrl_v2(uint8_t *pdata)
+{
+    uint16_t seq;
+    uint32_t host_ts;
+
+    memcpy(&seq, pdata + 1, 2);
+    memcpy(&host_ts, pdata + 3, 4);
+
+    /* 16 位序号回绕比较 */
+    if (motion_seq_valid && (int16_t)(seq - motion_last_seq) <= 0) {
+        motion_dropped++;
+        return;
+    }
+
+    if (host_clock_valid) {
+        int32_t age = (int32_t)(HAL_GetTick() - (host_ts + (uint32_t)host_clock_offset));
+        if (age > MOTION_MAX_AGE_MS) {
+            motion_dropped++;
+            return;
+        }
+    }
+
+    motion_last_seq = seq;
+    motion_seq_valid = 1;
+    forward_motion_values(pdata + 7);
+}
+
+/*
+ * 函数名: forward_motion_values
+ * 描述  : 把 7 个 float 控制量 (x, y, z, roll, pitch, yaw, servo0) 转发到 INTER_COMM
+ * 输入  : values - 指向 x 的指针
+ * 输出  : 无
+ * 备注  : 设置 servo0angle
+ */
+static void forward_motion_values(uint8_t *values)
 {
     float temp_float;
 
@@ -91,32 +182,32 @@ static void process_motion_ctrl(uint8_t *pdata)
     transbuf[36] = 0xFB;
     transbuf[37] = 0xBF;
 
-    /* x (offset 1) */
-    memcpy(&temp_float, pdata + 5, 4);
+    /* x (offset 0) */
+    memcpy(&temp_float, values + 4, 4);
     memcpy(transbuf + 3, &temp_float, 4);
 
-    /* y (offset 5) */
-    memcpy(&temp_float, pdata + 1, 4);
+    /* y (offset 4) */
+    memcpy(&temp_float, values + 0, 4);
     memcpy(transbuf + 7, &temp_float, 4);
 
-    /* z (offset 9) */
-    memcpy(&temp_float, pdata + 9, 4);
+    /* z (offset 8) */
+    memcpy(&temp_float, values + 8, 4);
     memcpy(transbuf + 11, &temp_float, 4);
 
-    /* roll (offset 13) */
-    memcpy(&temp_float, pdata + 13, 4);
+    /* roll (offset 12) */
+    memcpy(&temp_float, values + 12, 4);
     memcpy(transbuf + 15, &temp_float, 4);
 
-    /* pitch (offset 17) */
-    memcpy(&temp_float, pdata + 17, 4);
+    /* pitch (offset 16) */
+    memcpy(&temp_float, values + 16, 4);
     memcpy(transbuf + 19, &temp_float, 4);
 
-    /* yaw (offset 21) */
-    memcpy(&temp_float, pdata + 21, 4);
+    /* yaw (offset 20) */
+    memcpy(&temp_float, values + 20, 4);
     memcpy(transbuf + 23, &temp_float, 4);
 
-    /* servo0 (offset 25) — 解析舵机角度，设置全局变量并转发 */
-    memcpy(&temp_float, pdata + 25, 4);
+    /* servo0 (offset 24) — 解析舵机角度，设置全局变量并转发 */
+    memcpy(&temp_float, values + 24, 4);
     if (temp_float > 0.01f) {
         memcpy(transbuf + 27, &temp_float, 4);
     }
@@ -197,6 +288,64 @@ static void process_thrust_config(uint8_t *pdata)
     HAL_UART_Transmit(&EXTER_COMM, ack_buf, 6, 16);
 }
 
+/*
+ * 函数名: process_proto_hello
+ * 描述  : 处理协议协商/心跳帧 (CMD 0x06) 并回复 CMD 0x07
+ *          请求格式:
+ *            [0]     CMD = 0x06
+ *            [1]     上位机支持的最高协议版本 (uint8_t)
+ *            [2 - 5] 上位机时间戳 (uint32_t, 小端, ms)
+ *            [6 - 7] 上位机会话号 (uint16_t, 小端, 上位机每次启动随机选取)
+ *          应答格式 (19 字节):
+ *            FRAME_HEADER: 0xFA 0xAF
+ *            [2]     CMD = 0x07
+ *            [3]     协商版本 (uint8_t)
+ *            [4 - 7] 回显的上位机时间戳 (uint32_t)
+ *            [8 -11] 下位机时钟 HAL_GetTick() (uint32_t)
+ *            [12-13] 最后接受的 v2 序号 (uint16_t)
+ *            [14-15] 丢弃的 v2 帧数 (uint16_t)
+ *            [16]    CHECK_XOR (从 CMD 到 [15], 共 14 字节)
+ *            FRAME_FOOTER: 0xFB 0xBF
+ * 输入  : pdata - 协议数据区指针
+ * 输出  : 无
+ * 备注  : 每次都更新时钟偏差；只有会话号变化（上位机重启，序号从 0 开始）时才重新跟踪序号，
+ *          运行中每 2 秒一次的心跳 HELLO 不打断序号检查
+ */
+static void process_proto_hello(uint8_t *pdata)
+{
+    uint32_t host_ts;
+    uint16_t session;
+    uint32_t now = HAL_GetTick();
+    uint8_t version = pdata[1] < PROTOCOL_VERSION ? pdata[1] : PROTOCOL_VERSION;
+    uint8_t ack_buf[20];
+
+    memcpy(&host_ts, pdata + 2, 4);
+    memcpy(&session, pdata + 6, 2);
+    host_clock_offset = (int32_t)(now - host_ts);
+    host_clock_valid = 1;
+
+    if (!host_session_valid || session != host_session) {
+        host_session = session;
+        host_session_valid = 1;
+        motion_seq_valid = 0;
+    }
+
+    memset(ack_buf, 0, sizeof(ack_buf));
+    ack_buf[0] = FRAME_HEADER1;         // 0xFA
+    ack_buf[1] = FRAME_HEADER2;         // 0xAF
+    ack_buf[2] = CMD_PROTO_HELLO_ACK;   // 0x07
+    ack_buf[3] = version;
+    memcpy(ack_buf + 4,  &host_ts, 4);
+    memcpy(ack_buf + 8,  &now, 4);
+    memcpy(ack_buf + 12, &motion_last_seq, 2);
+    memcpy(ack_buf + 14, &motion_dropped, 2);
+    ack_buf[16] = Check_Data(ack_buf + 2, 14);
+    ack_buf[17] = FRAME_FOOTER1;        // 0xFB
+    ack_buf[18] = FRAME_FOOTER2;        // 0xBF
+
+    HAL_UART_Transmit(&EXTER_COMM, ack_buf, 19, 16);
+}
+
 /*
  * 函数名: send_depth_temperature
  * 描述  : 将实时深度和温度值使用二进制帧上报到上位机
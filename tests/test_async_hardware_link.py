@@ -0,0 +1,202 @@
+import socket
+import threading
+import time
+import unittest
+
+from modules.hardware_controller import (
+    CMD_THRUST_ACK,
+    CMD_THRUST_CONFIG,
+    ControllerMonitor,
+    HardwareController,
+    NetworkWorker,
+    ThrustCurveDeployment,
+)
+from modules.io_reactor import IOReactor
+from modules.protocol_codec import FRAME_FOOTER, FRAME_HEADER
+
+MOTOR_PARAMS = {
+    f"m{i}": {"num": i, "np_mid": 2500.0, "np_ini": 3000.0, "pp_ini": 3000.0, "pp_mid": 3500.0,
+              "nt_end": -1500.0, "nt_mid": -750.0, "pt_mid": 750.0, "pt_end": 1500.0}
+    for i in range(6)
+}
+
+
+class FakeLowerController(threading.Thread):
+    """本地下位机：对 CMD_THRUST_CONFIG 回 ACK，可按电机编号丢弃指定次数的帧"""
+
+    def __init__(self, drop_counts=None, never_ack=(), ack_delay=0.0):
+        super().__init__(daemon=True)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.05)
+        self.drop_counts = dict(drop_counts or {})
+        self.never_ack = set(never_ack)
+        self.ack_delay = ack_delay
+        self.received = []
+        self.running = True
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def run(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            # CMD_THRUST_CONFIG: 帧头(2) + 命令(1) + 电机号(1) + 8 个 float + 校验(1) + 帧尾(2)
+            if len(data) != 39 or data[:2] != FRAME_HEADER or data[2] != CMD_THRUST_CONFIG:
+                continue
+            if HardwareController._xor_checksum(data[2:-3]) != data[-3]:
+                continue
+            motor_num = data[3]
+            self.received.append(motor_num)
+            if motor_num in self.never_ack:
+                continue
+            if self.drop_counts.get(motor_num, 0) > 0:
+                self.drop_counts[motor_num] -= 1
+                continue
+            time.sleep(self.ack_delay)
+            self.sock.sendto(FRAME_HEADER + bytes((CMD_THRUST_ACK, motor_num)) + FRAME_FOOTER, addr)
+
+    def stop(self):
+        self.running = False
+        self.join(timeout=1)
+        self.sock.close()
+
+
+class TestAsyncHardwareLink(unittest.TestCase):
+    def make_controller(self, rov):
+        hw = HardwareController(rov.address, MOTOR_PARAMS)
+        hw.setup_socket(0)
+        self.addCleanup(hw.client_socket.close)
+        return hw
+
+    def test_all_motors_acked_in_one_round_trip(self):
+        rov = FakeLowerController()
+        rov.start()
+        self.addCleanup(rov.stop)
+        hw = self.make_controller(rov)
+
+        start = time.perf_counter()
+        results = hw.hwinit_async()
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertTrue(hw.all_motors_initialized())
+        self.assertTrue(all(r["attempts"] == 1 for r in results.values()))
+        self.assertEqual(sorted(rov.received), list(range(6)))
+
+    def test_only_unacked_motor_is_retransmitted(self):
+        rov = FakeLowerController(drop_counts={3: 2}, never_ack={5})
+        rov.start()
+        self.addCleanup(rov.stop)
+        hw = self.make_controller(rov)
+
+        results = hw.hwinit_async(ack_timeout=0.02, max_attempts=4)
+        self.assertEqual(results["m3"]["attempts"], 3)
+        self.assertTrue(results["m3"]["acked"])
+        self.assertFalse(results["m5"]["acked"])
+        self.assertEqual(hw.get_failed_motors(), ["m5"])
+        self.assertEqual(rov.received.count(0), 1)
+        self.assertEqual(rov.received.count(5), 4)
+        # 原套接字仍可继续使用
+        self.assertTrue(hw.send_controller_data({"x": 0.0, "y": 0.0, "z": 0.0, "yaw": 0.0, "servo0": 0.85}))
+
+
+class TestDeploymentEngine(unittest.TestCase):
+    def test_retransmits_only_expired_motors(self):
+        sent = []
+        deployment = ThrustCurveDeployment(MOTOR_PARAMS, sent.append, ["m1", "m2"], ack_timeout=0.1, max_attempts=2)
+        deployment.start()
+        started = deployment.started_at
+        deployment.on_ack(1, started + 0.01)
+        self.assertFalse(deployment.poll(started + 0.05))
+        self.assertFalse(deployment.poll(started + 0.11))  # m2 第二次发送，超时翻倍到 0.2 秒
+        self.assertTrue(deployment.poll(started + 0.32))
+
+        self.assertEqual(sent, ["m1", "m2", "m2"])
+        report = deployment.report()
+        self.assertEqual(report["failed_motors"], ["m2"])
+        self.assertAlmostEqual(report["motors"]["m1"]["rtt"], 0.01)
+
+
+class TestThrustCurveDeployment(unittest.TestCase):
+    def setUp(self):
+        self.rov = FakeLowerController(drop_counts={3: 1}, never_ack={5})
+        self.rov.start()
+        self.addCleanup(self.rov.stop)
+        self.hw = HardwareController(self.rov.address, MOTOR_PARAMS)
+        self.hw.setup_socket(0)
+        self.addCleanup(self.hw.client_socket.close)
+        self.monitor = ControllerMonitor({"x": 0.0, "y": 0.0, "z": 0.0, "yaw": 0.0, "servo0": 0.85})
+        self.done = threading.Event()
+
+    def deploy(self, worker):
+        worker.thrust_ack_timeout = 0.02
+        worker.start()
+        self.addCleanup(worker.stop)
+        start = time.perf_counter()
+        self.assertTrue(worker.request_thrust_deployment(lambda report: self.done.set()))
+        self.assertFalse(worker.request_thrust_deployment())  # 未结束时不重复受理
+        self.assertLess(time.perf_counter() - start, 0.01)  # 调用方不被阻塞
+        self.assertTrue(self.done.wait(2))
+        return worker.last_deployment_report
+
+    def check_report(self, report):
+        self.assertFalse(report["success"])
+        self.assertEqual(report["failed_motors"], ["m5"])
+        self.assertEqual(report["motors"]["m0"]["attempts"], 1)
+        self.assertEqual(report["motors"]["m3"]["attempts"], 2)
+        self.assertEqual(report["motors"]["m5"]["attempts"], 4)
+        self.assertIsNotNone(report["motors"]["m3"]["rtt"])
+        self.assertFalse(self.hw.motor_init_status["m5"])
+        self.assertTrue(self.hw.motor_init_status["m3"])
+
+    def test_deploy_on_network_thread(self):
+        self.check_report(self.deploy(NetworkWorker(self.hw, self.monitor)))
+
+    def test_deploy_on_reactor(self):
+        reactor = IOReactor()
+        reactor.start()
+        self.addCleanup(reactor.stop)
+        self.check_report(self.deploy(NetworkWorker(self.hw, self.monitor, send_mode="fixed_rate", reactor=reactor)))
+
+
+class TestMotorInitWithWorkerRunning(unittest.TestCase):
+    """网络线程已在读取套接字时再次初始化电机（启动流程中 _wait_for_components 的情形）"""
+
+    def setUp(self):
+        self.rov = FakeLowerController(ack_delay=0.005)
+        self.rov.start()
+        self.addCleanup(self.rov.stop)
+        self.hw = HardwareController(self.rov.address, MOTOR_PARAMS)
+        self.hw.setup_socket(0)
+        self.addCleanup(self.hw.client_socket.close)
+        self.monitor = ControllerMonitor({"x": 0.0, "y": 0.0, "z": 0.0, "yaw": 0.0, "servo0": 0.85})
+
+    def check_all_acked(self, worker):
+        worker.start()
+        self.addCleanup(worker.stop)
+        time.sleep(0.05)  # 网络线程已开始收发
+
+        report = worker.deploy_thrust_curves()
+        self.assertIsNotNone(report)
+        self.assertTrue(report["success"])
+        self.assertTrue(self.hw.all_motors_initialized())
+
+        report = worker.deploy_thrust_curves(["m2", "m4"])
+        self.assertEqual(sorted(report["motors"]), ["m2", "m4"])
+        self.assertTrue(report["success"])
+
+    def test_worker_thread(self):
+        self.check_all_acked(NetworkWorker(self.hw, self.monitor, send_mode="fixed_rate", send_rate_hz=200))
+
+    def test_reactor(self):
+        reactor = IOReactor()
+        reactor.start()
+        self.addCleanup(reactor.stop)
+        self.check_all_acked(NetworkWorker(self.hw, self.monitor, reactor=reactor))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import socket
+import struct
+import time
+import unittest
+
+from modules.hardware_controller import (
+    CMD_DEPTH_TEMP,
+    CMD_THRUST_ACK,
+    HardwareController,
+)
+from modules.protocol_codec import (
+    CMD_MOTION_CTRL,
+    FRAME_FOOTER,
+    FRAME_HEADER,
+    MotionFrameEncoder,
+    xor_checksum,
+)
+
+
+def depth_temp_frame(depth, temperature):
+    return HardwareController._build_frame(CMD_DEPTH_TEMP, struct.pack('<2f', depth, temperature))
+
+
+def thrust_ack_frame(motor_num):
+    return FRAME_HEADER + bytes((CMD_THRUST_ACK, motor_num)) + FRAME_FOOTER
+
+
+class TestProtocolCodec(unittest.TestCase):
+    def test_xor_checksum_matches_bytewise_xor(self):
+        for length in range(0, 80):
+            data = os.urandom(length)
+            expected = 0
+            for byte in data:
+                expected ^= byte
+            self.assertEqual(xor_checksum(data), expected, f"length={length}")
+
+    def test_motion_encoder_matches_generic_frame_builder(self):
+        controller = {"x": 1200.5, "y": -3000.0, "z": 80.0, "yaw": -45.0, "servo0": 0.85, "rx": 1.5}
+        frame = MotionFrameEncoder().encode_controller(controller)
+        payload = struct.pack('<7f', -3000.0, 1200.5, 80.0, 1.5, 0.0, 45.0, 0.85)
+        self.assertEqual(len(frame), 34)
+        self.assertEqual(bytes(frame), HardwareController._build_frame(CMD_MOTION_CTRL, payload))
+
+
+class TestSensorReceive(unittest.TestCase):
+    def setUp(self):
+        self.hw = HardwareController(("127.0.0.1", 9), {})
+        self.hw.setup_socket(0)
+        self.address = ("127.0.0.1", self.hw.client_socket.getsockname()[1])
+        self.sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def tearDown(self):
+        self.sender.close()
+        self.hw.client_socket.close()
+
+    def send(self, data):
+        self.sender.sendto(data, self.address)
+
+    def test_split_concatenated_frames(self):
+        data = b"\x00\x01" + depth_temp_frame(1.0, 20.0) + thrust_ack_frame(3) + depth_temp_frame(2.0, 21.0)
+        frames, malformed = HardwareController._split_frames(data)
+        self.assertEqual([command for command, _ in frames], [CMD_DEPTH_TEMP, CMD_THRUST_ACK, CMD_DEPTH_TEMP])
+        self.assertEqual(malformed, 0)
+
+    def test_split_resyncs_after_corrupt_frame(self):
+        corrupt = bytearray(depth_temp_frame(1.0, 20.0))
+        corrupt[5] ^= 0xFF  # 破坏数据，XOR 校验失败
+        frames, malformed = HardwareController._split_frames(bytes(corrupt) + depth_temp_frame(2.0, 21.0))
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(malformed, 1)
+        self.assertAlmostEqual(struct.unpack('<2f', frames[0][1])[0], 2.0)
+
+    def test_split_memoryview_without_copying_payloads(self):
+        corrupt = bytearray(depth_temp_frame(1.0, 20.0))
+        corrupt[5] ^= 0xFF
+        buffer = bytearray(b"\x00" + bytes(corrupt) + depth_temp_frame(2.0, 21.0) + thrust_ack_frame(3))
+        frames, malformed = HardwareController._split_frames(memoryview(buffer))
+        self.assertEqual([command for command, _ in frames], [CMD_DEPTH_TEMP, CMD_THRUST_ACK])
+        self.assertEqual(malformed, 1)
+        payload = frames[0][1]
+        self.assertIsInstance(payload, memoryview)  # 接收缓冲区的视图
+        self.assertAlmostEqual(struct.unpack('<2f', payload)[0], 2.0)
+
+    def test_receive_drains_backlog_and_keeps_newest(self):
+        for i in range(5):
+            self.send(depth_temp_frame(float(i), 20.0 + i))
+        self.send(depth_temp_frame(10.0, 30.0) + thrust_ack_frame(2))
+        time.sleep(0.05)
+
+        data = self.hw.receive_sensor_data()
+        self.assertAlmostEqual(data["depth"], 10.0)
+        self.assertAlmostEqual(data["temperature"], 30.0)
+        self.assertEqual(self.hw.sensor_frames_received, 6)
+        self.assertEqual(self.hw.sensor_frames_dropped, 5)
+        self.assertTrue(self.hw.motor_init_status["m2"])
+        # 积压已全部读空
+        self.assertIsNone(self.hw.receive_sensor_data())
+
+
+if __name__ == "__main__":
+    unittest.main()
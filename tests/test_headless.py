@@ -0,0 +1,59 @@
+import os
+import unittest
+
+# Ensure pygame uses a dummy video driver to avoid opening a real window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+from main import parse_args  # noqa: E402
+from modules.config_manager import ConfigManager  # noqa: E402
+from modules.ui_controller import HeadlessUIController  # noqa: E402
+
+
+class TestHeadlessUIController(unittest.TestCase):
+    def setUp(self):
+        cm = ConfigManager()
+        self.ui = HeadlessUIController(cm.get_interface_settings(), cm)
+
+    def tearDown(self):
+        self.ui.cleanup()
+
+    def test_records_calls_without_rendering(self):
+        self.assertEqual(os.environ["SDL_VIDEODRIVER"], "dummy")
+        self.ui.screen.fill((0, 0, 0))
+        frame = np.full((48, 64, 3), 200, dtype=np.uint8)
+        self.ui.display_frame(frame, frame_seq=7)
+        self.ui.display_controller_data({"x": 1.0}, 1.5, 20.0, {}, video_age=0.05)
+        self.ui.draw_text("系统初始化中...", 10, 10)
+        self.ui.update_display()
+
+        self.assertEqual((self.ui.frames_presented, self.ui.last_frame_seq), (1, 7))
+        self.assertEqual(self.ui.last_telemetry["depth"], 1.5)
+        self.assertEqual(self.ui.last_telemetry["video_age"], 0.05)
+        self.assertEqual(self.ui.last_status, "系统初始化中...")
+        self.assertEqual(self.ui.frames_uploaded, 0)
+        self.assertEqual(pygame.transform.average_color(self.ui.screen)[:3], (0, 0, 0))
+
+    def test_handle_events_still_processes_input(self):
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+        self.assertFalse(self.ui.handle_events(None, None))
+
+
+class TestCommandLine(unittest.TestCase):
+    def test_defaults_keep_window_mode(self):
+        args = parse_args([])
+        self.assertFalse(args.headless)
+        self.assertIsNone(args.duration)
+        self.assertIsNone(args.init_timeout)
+        self.assertIsNone(args.config)
+
+    def test_headless_options(self):
+        args = parse_args(["--headless", "--duration", "600", "--init-timeout", "5", "--report", "loop.json"])
+        self.assertTrue(args.headless)
+        self.assertEqual((args.duration, args.init_timeout, args.report), (600.0, 5.0, "loop.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import unittest
+
+# Ensure pygame uses a dummy video driver to avoid opening a real window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame  # noqa: E402
+
+from modules.config_manager import ConfigManager  # noqa: E402
+from modules.hud_layout import HudLayout  # noqa: E402
+from modules.ui_controller import UIController  # noqa: E402
+
+MODES = {
+    "speed_mode": {"name": "fast", "color": "green"},
+    "lock_mode": {"name": "free", "color": "white"},
+    "catch_mode": {"name": "grab", "color": "yellow"},
+}
+SETTINGS = {"padding": 30, "y_h": 50, "y_offset": 32}
+
+
+class FontSpy:
+    """转发到真实字体并统计 size() 调用次数"""
+
+    def __init__(self, font):
+        self.font = font
+        self.size_calls = 0
+
+    def size(self, text):
+        self.size_calls += 1
+        return self.font.size(text)
+
+    def __getattr__(self, name):
+        return getattr(self.font, name)
+
+
+class TestHudLayout(unittest.TestCase):
+    def test_anchors_match_previous_geometry(self):
+        layout = HudLayout(SETTINGS).update((1280, 720), False, None)
+        self.assertEqual(layout.anchor("left", 0), (30, 80, "left"))
+        self.assertEqual(layout.anchor("left", 7), (30, 80 + 7 * 32, "left"))
+        self.assertEqual(layout.anchor("right", 2), (1250, 80 + 2 * 32, "right"))
+
+        layout.update((1280, 720), True, None)
+        self.assertEqual(layout.anchor("left", 5), (80 + 5 * 32, 690, "left"))
+        self.assertEqual(layout.anchor("right", 1), (30 + 32, 250, "left"))
+        self.assertEqual(layout.anchor("catch"), (50 + 1280 - 100, 690, "left"))
+
+    def test_rebuilds_only_when_key_changes(self):
+        layout = HudLayout(SETTINGS)
+        for _ in range(3):
+            layout.update((1280, 720), False, None)
+        self.assertEqual(layout.rebuilds, 1)
+        layout.update((1920, 1080), False, None)
+        layout.update((1920, 1080), True, None)
+        layout.invalidate()
+        layout.update((1920, 1080), True, None)
+        self.assertEqual(layout.rebuilds, 4)
+
+
+class TestControllerDataLayout(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def setUp(self):
+        cm = ConfigManager()
+        self.ui = UIController(cm.get_interface_settings(), cm)
+        self.ui.temp_fooling_mode = 'real'
+        self.ui.font = FontSpy(self.ui.font)
+
+    def tearDown(self):
+        self.ui.cleanup()
+
+    def draw(self, depth):
+        controller = {"x": depth, "y": 2.0, "z": 3.0, "yaw": 0.0, "servo0": 0.5}
+        self.ui.display_frame(None)
+        self.ui.display_controller_data(controller, depth, 20.0, MODES, True, video_age=0.05)
+        self.ui.update_display()
+
+    def test_no_font_metrics_per_frame(self):
+        for depth in (1.0, 12.5, -3.25, 100.0):
+            self.draw(depth)
+        self.assertEqual(self.ui.font.size_calls, 0)
+        self.assertEqual(self.ui.hud_layout.rebuilds, 1)
+
+        self.ui.rotate_mode = True
+        self.draw(1.0)
+        self.ui.screen = pygame.display.set_mode((640, 480))
+        self.draw(1.0)
+        self.assertEqual(self.ui.hud_layout.rebuilds, 3)
+
+    def test_right_column_is_right_aligned(self):
+        self.draw(1.0)
+        right_edge = self.ui.screen.get_width() - self.ui.settings['padding']
+        rects = [rect for (layer, _), (key, rect) in self.ui._hud_drawn.items() if key[3] == "right"]
+        self.assertEqual(len(rects), 4)  # 深度、温度、辅助修正、视频
+        for rect in rects:
+            self.assertEqual(rect.right, right_edge)
+
+
+if __name__ == "__main__":
+    unittest.main()
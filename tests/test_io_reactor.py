@@ -0,0 +1,115 @@
+import socket
+import struct
+import threading
+import time
+import unittest
+
+from modules.hardware_controller import (
+    CMD_DEPTH_TEMP,
+    ControllerMonitor,
+    HardwareController,
+    NetworkWorker,
+)
+from modules.io_reactor import IOReactor
+
+
+class TestIOReactor(unittest.TestCase):
+    def setUp(self):
+        self.reactor = IOReactor()
+        self.reactor.start()
+
+    def tearDown(self):
+        self.reactor.stop()
+        self.reactor.join(timeout=1)
+        self.assertFalse(self.reactor.is_alive())
+
+    def test_reader_callback_runs_on_reactor_thread(self):
+        left, right = socket.socketpair()
+        left.setblocking(False)
+        received = []
+        done = threading.Event()
+
+        def on_readable(sock):
+            received.append((sock.recv(64), threading.current_thread() is self.reactor))
+            done.set()
+
+        self.reactor.add_reader(left, on_readable)
+        right.send(b"ping")
+        self.assertTrue(done.wait(1))
+        self.assertEqual(received, [(b"ping", True)])
+        self.assertTrue(self.reactor.remove_reader(left))
+        self.assertFalse(self.reactor.remove_reader(left))
+        left.close()
+        right.close()
+
+    def test_call_later_order_and_cancel(self):
+        fired = []
+        done = threading.Event()
+        self.reactor.call_later(0.06, lambda: (fired.append("late"), done.set()))
+        self.reactor.call_later(0.02, fired.append, "early")
+        self.reactor.call_later(0.04, fired.append, "cancelled").cancel()
+        self.assertTrue(done.wait(1))
+        self.assertEqual(fired, ["early", "late"])
+
+    def test_call_every_keeps_rate(self):
+        ticks = []
+        handle = self.reactor.call_every(0.01, lambda: ticks.append(time.perf_counter()))
+        time.sleep(0.3)
+        handle.cancel()
+        # 100 Hz 运行 0.3 s 约 30 次，宽松的上下限避免调度抖动导致误报
+        self.assertGreater(len(ticks), 20)
+        self.assertLess(len(ticks), 40)
+
+    def test_callback_error_does_not_stop_reactor(self):
+        done = threading.Event()
+        self.reactor.call_soon_threadsafe(lambda: 1 / 0)
+        self.reactor.call_soon_threadsafe(done.set)
+        self.assertTrue(done.wait(1))
+        self.assertEqual(self.reactor.callback_errors, 1)
+
+
+class TestNetworkWorkerOnReactor(unittest.TestCase):
+    def setUp(self):
+        self.reactor = IOReactor()
+        self.reactor.start()
+        # 用本地 UDP 套接字充当下位机
+        self.rov = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.rov.bind(("127.0.0.1", 0))
+        self.rov.settimeout(0.2)
+        self.hw = HardwareController(self.rov.getsockname(), {})
+        self.hw.setup_socket(0)
+        self.monitor = ControllerMonitor({"x": 0.0, "y": 0.0, "z": 0.0, "yaw": 0.0, "servo0": 0.85})
+
+    def tearDown(self):
+        self.reactor.stop()
+        self.reactor.join(timeout=1)
+        self.rov.close()
+        self.hw.client_socket.close()
+
+    def test_fixed_rate_send_and_readiness_receive(self):
+        worker = NetworkWorker(self.hw, self.monitor, send_mode="fixed_rate", send_rate_hz=100, reactor=self.reactor)
+        worker.start()
+        self.assertFalse(worker.is_alive())  # 不创建独立线程
+
+        frames = 0
+        deadline = time.perf_counter() + 0.3
+        while time.perf_counter() < deadline:
+            data, _ = self.rov.recvfrom(64)
+            frames += 1
+        self.assertGreater(frames, 15)
+
+        payload = struct.pack('<2f', 3.0, 18.5)
+        self.rov.sendto(HardwareController._build_frame(CMD_DEPTH_TEMP, payload),
+                        ("127.0.0.1", self.hw.client_socket.getsockname()[1]))
+        deadline = time.perf_counter() + 1
+        while self.monitor.temperature != 18.5 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        self.assertAlmostEqual(self.monitor.temperature, 18.5)
+
+        worker.stop()
+        time.sleep(0.05)
+        self.assertFalse(self.reactor.remove_reader(self.hw.client_socket))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import contextlib
+import io
+import time
+import unittest
+
+from modules.hardware_controller import ControllerMonitor, HardwareController, NetworkWorker
+from modules.link_stats import LinkStatistics, format_link_summary
+
+
+class TestLinkStatistics(unittest.TestCase):
+    def test_no_data(self):
+        snapshot = LinkStatistics().snapshot(now=1.0)
+        self.assertEqual(snapshot["status"], "no_data")
+        self.assertIsNone(snapshot["loss_ratio"])
+        self.assertEqual(format_link_summary(snapshot), "链路: 无数据")
+
+    def test_steady_stream_is_ok(self):
+        stats = LinkStatistics(expected_sensor_hz=50)
+        for i in range(100):
+            stats.record_received(i * 0.02)
+        snapshot = stats.snapshot(now=99 * 0.02 + 0.005)
+        self.assertEqual(snapshot["status"], "ok")
+        self.assertEqual(snapshot["lost_frames"], 0)
+        self.assertAlmostEqual(snapshot["interval_p50_ms"], 20.0, places=3)
+        self.assertAlmostEqual(snapshot["rx_rate_hz"], 50.0, places=3)
+        self.assertLess(snapshot["interval_deviation_ms"], 0.01)
+
+    def test_gaps_counted_as_loss_with_auto_period(self):
+        stats = LinkStatistics()
+        t = 0.0
+        for i in range(100):
+            # 每 10 帧丢 1 帧：间隔变成两个周期
+            t += 0.04 if i % 10 == 9 else 0.02
+            stats.record_received(t)
+        snapshot = stats.snapshot(now=t)
+        self.assertGreaterEqual(snapshot["lost_frames"], 9)
+        self.assertAlmostEqual(snapshot["loss_ratio"], 0.1, delta=0.02)
+        self.assertEqual(snapshot["status"], "degraded")
+        self.assertGreater(snapshot["interval_p99_ms"], snapshot["interval_p50_ms"])
+
+    def test_staleness_marks_link_lost(self):
+        stats = LinkStatistics(expected_sensor_hz=50)
+        stats.record_received(0.0)
+        stats.record_received(0.02)
+        self.assertEqual(stats.snapshot(now=0.2)["status"], "degraded")
+        self.assertEqual(stats.snapshot(now=2.0)["status"], "lost")
+
+    def test_rtt_and_tx(self):
+        stats = LinkStatistics()
+        for i in range(10):
+            stats.record_sent(i * 0.01)
+        stats.record_send_failure()
+        stats.record_rtt(0.012)
+        stats.record_rtt(None)
+        snapshot = stats.snapshot(now=0.1)
+        self.assertEqual(snapshot["tx_frames"], 10)
+        self.assertEqual(snapshot["tx_failures"], 1)
+        self.assertAlmostEqual(snapshot["tx_rate_hz"], 100.0, places=3)
+        self.assertAlmostEqual(snapshot["rtt_ms"], 12.0)
+
+    def test_sorted_windows_cached_until_next_record(self):
+        stats = LinkStatistics(expected_sensor_hz=50)
+        for i in range(10):
+            stats.record_received(i * 0.02)
+        stats.snapshot(now=0.2)
+        cached = stats._sorted_windows
+        stats.snapshot(now=0.21)
+        self.assertIs(stats._sorted_windows, cached)
+
+        stats.record_rtt(0.01)
+        self.assertEqual(stats.snapshot(now=0.22)["rtt_p95_ms"], 10.0)
+        self.assertIsNot(stats._sorted_windows, cached)
+
+
+class TestLinkQualityLog(unittest.TestCase):
+    def test_logs_only_on_status_change(self):
+        stats = LinkStatistics(expected_sensor_hz=50)
+        hw = HardwareController(("127.0.0.1", 9), {}, stats)
+        worker = NetworkWorker(hw, ControllerMonitor({"x": 0.0}))
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            worker.check_link_quality()  # no_data
+            stats.record_received(time.perf_counter())
+            stats.record_received(time.perf_counter())
+            for _ in range(3):
+                worker.check_link_quality()  # ok，只输出一次
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("无数据", lines[0])
+        self.assertIn("正常", lines[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
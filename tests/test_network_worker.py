@@ -0,0 +1,120 @@
+import time
+import unittest
+
+from modules.hardware_controller import ControllerMonitor, NetworkWorker
+
+
+class FakeHardwareController:
+    def __init__(self):
+        self.sent = []
+
+    def send_controller_data(self, controller_data):
+        self.sent.append((time.perf_counter(), dict(controller_data)))
+        return True
+
+    def receive_sensor_data(self):
+        return None
+
+
+class TestNetworkWorkerFixedRate(unittest.TestCase):
+    def setUp(self):
+        self.hw = FakeHardwareController()
+        self.monitor = ControllerMonitor({"x": 0.0, "y": 0.0, "z": 0.0, "yaw": 0.0, "servo0": 0.85})
+
+    def test_fixed_rate_sends_without_trigger(self):
+        worker = NetworkWorker(self.hw, self.monitor, send_mode="fixed_rate", send_rate_hz=100)
+        worker.start()
+        time.sleep(0.5)
+        worker.stop()
+        worker.join(timeout=1)
+        self.assertFalse(worker.is_alive())
+        # 100 Hz 运行 0.5 s 约 50 帧，宽松的上下限避免 CI 调度抖动导致误报
+        self.assertGreater(len(self.hw.sent), 30)
+        self.assertLess(len(self.hw.sent), 70)
+
+    def test_fixed_rate_ignores_trigger(self):
+        worker = NetworkWorker(self.hw, self.monitor, send_mode="fixed_rate", send_rate_hz=10)
+        worker.trigger_communication()
+        self.assertFalse(worker.task_event.is_set())
+
+    def test_deadline_skips_backlog_instead_of_bursting(self):
+        worker = NetworkWorker(self.hw, self.monitor, send_mode="fixed_rate", send_rate_hz=100)
+        worker._next_deadline = time.perf_counter() - 1.0  # 模拟线程被挂起 1 秒
+        worker._wait_for_next_deadline()
+        self.assertGreaterEqual(worker.missed_deadlines, 90)
+        self.assertGreater(worker._next_deadline, time.perf_counter() - 2 * worker.send_period)
+
+
+class TestNetworkWorkerDeltaPolicy(unittest.TestCase):
+    def setUp(self):
+        self.hw = FakeHardwareController()
+        self.monitor = ControllerMonitor({"x": 0.0, "y": 0.0, "z": 0.0, "yaw": 0.0, "servo0": 0.85})
+        self.worker = NetworkWorker(self.hw, self.monitor, transmit_policy="delta",
+                                    delta_epsilon=0.5, keepalive_interval=0.1)
+
+    def test_unchanged_frames_suppressed_until_keepalive(self):
+        for _ in range(5):
+            self.worker._send_controller_frame(0)
+        self.assertEqual(len(self.hw.sent), 1)
+        self.assertEqual(self.worker.frames_suppressed, 4)
+
+        time.sleep(0.12)
+        self.worker._send_controller_frame(0)
+        self.assertEqual(len(self.hw.sent), 2)
+
+    def test_change_beyond_epsilon_sent_immediately(self):
+        self.worker._send_controller_frame(0)
+        self.monitor.controller["x"] = 0.3  # 小于阈值
+        self.monitor.publish()
+        self.worker._send_controller_frame(0)
+        self.monitor.controller["x"] = 1.0
+        self.monitor.publish()
+        self.worker._send_controller_frame(0)
+        self.assertEqual([frame["x"] for _, frame in self.hw.sent], [0.0, 1.0])
+        stats = self.worker.get_transmit_stats()
+        self.assertEqual((stats["frames_sent"], stats["frames_suppressed"]), (2, 1))
+        self.assertAlmostEqual(stats["saved_ratio"], 1 / 3)
+
+    def test_unpublished_changes_not_sent(self):
+        self.worker._send_controller_frame(0)
+        self.monitor.controller["x"] = 5.0  # 主线程本周期尚未写完，不应被网络线程读到
+        time.sleep(0.12)
+        self.worker._send_controller_frame(0)
+        self.assertEqual([frame["x"] for _, frame in self.hw.sent], [0.0, 0.0])
+
+    def test_always_policy_sends_every_frame(self):
+        worker = NetworkWorker(self.hw, self.monitor)
+        for _ in range(3):
+            worker._send_controller_frame(0)
+        self.assertEqual(len(self.hw.sent), 3)
+        self.assertEqual(worker.frames_suppressed, 0)
+
+
+class TestControlSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.monitor = ControllerMonitor({"x": 0.0, "y": 0.0, "z": 0.0, "yaw": 0.0, "servo0": 0.85})
+
+    def test_publish_swaps_reference_and_bumps_generation(self):
+        before = self.monitor.snapshot
+        self.monitor.controller.update(x=1.0, yaw=-2.0)
+        after = self.monitor.publish()
+        self.assertIsNot(before, after)
+        self.assertEqual(after.generation, before.generation + 1)
+        self.assertEqual((before["x"], before["yaw"]), (0.0, 0.0))  # 旧快照不受影响
+        self.assertEqual((after["x"], after["yaw"]), (1.0, -2.0))
+        self.assertEqual(dict(after)["servo0"], 0.85)
+
+    def test_unchanged_publish_keeps_generation(self):
+        first = self.monitor.publish()
+        self.assertIs(self.monitor.publish(), first)
+        self.assertEqual(self.monitor.generation, 0)
+
+    def test_snapshot_is_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.monitor.snapshot.x = 1.0
+        with self.assertRaises(KeyError):
+            self.monitor.snapshot["depth"]
+
+
+if __name__ == "__main__":
+    unittest.main()
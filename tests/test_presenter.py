@@ -0,0 +1,102 @@
+import os
+import time
+import unittest
+
+# Ensure pygame uses a dummy video driver to avoid opening a real window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+from modules.config_manager import ConfigManager  # noqa: E402
+from modules.hardware_controller import ControlSnapshot  # noqa: E402
+from modules.presenter import LoopTimer, Presenter, format_loop_summary  # noqa: E402
+from modules.ui_controller import UIController  # noqa: E402
+
+MODES = {
+    "speed_mode": {"name": "fast", "color": "green"},
+    "lock_mode": {"name": "free", "color": "white"},
+    "catch_mode": {"name": "grab", "color": "yellow"},
+}
+
+
+class TestLoopTimer(unittest.TestCase):
+    def test_overruns_and_percentiles(self):
+        timer = LoopTimer(period=0.01)
+        self.assertIsNone(timer.snapshot()["work_p50_ms"])
+        for i, work in enumerate((0.002, 0.004, 0.03)):
+            start = i * 0.01
+            timer.record(start, start + work)
+
+        snapshot = timer.snapshot()
+        self.assertEqual(snapshot["iterations"], 3)
+        self.assertEqual(snapshot["overruns"], 1)
+        self.assertAlmostEqual(snapshot["work_p50_ms"], 4.0)
+        self.assertAlmostEqual(snapshot["work_max_ms"], 30.0)
+        self.assertAlmostEqual(snapshot["rate_hz"], 100.0)
+        self.assertIn("超时 1 次", format_loop_summary("渲染线程", snapshot))
+
+
+class TestPresenter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def setUp(self):
+        cm = ConfigManager()
+        self.ui = UIController(cm.get_interface_settings(), cm)
+        self.frame = np.full((48, 64, 3), 90, dtype=np.uint8)
+        self.frame_delay = 0.0
+
+    def tearDown(self):
+        self.ui.cleanup()
+
+    def frame_source(self):
+        time.sleep(self.frame_delay)
+        return self.frame, 1
+
+    def wait_for(self, condition, timeout=2.0):
+        deadline = time.perf_counter() + timeout
+        while not condition() and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_renders_published_telemetry_in_background(self):
+        presenter = Presenter(self.ui, self.frame_source, fps=100)
+        self.addCleanup(presenter.stop)
+        presenter.start()
+        self.assertTrue(self.wait_for(lambda: self.ui.frames_uploaded == 1))
+        self.assertEqual(self.ui._hud_drawn, {})  # 尚未发布遥测时只显示画面
+
+        presenter.publish({"controller_data": ControlSnapshot(1, 0.0, x=1.0), "depth": 1.5, "temperature": 20.0,
+                           "modes": MODES})
+        self.assertTrue(self.wait_for(lambda: len(self.ui._hud_drawn) > 0))
+        presenter.stop()
+        self.assertFalse(presenter.is_alive())
+
+        width, height = self.ui.screen.get_size()
+        self.assertEqual(tuple(self.ui.screen.get_at((width // 2, height // 2)))[:3], (90, 90, 90))
+        self.assertGreater(presenter.timing.iterations, 1)
+        self.assertEqual(self.ui.frames_uploaded, 1)  # 序号未变，之后都复用已缩放的画面
+
+    def test_slow_render_counts_stalls_without_blocking_publisher(self):
+        self.frame_delay = 0.03
+        presenter = Presenter(self.ui, self.frame_source, fps=100)
+        self.addCleanup(presenter.stop)
+        presenter.start()
+        self.assertTrue(self.wait_for(lambda: presenter.timing.iterations >= 3))
+
+        started = time.perf_counter()
+        presenter.publish({"controller_data": ControlSnapshot(1, 0.0), "depth": 0.0, "temperature": 0.0,
+                           "modes": MODES})
+        self.assertLess(time.perf_counter() - started, 0.01)
+        presenter.stop()
+        self.assertGreaterEqual(presenter.timing.snapshot()["overruns"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
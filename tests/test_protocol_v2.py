@@ -0,0 +1,106 @@
+import time
+import unittest
+
+from modules.hardware_controller import (
+    CMD_MOTION_CTRL,
+    CMD_MOTION_CTRL_V2,
+    HardwareController,
+)
+from modules.protocol_codec import MotionFrameEncoderV2
+from modules.protocol_loopback import LoopbackLowerController
+
+CONTROLLER = {"x": 100.0, "y": -200.0, "z": 50.0, "yaw": 10.0, "servo0": 0.85}
+
+
+def wait_until(predicate, timeout=1.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+class TestMotionProtocolV2(unittest.TestCase):
+    def start_rov(self, protocol_version):
+        rov = LoopbackLowerController(protocol_version)
+        rov.start()
+        self.addCleanup(rov.stop)
+        hw = HardwareController(rov.address, {})
+        hw.setup_socket(0)
+        self.addCleanup(hw.client_socket.close)
+        return rov, hw
+
+    def test_negotiates_v2_and_sends_sequenced_frames(self):
+        rov, hw = self.start_rov(2)
+        self.assertEqual(hw.negotiate_protocol(timeout=0.2), 2)
+        self.assertIsNotNone(hw.link_stats.snapshot()["rtt_ms"])
+
+        for _ in range(3):
+            hw.send_controller_data(CONTROLLER)
+        self.assertTrue(wait_until(lambda: len(rov.motion_frames) == 3))
+        self.assertEqual([f[0] for f in rov.motion_frames], [CMD_MOTION_CTRL_V2] * 3)
+        self.assertEqual([f[1] for f in rov.motion_frames], [0, 1, 2])
+        # 与 v1 相同的坐标映射：x/y 互换，yaw 取反
+        self.assertEqual(rov.motion_frames[0][3][:3], (-200.0, 100.0, 50.0))
+        self.assertAlmostEqual(rov.motion_frames[0][3][5], -10.0)
+
+    def test_falls_back_to_legacy_frame(self):
+        rov, hw = self.start_rov(1)
+        self.assertEqual(hw.negotiate_protocol(timeout=0.05, attempts=2), 1)
+        hw.send_controller_data(CONTROLLER)
+        self.assertTrue(wait_until(lambda: len(rov.motion_frames) == 1))
+        self.assertEqual(rov.motion_frames[0][0], CMD_MOTION_CTRL)
+
+    def test_lower_controller_drops_reordered_and_duplicate_frames(self):
+        rov, hw = self.start_rov(2)
+        hw.negotiate_protocol(timeout=0.2)
+        encoder = MotionFrameEncoderV2()
+        frames = []
+        for seq in (5, 3, 5, 6):
+            encoder.sequence = seq
+            frames.append(bytes(encoder.encode(0, 0, 0, 0, 0, 0, 0)))
+        for frame in frames:
+            hw.client_socket.sendto(frame, rov.address)
+        self.assertTrue(wait_until(lambda: rov.dropped == 2))
+        self.assertEqual([f[1] for f in rov.motion_frames], [5, 6])
+
+    def test_heartbeat_hello_reports_remote_status(self):
+        rov, hw = self.start_rov(2)
+        hw.negotiate_protocol(timeout=0.2)
+        hw.send_controller_data(CONTROLLER)
+        self.assertTrue(wait_until(lambda: len(rov.motion_frames) == 1))
+
+        hw.remote_status = None
+        self.assertTrue(hw.send_hello())
+        self.assertTrue(wait_until(lambda: hw.receive_sensor_data() is None and hw.remote_status is not None))
+        self.assertEqual(hw.remote_status["version"], 2)
+        self.assertEqual(hw.remote_status["last_seq"], 0)
+        self.assertGreaterEqual(hw.remote_status["rtt_ms"], 0)
+
+    def test_heartbeat_keeps_sequence_tracking_until_session_changes(self):
+        rov, hw = self.start_rov(2)
+        hw.negotiate_protocol(timeout=0.2)
+        for _ in range(3):
+            hw.send_controller_data(CONTROLLER)
+        self.assertTrue(wait_until(lambda: len(rov.motion_frames) == 3))
+
+        # 心跳 HELLO（同一会话）之后，重放的旧序号仍被丢弃
+        hw.send_hello()
+        self.assertTrue(wait_until(lambda: rov.hellos == 2))
+        hw._motion_encoder.sequence = 1
+        hw.send_controller_data(CONTROLLER)
+        self.assertTrue(wait_until(lambda: rov.dropped == 1))
+
+        # 上位机重启：新会话号，序号从 0 重新开始也被接受
+        restarted = HardwareController(rov.address, {})
+        restarted.setup_socket(0)
+        self.addCleanup(restarted.client_socket.close)
+        restarted.session_id = hw.session_id ^ 0xFFFF
+        restarted.negotiate_protocol(timeout=0.2)
+        restarted.send_controller_data(CONTROLLER)
+        self.assertTrue(wait_until(lambda: len(rov.motion_frames) == 4))
+        self.assertEqual(rov.motion_frames[-1][1], 0)
+        self.assertEqual(rov.dropped, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import unittest
+
+# Ensure pygame uses a dummy video driver to avoid opening a real window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame  # noqa: E402
+
+from modules.config_manager import ConfigManager  # noqa: E402
+from modules.text_cache import TextSurfaceCache  # noqa: E402
+from modules.ui_controller import UIController  # noqa: E402
+
+
+class TestTextSurfaceCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+        cls.font = pygame.font.Font(None, 24)
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def test_segments_split_numbers(self):
+        self.assertEqual(TextSurfaceCache.segments("深度: -1.25 m"),
+                         [(False, "深度: "), (True, "-1.25"), (False, " m")])
+        self.assertEqual(TextSurfaceCache.segments("X: 3"), [(False, "X: "), (True, "3")])
+        self.assertEqual(TextSurfaceCache.segments("已连接"), [(False, "已连接")])
+
+    def test_label_hits_after_first_render(self):
+        cache = TextSurfaceCache(self.font)
+        first = cache.label("Yaw: ", (255, 255, 255))
+        self.assertIs(cache.label("Yaw: ", pygame.Color(255, 255, 255)), first)
+        self.assertIsNot(cache.label("Yaw: ", (255, 0, 0)), first)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+        # 竖屏：旋转后沿 y 方向排列，步进为原文本宽度
+        surface, offset, advance = cache.label("Yaw: ", (255, 255, 255), outline=False, rotate=True)
+        self.assertEqual(offset, 0)
+        self.assertEqual(surface.get_size(), first[0].get_size()[::-1])
+        self.assertEqual(advance, first[2])
+
+    def test_bold_does_not_leak_into_shared_font(self):
+        cache = TextSurfaceCache(self.font)
+        cache.label("bold", (255, 255, 255), bold=True)
+        self.assertFalse(self.font.get_bold())
+
+    def test_lru_bounded_by_entries_and_bytes(self):
+        cache = TextSurfaceCache(self.font, max_entries=2)
+        for text in ("a", "b", "c"):
+            cache.label(text, (255, 255, 255))
+        cache.label("a", (255, 255, 255))
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(cache.evictions, 2)  # a 被淘汰后重新渲染，又淘汰了 b
+        self.assertEqual(cache.misses, 4)
+
+        small = TextSurfaceCache(self.font, max_bytes=1)
+        small.label("a", (255, 255, 255))
+        small.label("b", (255, 255, 255))
+        self.assertEqual(small.stats()["entries"], 1)  # 单个条目超限时仍保留最新条目
+        self.assertEqual(small.bytes, small._surface_bytes(small.label("b", (255, 255, 255))))
+
+
+class TestDrawTextCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def setUp(self):
+        cm = ConfigManager()
+        self.ui = UIController(cm.get_interface_settings(), cm)
+
+    def tearDown(self):
+        self.ui.cleanup()
+
+    def test_changing_values_reuse_cached_glyphs(self):
+        cache = self.ui.text_cache
+        self.ui.draw_text("X: 0.0", 10, 10)
+        misses = cache.misses
+        for value in (12.5, -3.7, 100.0, 99.9):
+            self.ui.draw_text(f"X: {value:.1f}", 10, 10)
+        self.assertEqual(cache.misses, misses)
+
+    def test_draws_same_pixels_as_whole_string_render(self):
+        self.ui.screen.fill((0, 0, 0))
+        self.ui.draw_text("AB", 5, 5, color=(255, 255, 255), outline=False)
+        rendered = self.ui.font.render("AB", True, (255, 255, 255))
+        expected = pygame.Surface(rendered.get_size())
+        expected.blit(rendered, (0, 0))
+        drawn = self.ui.screen.subsurface((5, 5) + rendered.get_size())
+        self.assertEqual(pygame.image.tobytes(drawn, "RGB"), pygame.image.tobytes(expected, "RGB"))
+
+    def test_rotated_text_is_bottom_aligned(self):
+        self.ui.rotate_mode = True
+        self.ui.screen.fill((0, 0, 0))
+        self.ui.draw_text("12", 50, 200, color=(255, 255, 255), outline=False)
+        width, height = self.ui.font.size("12")
+        # 竖屏文字占据 [50, 50 + 行高) × [200 - 文本宽度, 200)
+        drawn = self.ui.screen.subsurface((50, 200 - width, height, width))
+        self.assertGreater(pygame.transform.average_color(drawn)[0], 0)
+        below = self.ui.screen.subsurface((50, 200, height, 10))
+        self.assertEqual(pygame.transform.average_color(below)[:3], (0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
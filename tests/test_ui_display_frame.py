@@ -0,0 +1,134 @@
+import os
+import unittest
+
+# Ensure pygame uses a dummy video driver to avoid opening a real window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+from modules.config_manager import ConfigManager  # noqa: E402
+from modules.ui_controller import UIController  # noqa: E402
+
+
+class TestUIDisplayFrame(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def setUp(self):
+        cm = ConfigManager()
+        self.ui = UIController(cm.get_interface_settings(), cm)
+
+    def tearDown(self):
+        self.ui.cleanup()
+
+    def centre_pixel(self):
+        width, height = self.ui.screen.get_size()
+        return tuple(self.ui.screen.get_at((width // 2, height // 2)))[:3]
+
+    def test_rgb_frame_rendered_without_channel_swap(self):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame[..., 0] = 200  # R
+        frame[..., 2] = 10  # B
+        self.ui.display_frame(frame)
+        self.assertEqual(self.centre_pixel(), (200, 0, 10))
+
+    def test_non_contiguous_crop_rendered(self):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame[4:44, 4:60] = (30, 60, 90)
+        self.ui.display_frame(frame[4:44, 4:60])  # 与去畸变裁剪相同的非连续视图
+        self.assertEqual(self.centre_pixel(), (30, 60, 90))
+
+    def test_same_sequence_reuses_scaled_frame(self):
+        first = np.full((48, 64, 3), 50, dtype=np.uint8)
+        second = np.full((48, 64, 3), 150, dtype=np.uint8)
+        self.ui.display_frame(first, frame_seq=1)
+        self.ui.display_frame(second, frame_seq=1)  # 序号未变：沿用缓存的画面
+        self.assertEqual(self.centre_pixel(), (50, 50, 50))
+        self.ui.display_frame(second, frame_seq=2)
+        self.assertEqual(self.centre_pixel(), (150, 150, 150))
+        self.assertEqual((self.ui.frames_uploaded, self.ui.frames_reused), (2, 1))
+
+    def test_window_resize_or_undistort_toggle_invalidates_cache(self):
+        frame = np.full((48, 64, 3), 50, dtype=np.uint8)
+        self.ui.display_frame(frame, frame_seq=1)
+        self.ui.show_undistorted = True
+        self.ui.display_frame(frame, frame_seq=1)
+        self.ui.screen = pygame.display.set_mode((320, 240))
+        self.ui.display_frame(frame, frame_seq=1)
+        self.assertEqual((self.ui.frames_uploaded, self.ui.frames_reused), (3, 0))
+
+    def test_blit_listener_receives_video_frames_only(self):
+        blits = []
+        self.ui.frame_blit_listener = lambda frame, blitted_at: blits.append(frame)
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        self.ui.display_frame(frame)
+        self.ui.display_frame(None)  # 默认图像不回调
+        self.assertEqual(len(blits), 1)
+        self.assertIs(blits[0], frame)
+
+
+class TestHudCompositor(unittest.TestCase):
+    MODES = {
+        "speed_mode": {"name": "fast", "color": "green"},
+        "lock_mode": {"name": "free", "color": "white"},
+        "catch_mode": {"name": "grab", "color": "yellow"},
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def setUp(self):
+        cm = ConfigManager()
+        self.ui = UIController(cm.get_interface_settings(), cm)
+        self.ui.temp_fooling_mode = 'real'
+        self.frame = np.full((48, 64, 3), 40, dtype=np.uint8)
+        self.controller = {"x": 1.0, "y": 2.0, "z": 3.0, "yaw": 0.0, "servo0": 0.5}
+
+    def tearDown(self):
+        self.ui.cleanup()
+
+    def refresh(self, depth, frame_seq=1):
+        self.ui.display_frame(self.frame, frame_seq)
+        self.ui.display_controller_data(self.controller, depth, 20.0, self.MODES, True)
+        dirty = list(self.ui._dirty_rects)
+        self.ui.update_display()
+        return dirty
+
+    def test_unchanged_hud_skips_update(self):
+        self.refresh(1.0)
+        self.assertEqual(self.ui.full_updates, 1)
+        self.assertEqual(self.refresh(1.0), [])
+        self.assertEqual(self.ui.skipped_updates, 1)
+
+    def test_changed_value_redraws_only_its_line(self):
+        self.refresh(1.0)
+        expected = self.ui.screen.copy()
+        self.refresh(2.0)
+        dirty = self.refresh(1.0)  # 改回原值后画面应与首次完全一致
+
+        self.assertEqual(self.ui.partial_updates, 2)
+        width, height = self.ui.screen.get_size()
+        self.assertLess(sum(rect.width * rect.height for rect in dirty), width * height // 10)
+        self.assertEqual(pygame.image.tobytes(self.ui.screen, "RGB"), pygame.image.tobytes(expected, "RGB"))
+
+    def test_new_frame_or_direct_draw_forces_full_redraw(self):
+        self.refresh(1.0)
+        self.refresh(1.0, frame_seq=2)
+        self.ui.draw_text("status", 10, 10)
+        self.refresh(1.0, frame_seq=2)
+        self.assertEqual((self.ui.full_updates, self.ui.partial_updates), (3, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from modules.video_processor import UndistortionEngine, undistort_frame
+
+
+class TestUndistortionEngine(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+        self.engine = UndistortionEngine()
+
+    def test_matches_undistort_frame(self):
+        expected = undistort_frame(self.frame, 1280, 720)
+        np.testing.assert_array_equal(self.engine.undistort(self.frame), expected)
+
+    def test_scaled_frame_uses_scaled_intrinsics(self):
+        small = cv2.resize(self.frame, (640, 360))
+        expected = undistort_frame(small, 640, 360, (1280, 720))
+        np.testing.assert_array_equal(self.engine.undistort(small, (1280, 720)), expected)
+
+    def test_maps_and_output_buffer_reused(self):
+        first = self.engine.undistort(self.frame)
+        second = self.engine.undistort(self.frame)
+        self.assertEqual(self.engine.maps_built, 1)
+        self.assertTrue(np.shares_memory(first, second))
+
+        self.engine.undistort(cv2.resize(self.frame, (640, 360)))
+        self.assertEqual(self.engine.maps_built, 2)
+        self.engine.undistort(self.frame)
+        self.assertEqual(self.engine.maps_built, 2)  # 切回原尺寸命中缓存
+
+    def test_copy_leaves_shared_buffer_untouched(self):
+        shared = self.engine.undistort(self.frame)
+        expected = shared.copy()
+        copied = self.engine.undistort(np.zeros_like(self.frame), copy=True)
+        self.assertFalse(np.shares_memory(shared, copied))
+        np.testing.assert_array_equal(shared, expected)
+        self.assertEqual(self.engine.maps_built, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+视频显示基准
+
+模拟 UI 以 --ui-hz 刷新、视频以 --video-fps 出帧的主循环，对比：
+
+- 每次刷新都重新包装、缩放视频帧（不传帧序号，相当于旧版 display_frame）
+- 按帧序号复用已缩放画面（main.py 当前的调用方式）
+
+统计每次刷新 display_frame + flip 消耗的 CPU 时间。使用 SDL dummy 驱动，无需显示器。
+
+用法:
+    python tools/benchmarks/display_frame_benchmark.py [--ticks 600] [--width 1280 --height 720] [--window 1024x576]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from modules.config_manager import ConfigManager  # noqa: E402
+from modules.ui_controller import UIController  # noqa: E402
+
+
+def run(ui, frames, ticks, ticks_per_frame, use_seq):
+    """返回每次刷新的平均 CPU 时间（毫秒）"""
+    start = time.process_time()
+    for tick in range(ticks):
+        seq = tick // ticks_per_frame + 1
+        ui.display_frame(frames[seq % len(frames)], seq if use_seq else None)
+        pygame.display.flip()
+    return (time.process_time() - start) / ticks * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="视频显示基准")
+    parser.add_argument("--ticks", type=int, default=600, help="模拟的刷新次数")
+    parser.add_argument("--ui-hz", type=int, default=60, help="界面刷新率")
+    parser.add_argument("--video-fps", type=int, default=30, help="视频帧率")
+    parser.add_argument("--width", type=int, default=1280, help="视频宽度")
+    parser.add_argument("--height", type=int, default=720, help="视频高度")
+    parser.add_argument("--window", default="1024x576", help="窗口尺寸，如 1280x720")
+    args = parser.parse_args()
+
+    window_width, window_height = (int(v) for v in args.window.lower().split("x"))
+    pygame.init()
+    config_manager = ConfigManager()
+    settings = dict(config_manager.get_interface_settings(), width=window_width, height=window_height)
+    ui = UIController(settings, config_manager)
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(4)]
+    ticks_per_frame = max(1, round(args.ui_hz / args.video_fps))
+
+    try:
+        every_tick = run(ui, frames, args.ticks, ticks_per_frame, use_seq=False)
+        cached = run(ui, frames, args.ticks, ticks_per_frame, use_seq=True)
+    finally:
+        ui.cleanup()
+        pygame.quit()
+
+    print(f"视频 {args.width}x{args.height}@{args.video_fps}fps，窗口 {window_width}x{window_height}@{args.ui_hz}Hz")
+    print(f"每次刷新都转换: {every_tick:8.2f} ms/次")
+    print(f"按帧序号复用:   {cached:8.2f} ms/次")
+    print(f"CPU 时间减少:   {(1 - cached / every_tick) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
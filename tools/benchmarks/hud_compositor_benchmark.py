@@ -0,0 +1,108 @@
+"""
+HUD 分层合成基准
+
+模拟 UI 以 --ui-hz 刷新、视频以 --video-fps 出帧、遥测以 --telemetry-hz 变化的主循环，对比：
+
+- 整屏重画：每次刷新都重画视频层和全部 HUD 文字并 flip（合成之前的行为）
+- 分层合成：视频层没有新帧时只擦除并重画变化的文字，update_display 只提交脏矩形
+
+统计每次刷新 display_frame + display_controller_data + update_display 的 CPU 时间与提交的像素比例。
+--video-fps 0 模拟视频中断（只显示默认图像）的情况。使用 SDL dummy 驱动，无需显示器；
+dummy 驱动下提交屏幕几乎没有开销，真实显示器上整屏 flip 与部分 update 的差距会更大。
+
+用法:
+    python tools/benchmarks/hud_compositor_benchmark.py [--ticks 600] [--video-fps 30] [--telemetry-hz 10]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from modules.config_manager import ConfigManager  # noqa: E402
+from modules.ui_controller import UIController  # noqa: E402
+
+MODES = {
+    "speed_mode": {"name": "高速", "color": "green"},
+    "lock_mode": {"name": "未锁定", "color": "white"},
+    "catch_mode": {"name": "抓取", "color": "yellow"},
+}
+LINK_STATS = {"status": "ok", "loss_ratio": 0.01, "interval_deviation_ms": 1.2, "staleness_s": 0.02, "rtt_ms": 8.5}
+
+
+def run(ui, frames, args, full_redraw):
+    """返回 (每次刷新的平均 CPU 时间毫秒, 平均提交的像素占整屏比例)"""
+    ticks_per_frame = max(1, round(args.ui_hz / args.video_fps)) if args.video_fps > 0 else None
+    ticks_per_sample = max(1, round(args.ui_hz / args.telemetry_hz))
+    screen_area = ui.screen.get_width() * ui.screen.get_height()
+    submitted = 0
+    ui.full_updates = ui.partial_updates = ui.skipped_updates = 0
+
+    start = time.process_time()
+    for tick in range(args.ticks):
+        if full_redraw:
+            ui._layer_screen = None  # 每次刷新都当作窗口失效，等同整屏重画
+        if ticks_per_frame is None:
+            ui.display_frame(None)
+        else:
+            seq = tick // ticks_per_frame + 1
+            ui.display_frame(frames[seq % len(frames)], seq)
+
+        phase = (tick // ticks_per_sample) * 0.05
+        controller = {"x": 300 * math.sin(phase), "y": 250 * math.cos(phase), "z": -120,
+                      "yaw": round(90 * math.sin(phase * 0.3)), "servo0": 0.5}
+        ui.display_controller_data(controller, 1.2 + 0.01 * math.sin(phase), 21.5, MODES, True, LINK_STATS, 0.04)
+
+        if ui._full_redraw or ui._layer_screen is not ui.screen:
+            submitted += screen_area
+        else:
+            submitted += sum(rect.width * rect.height for rect in ui._dirty_rects)
+        ui.update_display()
+    elapsed = (time.process_time() - start) / args.ticks * 1000
+    return elapsed, submitted / (screen_area * args.ticks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HUD 分层合成基准")
+    parser.add_argument("--ticks", type=int, default=600, help="模拟的刷新次数")
+    parser.add_argument("--ui-hz", type=int, default=60, help="界面刷新率")
+    parser.add_argument("--video-fps", type=int, default=30, help="视频帧率，0 表示无视频")
+    parser.add_argument("--telemetry-hz", type=int, default=10, help="遥测数值变化频率")
+    parser.add_argument("--window", default="1024x576", help="窗口尺寸，如 1280x720")
+    args = parser.parse_args()
+
+    window_width, window_height = (int(v) for v in args.window.lower().split("x"))
+    pygame.init()
+    config_manager = ConfigManager()
+    settings = dict(config_manager.get_interface_settings(), width=window_width, height=window_height)
+    ui = UIController(settings, config_manager)
+    ui.temp_fooling_mode = 'real'
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (window_height, window_width, 3), dtype=np.uint8) for _ in range(4)]
+
+    try:
+        full, full_pixels = run(ui, frames, args, full_redraw=True)
+        composed, composed_pixels = run(ui, frames, args, full_redraw=False)
+        counters = (ui.full_updates, ui.partial_updates, ui.skipped_updates)
+    finally:
+        ui.cleanup()
+        pygame.quit()
+
+    video = f"{args.video_fps}fps" if args.video_fps > 0 else "无视频"
+    print(f"窗口 {window_width}x{window_height}@{args.ui_hz}Hz，视频 {video}，遥测 {args.telemetry_hz}Hz")
+    print(f"整屏重画: {full:8.3f} ms/次，提交 {full_pixels * 100:6.1f} % 像素")
+    print(f"分层合成: {composed:8.3f} ms/次，提交 {composed_pixels * 100:6.1f} % 像素")
+    print(f"CPU 时间减少: {(1 - composed / full) * 100:8.1f} %")
+    print(f"合成阶段提交: 整屏 {counters[0]} 次，部分 {counters[1]} 次，跳过 {counters[2]} 次")
+
+
+if __name__ == "__main__":
+    main()
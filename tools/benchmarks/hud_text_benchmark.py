@@ -0,0 +1,118 @@
+"""
+HUD 文本绘制基准
+
+用变化的遥测数值反复调用 UIController.display_controller_data，对比：
+
+- 旧版 draw_text：每行渲染两次（轮廓 + 正文），竖屏时再旋转两次，右对齐的行每次调用 font.size()
+- 当前排版：TextSurfaceCache 缓存静态文字，数值从数字图集拼接，右对齐宽度取缓存的步进之和
+
+两种方式每次刷新都重画全部文字（不经过分层合成的脏矩形判断），只比较文字渲染本身。
+统计每次刷新绘制 HUD 的 CPU 时间，并输出缓存命中率。使用 SDL dummy 驱动，无需显示器。
+
+用法:
+    python tools/benchmarks/hud_text_benchmark.py [--ticks 600] [--rotate] [--font C:/Windows/Fonts/simhei.ttf]
+
+渲染开销与字体关系很大：未安装中文字体时界面回退到 pygame 默认字体，结果会明显低估中文 HUD 的实际开销，
+建议用 --font 指定现场电脑实际使用的中文字体文件。
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+import types
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame  # noqa: E402
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from modules.config_manager import ConfigManager  # noqa: E402
+from modules.ui_controller import UIController  # noqa: E402
+
+MODES = {
+    "speed_mode": {"name": "高速", "color": "green"},
+    "lock_mode": {"name": "未锁定", "color": "white"},
+    "catch_mode": {"name": "抓取", "color": "yellow"},
+}
+LINK_STATS = {"status": "ok", "loss_ratio": 0.01, "interval_deviation_ms": 1.2, "staleness_s": 0.02, "rtt_ms": 8.5}
+
+
+def legacy_draw_text(self, text, x, y, color=(255, 255, 255), bold=False, outline=True, outline_thickness=1):
+    """缓存之前的 draw_text 实现"""
+    self.font.set_bold(bold)
+    if outline:
+        outline_surface = self.font.render(text, True, (0, 0, 0))
+        if self.rotate_mode:
+            outline_surface = pygame.transform.rotate(outline_surface, 90)
+        outline_width, outline_height = outline_surface.get_size()
+        if self.rotate_mode:
+            self.screen.blit(outline_surface, (x - outline_width + 36, y - outline_height))
+        else:
+            self.screen.blit(outline_surface, (x, y))
+    text_surface = self.font.render(text, True, color)
+    if self.rotate_mode:
+        text_surface = pygame.transform.rotate(text_surface, 90)
+        y -= text_surface.get_height()
+    self.screen.blit(text_surface, (x, y))
+
+
+def legacy_compose_hud(self):
+    """合成之前的绘制方式：排队的每行文字都用旧版 draw_text 直接画到屏幕"""
+    queue, self._hud_queue = self._hud_queue, []
+    for _, text, x, y, align, color in queue:
+        if align == "right" and not self.rotate_mode:
+            x -= self.font.size(text)[0]
+        legacy_draw_text(self, text, x, y, color)
+
+
+def run(ui, ticks):
+    """返回每次刷新绘制 HUD 的平均 CPU 时间（毫秒）"""
+    start = time.process_time()
+    for tick in range(ticks):
+        ui._layer_screen = None  # 每次都整屏重画 HUD
+        phase = tick * 0.05
+        controller = {"x": 300 * math.sin(phase), "y": 250 * math.cos(phase), "z": -120 + tick % 40,
+                      "yaw": 90 * math.sin(phase * 0.3), "servo0": 0.5 + 0.3 * math.sin(phase)}
+        ui.display_controller_data(controller, 1.2 + 0.001 * tick, 21.5, MODES, True, LINK_STATS,
+                                   0.04 + 0.001 * (tick % 50))
+    return (time.process_time() - start) / ticks * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HUD 文本绘制基准")
+    parser.add_argument("--ticks", type=int, default=600, help="模拟的刷新次数")
+    parser.add_argument("--rotate", action="store_true", help="竖屏模式（文字需要旋转）")
+    parser.add_argument("--font", help="字体文件路径，默认使用界面自动选择的字体")
+    args = parser.parse_args()
+
+    pygame.init()
+    config_manager = ConfigManager()
+    ui = UIController(config_manager.get_interface_settings(), config_manager)
+    ui.rotate_mode = args.rotate
+    if args.font:
+        ui.font = pygame.font.Font(args.font, ui.settings['font_size'])
+        ui.text_cache.set_font(ui.font)
+    ui.temp_fooling_mode = 'real'
+
+    try:
+        ui._compose_hud = types.MethodType(legacy_compose_hud, ui)
+        legacy = run(ui, args.ticks)
+        del ui._compose_hud
+        cached = run(ui, args.ticks)
+        stats = ui.text_cache.stats()
+    finally:
+        ui.cleanup()
+        pygame.quit()
+
+    print(f"HUD {args.ticks} 次刷新，{'竖屏' if args.rotate else '横屏'}")
+    print(f"每次重新渲染: {legacy:8.3f} ms/次")
+    print(f"文本缓存:     {cached:8.3f} ms/次")
+    print(f"CPU 时间减少: {(1 - cached / legacy) * 100:8.1f} %")
+    print(f"缓存: {stats['entries']} 条 {stats['bytes'] / 1024:.0f} KiB，命中率 {stats['hit_ratio'] * 100:.1f}%，"
+          f"淘汰 {stats['evictions']} 次")
+
+
+if __name__ == "__main__":
+    main()
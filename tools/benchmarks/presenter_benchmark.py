@@ -0,0 +1,135 @@
+"""
+渲染线程基准
+
+模拟 main.py 的主循环：控制部分每个周期采样输入并发布遥测（--control-hz），视频以 --video-fps 出新帧，
+每个新帧都要缩放到窗口。对比：
+
+- 同步渲染：控制周期内依次显示视频帧、绘制 HUD、提交画面（render_thread = false）
+- 渲染线程：控制循环只发布遥测快照，Presenter 按 --render-fps 在独立线程绘制（render_thread = true）
+
+输出控制循环每周期的耗时与实际周期（p50/p99），以及渲染线程自身的耗时与卡顿次数。
+使用 SDL dummy 驱动，无需显示器。
+
+用法:
+    python tools/benchmarks/presenter_benchmark.py [--seconds 5] [--control-hz 100] [--render-fps 60]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from modules.config_manager import ConfigManager  # noqa: E402
+from modules.hardware_controller import ControlSnapshot  # noqa: E402
+from modules.presenter import LoopTimer, Presenter, format_loop_summary  # noqa: E402
+from modules.ui_controller import UIController  # noqa: E402
+
+MODES = {
+    "speed_mode": {"name": "高速", "color": "green"},
+    "lock_mode": {"name": "未锁定", "color": "white"},
+    "catch_mode": {"name": "抓取", "color": "yellow"},
+}
+
+
+class FrameSource:
+    """按 video_fps 推进帧序号，模拟 VideoThread 帧环形缓冲区的最新帧"""
+
+    def __init__(self, frames, video_fps):
+        self.frames = frames
+        self.video_fps = video_fps
+        self.started = time.perf_counter()
+
+    def __call__(self):
+        seq = int((time.perf_counter() - self.started) * self.video_fps) + 1
+        return self.frames[seq % len(self.frames)], seq
+
+
+def telemetry(generation):
+    phase = generation * 0.01
+    return {"controller_data": ControlSnapshot(generation, time.perf_counter(), x=300 * math.sin(phase),
+                                               y=250 * math.cos(phase), yaw=90 * math.sin(phase * 0.3)),
+            "depth": 1.2 + 0.1 * math.sin(phase), "temperature": 21.5, "modes": MODES,
+            "joystick_correction_enabled": True, "video_age": 0.04}
+
+
+def run(ui, source, args, presenter):
+    """运行 --seconds 秒控制循环，返回控制循环的 LoopTimer"""
+    period = 1.0 / args.control_hz
+    timer = LoopTimer(period)
+    deadline = time.perf_counter()
+    end = deadline + args.seconds
+    generation = 0
+    while time.perf_counter() < end:
+        started = time.perf_counter()
+        pygame.event.pump()
+        generation += 1
+        if presenter is not None:
+            presenter.publish(telemetry(generation))
+        else:
+            frame, seq = source()
+            ui.display_frame(frame, seq)
+            ui.display_controller_data(**telemetry(generation))
+            ui.update_display()
+        timer.record(started, time.perf_counter())
+
+        deadline += period
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            deadline = time.perf_counter()
+    return timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="渲染线程基准")
+    parser.add_argument("--seconds", type=float, default=5.0, help="每种方式运行的秒数")
+    parser.add_argument("--control-hz", type=int, default=100, help="控制循环频率")
+    parser.add_argument("--render-fps", type=int, default=60, help="渲染线程目标帧率")
+    parser.add_argument("--video-fps", type=int, default=30, help="视频帧率")
+    parser.add_argument("--width", type=int, default=1920, help="视频宽度")
+    parser.add_argument("--height", type=int, default=1080, help="视频高度")
+    parser.add_argument("--window", default="1280x720", help="窗口尺寸，如 1280x720")
+    args = parser.parse_args()
+
+    window_width, window_height = (int(v) for v in args.window.lower().split("x"))
+    pygame.init()
+    config_manager = ConfigManager()
+    settings = dict(config_manager.get_interface_settings(), width=window_width, height=window_height)
+    ui = UIController(settings, config_manager)
+    ui.temp_fooling_mode = 'real'
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(4)]
+
+    presenter = None
+    try:
+        inline = run(ui, FrameSource(frames, args.video_fps), args, None)
+        presenter = Presenter(ui, FrameSource(frames, args.video_fps), args.render_fps)
+        presenter.start()
+        threaded = run(ui, None, args, presenter)
+        presenter.stop()
+    finally:
+        if presenter is not None:
+            presenter.stop()
+        ui.cleanup()
+        pygame.quit()
+
+    print(f"视频 {args.width}x{args.height}@{args.video_fps}fps → 窗口 {window_width}x{window_height}，"
+          f"控制循环 {args.control_hz}Hz")
+    for name, timer in (("同步渲染", inline), ("渲染线程", threaded)):
+        snapshot = timer.snapshot()
+        print(f"{name}: 控制周期耗时 p50 {snapshot['work_p50_ms']:.3f} ms / p99 {snapshot['work_p99_ms']:.3f} ms，"
+              f"实际周期 p99 {snapshot['interval_p99_ms']:.2f} ms，超时 {snapshot['overruns']} 次")
+    print(format_loop_summary("渲染线程自身", presenter.timing.snapshot()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+协议编码微基准
+
+对比旧版运动控制帧打包（bytes 拼接 + 逐字节 XOR + 逐键 float 转换）
+与 modules.protocol_codec.MotionFrameEncoder 的每秒编码帧数。
+
+用法:
+    python tools/benchmarks/protocol_codec_benchmark.py [--seconds 2]
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from modules.protocol_codec import (  # noqa: E402
+    CMD_MOTION_CTRL,
+    FRAME_FOOTER,
+    FRAME_HEADER,
+    MotionFrameEncoder,
+)
+
+
+def legacy_xor_checksum(data):
+    """旧版逐字节 XOR 校验"""
+    checksum = 0
+    for byte in data:
+        checksum ^= byte
+    return checksum
+
+
+def legacy_encode(controller_data):
+    """旧版 HardwareController.send_controller_data 的打包过程"""
+    x = float(controller_data.get("y", 0.0))
+    y = float(controller_data.get("x", 0.0))
+    z = float(controller_data.get("z", 0.0))
+    roll = float(controller_data.get("roll", controller_data.get("rx", 0.0)))
+    pitch = float(controller_data.get("pitch", controller_data.get("ry", 0.0)))
+    yaw = -float(controller_data.get("yaw", controller_data.get("rz", 0.0)))
+    servo = float(controller_data.get("servo0", 0.0))
+
+    payload = struct.pack('<7f', x, y, z, roll, pitch, yaw, servo)
+    body = bytes((CMD_MOTION_CTRL,)) + payload
+    return FRAME_HEADER + body + bytes((legacy_xor_checksum(body),)) + FRAME_FOOTER
+
+
+def measure(encode, controller_data, seconds):
+    """在给定时长内反复编码，返回每秒帧数"""
+    frames = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        # 每轮编码 1000 帧，减少计时调用本身的开销
+        for _ in range(1000):
+            encode(controller_data)
+        frames += 1000
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="运动控制帧编码微基准")
+    parser.add_argument("--seconds", type=float, default=2.0, help="每种实现的测量时长（秒）")
+    args = parser.parse_args()
+
+    controller_data = {"x": 1234.5, "y": -2345.25, "z": 800.0, "yaw": -120.0, "servo0": 0.85}
+    encoder = MotionFrameEncoder()
+
+    # 两种实现必须产生完全相同的帧
+    assert bytes(encoder.encode_controller(controller_data)) == legacy_encode(controller_data)
+
+    legacy_fps = measure(legacy_encode, controller_data, args.seconds)
+    codec_fps = measure(encoder.encode_controller, controller_data, args.seconds)
+
+    print(f"旧版打包:          {legacy_fps:12,.0f} 帧/秒")
+    print(f"MotionFrameEncoder: {codec_fps:12,.0f} 帧/秒")
+    print(f"加速比:            {codec_fps / legacy_fps:12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+去畸变显示基准
+
+对比每帧重新计算映射的 undistort_frame（cv2.undistort）与缓存映射表的 UndistortionEngine
+在“显示无畸变画面”路径上的每秒帧数。
+
+用法:
+    python tools/benchmarks/undistort_benchmark.py [--seconds 2] [--width 1280 --height 720]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from modules.video_processor import UndistortionEngine, undistort_frame  # noqa: E402
+
+
+def measure(undistort, frame, seconds):
+    """在给定时长内反复处理同一帧，返回每秒帧数"""
+    frames = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        undistort(frame)
+        frames += 1
+    return frames / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="去畸变显示基准")
+    parser.add_argument("--seconds", type=float, default=2.0, help="每种实现的测量时长（秒）")
+    parser.add_argument("--width", type=int, default=1280, help="帧宽度")
+    parser.add_argument("--height", type=int, default=720, help="帧高度")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    engine = UndistortionEngine()
+
+    # 两种实现必须产生相同的图像
+    expected = undistort_frame(frame, args.width, args.height)
+    assert np.array_equal(engine.undistort(frame), expected)
+
+    plain_fps = measure(lambda f: undistort_frame(f, args.width, args.height), frame, args.seconds)
+    cached_fps = measure(engine.undistort, frame, args.seconds)
+
+    print(f"分辨率: {args.width}x{args.height}")
+    print(f"undistort_frame（每帧重建映射）: {plain_fps:10.1f} 帧/秒")
+    print(f"UndistortionEngine（缓存映射）: {cached_fps:10.1f} 帧/秒")
+    print(f"加速比:                        {cached_fps / plain_fps:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+视频端到端延迟基准
+
+在本进程内按固定帧率生成画面，每帧顶部用黑白色块编码 32 位帧号（条码），交给 FFmpeg 以
+H.264 zerolatency 编码并推流；VideoThread 按正常流程拉流解码，UIController.display_frame 绘制。
+通过 VideoThread 帧回调与 UIController 绘制回调读出条码，得到每帧的：
+
+- 解码延迟：生成 → VideoThread 读出完整帧
+- 显示延迟：生成 → display_frame 绘制完成并 flip
+
+输出各后端的 p50/p95/p99 与直方图。使用 SDL dummy 驱动，可在无显示器的 Linux 上运行。
+
+推流目标:
+    默认推送 MPEG-TS 到本机 UDP 端口，只能测 FFmpeg 后端；
+    指定 --rtsp-url（需本机运行 RTSP 服务器，如 mediamtx）时以 RTSP 推流，FFmpeg/GStreamer 两个后端都可测。
+
+用法:
+    python tools/benchmarks/video_latency_benchmark.py [--seconds 10] [--decode-profile low_latency]
+    python tools/benchmarks/video_latency_benchmark.py --rtsp-url rtsp://127.0.0.1:8554/latency --backends ffmpeg,gstreamer
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from modules.config_manager import ConfigManager  # noqa: E402
+from modules.ui_controller import UIController  # noqa: E402
+from modules.video_processor import VideoThread  # noqa: E402
+
+BARCODE_BITS = 32
+BARCODE_HEIGHT_RATIO = 0.08  # 条码带占画面高度的比例，色块足够大才能经受有损编码
+
+
+def draw_barcode(frame, counter):
+    """在 frame 顶部写入帧号条码（原地修改）"""
+    height, width = frame.shape[:2]
+    band = max(8, int(height * BARCODE_HEIGHT_RATIO))
+    block = width // BARCODE_BITS
+    for bit in range(BARCODE_BITS):
+        value = 255 if (counter >> bit) & 1 else 0
+        frame[:band, bit * block:(bit + 1) * block] = value
+
+
+def read_barcode(frame):
+    """从帧顶部读出帧号；帧可能已被解码端缩放，按比例取每个色块的中心"""
+    height, width = frame.shape[:2]
+    row = max(8, int(height * BARCODE_HEIGHT_RATIO)) // 2
+    block = width / BARCODE_BITS
+    counter = 0
+    for bit in range(BARCODE_BITS):
+        if frame[row, int((bit + 0.5) * block)].mean() > 127:
+            counter |= 1 << bit
+    return counter
+
+
+class StreamGenerator(threading.Thread):
+    """按固定帧率生成带条码的画面并写入 FFmpeg 编码推流，记录每个帧号的生成时刻"""
+
+    def __init__(self, target, width, height, fps):
+        super().__init__(daemon=True)
+        self.width = width
+        self.height = height
+        self.period = 1.0 / fps
+        self.sent_at = {}
+        self.running = True
+
+        if target.startswith('rtsp://'):
+            output = ['-f', 'rtsp', '-rtsp_transport', 'tcp', target]
+        else:
+            output = ['-f', 'mpegts', target + '?pkt_size=1316']
+        command = [
+            'ffmpeg', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-tune', 'zerolatency', '-g', str(fps),
+            '-pix_fmt', 'yuv420p',
+        ] + output
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+        # 背景为灰度渐变，只有条码带逐帧变化，生成开销可以忽略
+        self.frame = np.empty((height, width, 3), dtype=np.uint8)
+        self.frame[:] = np.linspace(40, 200, width, dtype=np.uint8)[None, :, None]
+
+    def run(self):
+        counter = 0
+        next_deadline = time.perf_counter()
+        while self.running:
+            draw_barcode(self.frame, counter)
+            self.sent_at[counter] = time.perf_counter()
+            try:
+                self.process.stdin.write(self.frame.tobytes())
+                self.process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                break
+            counter += 1
+            next_deadline += self.period
+            delay = next_deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def stop(self):
+        self.running = False
+        self.join(timeout=1)
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.terminate()
+        self.process.wait(timeout=2)
+
+
+def summarize(samples_ms):
+    """返回 (样本数, p50, p95, p99, 最大值)，单位毫秒"""
+    if not samples_ms:
+        return 0, None, None, None, None
+    values = np.asarray(samples_ms)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return len(values), p50, p95, p99, values.max()
+
+
+def print_histogram(samples_ms, bin_ms=10.0, width=40):
+    """按 bin_ms 分桶打印文本直方图"""
+    if not samples_ms:
+        return
+    values = np.asarray(samples_ms)
+    edges = np.arange(np.floor(values.min() / bin_ms) * bin_ms, values.max() + bin_ms, bin_ms)
+    if len(edges) < 2:
+        edges = np.array([edges[0], edges[0] + bin_ms])
+    counts, edges = np.histogram(values, bins=edges)
+    peak = counts.max()
+    for count, low in zip(counts, edges[:-1]):
+        bar = "#" * int(round(count / peak * width)) if peak else ""
+        label = f"{low:.0f}-{low + bin_ms:.0f}ms"
+        print(f"    {label:>14} {count:6d} {bar}")
+
+
+def measure_backend(backend, source, target, args, ui, workdir):
+    """对一个后端跑一轮测量，返回 (解码延迟列表, 显示延迟列表)，单位毫秒"""
+    decode_ms, present_ms = [], []
+    lock = threading.Lock()
+
+    video_thread = VideoThread(source, args.width, args.height, output_folder=workdir, backend=backend,
+                               decode_profile=args.decode_profile)
+    video_thread.daemon = True
+    generator = StreamGenerator(target, args.width, args.height, args.fps)
+    warmup_until = time.perf_counter() + args.warmup
+
+    def on_decoded(frame, decoded_at):
+        sent = generator.sent_at.get(read_barcode(frame))
+        if sent is not None and decoded_at >= warmup_until:
+            with lock:
+                decode_ms.append((decoded_at - sent) * 1000)
+
+    pending = {}
+
+    def on_blit(frame, blitted_at):
+        pending["counter"] = read_barcode(frame)
+
+    video_thread.add_frame_listener(on_decoded)
+    ui.frame_blit_listener = on_blit
+    video_thread.start()
+    generator.start()
+
+    clock = pygame.time.Clock()
+    last_seen = 0
+    deadline = time.perf_counter() + args.warmup + args.seconds
+    try:
+        while time.perf_counter() < deadline:
+            pygame.event.pump()
+            if video_thread.frames_received != last_seen:
+                last_seen = video_thread.frames_received
+                frame = video_thread.get_latest_frame()
+                pending.clear()
+                ui.display_frame(frame)
+                pygame.display.flip()
+                presented_at = time.perf_counter()
+                sent = generator.sent_at.get(pending.get("counter"))
+                if sent is not None and presented_at >= warmup_until:
+                    present_ms.append((presented_at - sent) * 1000)
+            # 与 main.py 一样以 [joystick] tick 的频率运行主循环
+            clock.tick(args.ui_tick)
+    finally:
+        ui.frame_blit_listener = None
+        generator.stop()
+        video_thread.stop_force()
+
+    with lock:
+        return list(decode_ms), present_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="视频端到端延迟基准")
+    parser.add_argument("--backends", default="ffmpeg", help="逗号分隔的后端：ffmpeg,gstreamer")
+    parser.add_argument("--rtsp-url", help="本机 RTSP 服务器上的推流地址；不指定时使用 UDP MPEG-TS（仅 FFmpeg 后端）")
+    parser.add_argument("--udp-port", type=int, default=23000, help="UDP 推流端口")
+    parser.add_argument("--width", type=int, default=1280, help="视频宽度")
+    parser.add_argument("--height", type=int, default=720, help="视频高度")
+    parser.add_argument("--fps", type=int, default=30, help="生成帧率")
+    parser.add_argument("--seconds", type=float, default=10.0, help="每个后端的测量时长（秒）")
+    parser.add_argument("--warmup", type=float, default=2.0, help="连接与缓冲稳定前丢弃的时长（秒）")
+    parser.add_argument("--ui-tick", type=int, default=60, help="显示循环频率（Hz）")
+    parser.add_argument("--decode-profile", default="default", help="FFmpeg 解码配置")
+    parser.add_argument("--bin-ms", type=float, default=10.0, help="直方图分桶宽度（毫秒）")
+    args = parser.parse_args()
+
+    if shutil.which('ffmpeg') is None:
+        print("未找到 ffmpeg，请先安装并加入 PATH")
+        sys.exit(1)
+
+    pygame.init()
+    config_manager = ConfigManager()
+    settings = dict(config_manager.get_interface_settings(), width=args.width, height=args.height)
+    ui = UIController(settings, config_manager)
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+                if args.rtsp_url:
+                    source = target = args.rtsp_url
+                elif backend == "gstreamer":
+                    print("gstreamer: VideoThread 的 GStreamer 管线只支持 RTSP，请用 --rtsp-url 指定本机 RTSP 服务器，跳过")
+                    continue
+                else:
+                    target = f"udp://127.0.0.1:{args.udp_port}"
+                    source = target
+
+                decode_ms, present_ms = measure_backend(backend, source, target, args, ui, workdir)
+                print(f"\n[{backend}] {args.width}x{args.height} {args.fps}fps 解码配置 {args.decode_profile}")
+                for name, samples in (("解码延迟", decode_ms), ("显示延迟", present_ms)):
+                    count, p50, p95, p99, worst = summarize(samples)
+                    if not count:
+                        print(f"  {name}: 无有效样本（检查推流地址与后端日志）")
+                        continue
+                    print(f"  {name}: n={count} p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms max={worst:.1f}ms")
+                    print_histogram(samples, args.bin_ms)
+    finally:
+        ui.cleanup()
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -180,6 +180,8 @@ class KeyboardBindingEditor(QMainWindow):
             'toggle_undistorted_key': '切换无失真视图',
             'toggle_fullscreen_key': '切换全屏',
             'capture_frame_key': '捕获当前帧',
+            'toggle_recording_key': '开始/停止录像',
+            'burst_capture_key': '连拍',
             'controller_visualizer_key': '控制器可视化工具',
             'controller_mapping_key': '控制器映射编辑器',
             'deploy_thrust_curves_key': '部署推力曲线',
@@ -216,6 +218,8 @@ class KeyboardBindingEditor(QMainWindow):
             'toggle_undistorted_cooldown': '切换无失真视图',
             'toggle_fullscreen_cooldown': '切换全屏',
             'capture_frame_cooldown': '捕获当前帧',
+            'toggle_recording_cooldown': '开始/停止录像',
+            'burst_capture_cooldown': '连拍',
             'button7_cooldown': '手柄按钮7',
             'controller_visualizer_cooldown': '控制器可视化工具',
             'controller_mapping_cooldown': '控制器映射编辑器',